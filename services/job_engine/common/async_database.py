@@ -0,0 +1,270 @@
+from pymongo import AsyncMongoClient, DESCENDING, ReturnDocument
+from pymongo.errors import BulkWriteError
+from datetime import datetime, timezone, timedelta
+import logging
+from typing import Dict, Any, List, Optional, AsyncIterator
+from .config import config
+from .database import JobDatabase, PAGE_SORT, client_options
+from . import job_stats
+from . import job_search
+from . import job_outbox
+
+logger = logging.getLogger(__name__)
+
+class AsyncJobDatabase:
+    """asyncio counterpart of JobDatabase on pymongo's AsyncMongoClient
+
+    Same method names and results as JobDatabase, awaited instead of called.
+    Connects on first use; the client belongs to the event loop that first
+    used it.
+    """
+
+    def __init__(self):
+        self.client = None
+        self.db = None
+        self.jobs_collection = None
+        self.stats_collection = None
+        self.outbox_collection = None
+        self.counters_collection = None
+        self.snapshots_collection = None
+
+    async def connect(self):
+        """Connect to database"""
+        try:
+            self.client = AsyncMongoClient(config.MONGODB_URI, **client_options())
+
+            # Test connection
+            await self.client.server_info()
+
+            self.db = self.client[config.DATABASE_NAME]
+            self.jobs_collection = self.db[config.JOBS_COLLECTION]
+            self.stats_collection = self.db[config.STATS_COLLECTION]
+            self.outbox_collection = self.db[config.OUTBOX_COLLECTION]
+            self.counters_collection = self.db[config.COUNTERS_COLLECTION]
+            self.snapshots_collection = self.db[config.SNAPSHOTS_COLLECTION]
+
+            logger.info(f"Connected to database (async): {config.DATABASE_NAME}")
+
+        except Exception as e:
+            logger.error(f"Failed to connect to MongoDB: {e}")
+            raise
+
+    async def _collection(self):
+        if self.jobs_collection is None:
+            await self.connect()
+        return self.jobs_collection
+
+    async def insert_jobs_batch(self, jobs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Insert multiple jobs with one unordered bulk write (see JobDatabase.insert_jobs_batch)"""
+        stats = {"inserted": 0, "skipped": 0, "failed": 0, "failed_job_ids": [], "inserted_job_ids": []}
+        batch_jobs = JobDatabase._prepare_batch(jobs, stats)
+        job_ids = list(batch_jobs)
+
+        if not job_ids:
+            return stats
+
+        inserted_job_ids = []
+        try:
+            collection = await self._collection()
+            result = await collection.bulk_write(
+                JobDatabase._upsert_operations(batch_jobs, job_ids), ordered=False
+            )
+            inserted_job_ids = JobDatabase._count_bulk_result(stats, job_ids, result=result)
+        except BulkWriteError as e:
+            inserted_job_ids = JobDatabase._count_bulk_result(stats, job_ids, error=e)
+        except Exception as e:
+            logger.error(f"Error writing job batch: {e}")
+            stats["failed"] += len(job_ids)
+            stats["failed_job_ids"].extend(job_ids)
+            stats["db_error"] = str(e)
+        stats["inserted_job_ids"] = inserted_job_ids
+
+        await self._update_stats([batch_jobs[job_id] for job_id in inserted_job_ids], 1)
+        await self._record_outbox([batch_jobs[job_id] for job_id in inserted_job_ids])
+
+        logger.info(f"Job batch: {stats['inserted']} inserted, {stats['skipped']} already present, "
+                    f"{stats['failed']} failed")
+        return stats
+
+    async def _update_stats(self, jobs: List[Dict[str, Any]], sign: int):
+        """Add inserted (sign=1) or deleted (sign=-1) jobs to the materialized stats"""
+        if not jobs:
+            return
+        try:
+            await self.stats_collection.update_one(
+                {"_id": job_stats.STATS_ID}, job_stats.stats_update(jobs, sign), upsert=True
+            )
+        except Exception as e:
+            # Stats drift until the next rebuild, the jobs themselves are fine
+            logger.error(f"Error updating job stats: {e}")
+
+    async def _record_outbox(self, jobs: List[Dict[str, Any]]):
+        """Append newly inserted jobs to the outbox (see JobDatabase._record_outbox)"""
+        if not config.OUTBOX_ENABLED or not jobs:
+            return
+        try:
+            counter = await self.counters_collection.find_one_and_update(
+                {"_id": job_outbox.OUTBOX_COUNTER_ID},
+                job_outbox.reserve_update(len(jobs)),
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+            await self.outbox_collection.insert_many(job_outbox.reserved_entries(jobs, counter), ordered=False)
+        except Exception as e:
+            # Consumers miss these jobs in the feed, the jobs themselves are stored
+            logger.error(f"Error recording jobs in the outbox: {e}")
+
+    async def get_jobs_by_location(self, location: str, limit: int = 100, prefix: bool = False) -> List[Dict[str, Any]]:
+        """Get jobs filtered by location (see JobDatabase.location_query)"""
+        try:
+            collection = await self._collection()
+            return await collection.find(
+                JobDatabase.location_query(location, prefix),
+                {"_id": 0}
+            ).sort("scraped_date", DESCENDING).limit(limit).to_list()
+        except Exception as e:
+            logger.error(f"Error getting jobs by location: {e}")
+            return []
+
+    async def get_recent_jobs(self, days: int = 7, limit: int = 100) -> List[Dict[str, Any]]:
+        """Get recent jobs within specified days"""
+        try:
+            cutoff_date = datetime.now(timezone.utc) - timedelta(days=days)
+            collection = await self._collection()
+            return await collection.find(
+                {"scraped_date": {"$gte": cutoff_date}},
+                {"_id": 0}
+            ).sort("scraped_date", DESCENDING).limit(limit).to_list()
+        except Exception as e:
+            logger.error(f"Error getting recent jobs: {e}")
+            return []
+
+    async def _get_page(self, query: Dict[str, Any], page_size: int, cursor: Optional[str]) -> Dict[str, Any]:
+        """One keyset page: {"jobs": [...], "next_cursor": token or None}"""
+        collection = await self._collection()
+        jobs = await collection.find(
+            JobDatabase.keyset_query(query, cursor), {"_id": 0}
+        ).sort(PAGE_SORT).limit(page_size + 1).to_list()
+
+        next_cursor = None
+        if len(jobs) > page_size:
+            jobs = jobs[:page_size]
+            next_cursor = JobDatabase.encode_cursor(jobs[-1])
+        return {"jobs": jobs, "next_cursor": next_cursor}
+
+    async def _iter_pages(self, query: Dict[str, Any], batch_size: int) -> AsyncIterator[Dict[str, Any]]:
+        cursor = None
+        while True:
+            page = await self._get_page(query, batch_size, cursor)
+            for job in page["jobs"]:
+                yield job
+            cursor = page["next_cursor"]
+            if not cursor:
+                return
+
+    async def get_recent_jobs_page(self, days: int = 7, page_size: int = 100,
+                                   cursor: Optional[str] = None) -> Dict[str, Any]:
+        """Page of recent jobs (see JobDatabase.get_recent_jobs_page)"""
+        cutoff_date = datetime.now(timezone.utc) - timedelta(days=days)
+        return await self._get_page({"scraped_date": {"$gte": cutoff_date}}, page_size, cursor)
+
+    async def get_jobs_by_location_page(self, location: str, page_size: int = 100,
+                                        cursor: Optional[str] = None, prefix: bool = False) -> Dict[str, Any]:
+        """Page of jobs for a location (see JobDatabase.get_jobs_by_location_page)"""
+        return await self._get_page(JobDatabase.location_query(location, prefix), page_size, cursor)
+
+    def iter_recent_jobs(self, days: int = 7, batch_size: int = 500) -> AsyncIterator[Dict[str, Any]]:
+        """Stream recent jobs with `async for`, newest first"""
+        cutoff_date = datetime.now(timezone.utc) - timedelta(days=days)
+        return self._iter_pages({"scraped_date": {"$gte": cutoff_date}}, batch_size)
+
+    def iter_jobs_by_location(self, location: str, batch_size: int = 500,
+                              prefix: bool = False) -> AsyncIterator[Dict[str, Any]]:
+        """Stream jobs for a location with `async for`, newest first"""
+        return self._iter_pages(JobDatabase.location_query(location, prefix), batch_size)
+
+    async def search_jobs(self, text: Optional[str] = None, location: Optional[str] = None,
+                          link_type=None, job_type=None, role=None, page: int = 1,
+                          page_size: int = 20, facet_limit: int = 20) -> Dict[str, Any]:
+        """Ranked, faceted keyword search (see JobDatabase.search_jobs)"""
+        page = max(1, page)
+        match = job_search.search_match(
+            text, JobDatabase.location_query(location) if location else None,
+            link_type=link_type, job_type=job_type, role=role
+        )
+        try:
+            collection = await self._collection()
+            ranked = bool(text and text.strip())
+            cursor = await collection.aggregate(
+                job_search.search_pipeline(match, ranked, page, page_size, facet_limit)
+            )
+            facets = (await cursor.to_list())[0]
+            return job_search.search_result(facets, page, page_size)
+        except Exception as e:
+            logger.error(f"Error searching jobs: {e}")
+            return job_search.empty_result(page, page_size)
+
+    async def read_outbox(self, after_seq: int = 0, limit: int = 100) -> Dict[str, Any]:
+        """New jobs recorded after sequence number `after_seq` (see JobDatabase.read_outbox)"""
+        await self._collection()
+        docs = await self.outbox_collection.find(
+            {"_id": {"$gt": after_seq}}
+        ).sort("_id", 1).limit(limit).to_list()
+        entries = [dict(doc, seq=doc.pop("_id")) for doc in docs]
+        return job_outbox.read_result(
+            job_outbox.contiguous(entries, after_seq, config.OUTBOX_GAP_SECONDS), after_seq
+        )
+
+    async def get_feed_snapshot(self, key: str) -> Optional[Dict[str, Any]]:
+        """One prebuilt feed by key (see JobDatabase.get_feed_snapshot)"""
+        try:
+            await self._collection()
+            feed = await self.snapshots_collection.find_one({"_id": key})
+            return dict(feed, key=feed.pop("_id")) if feed else None
+        except Exception as e:
+            logger.error(f"Error getting feed snapshot: {e}")
+            return None
+
+    async def rebuild_stats(self) -> Dict[str, Any]:
+        """Recompute the materialized stats from the jobs collection"""
+        collection = await self._collection()
+        cursor = await collection.aggregate(job_stats.rebuild_pipeline(), allowDiskUse=True)
+        facets = (await cursor.to_list())[0]
+        doc = job_stats.document_from_facets(facets)
+        doc["updated_at"] = datetime.now(timezone.utc)
+        doc["rebuilt_at"] = doc["updated_at"]
+        await self.stats_collection.replace_one({"_id": job_stats.STATS_ID}, doc, upsert=True)
+        logger.info(f"Job stats rebuilt: {doc['total']} jobs")
+        return doc
+
+    async def get_database_stats(self) -> Dict[str, Any]:
+        """Get database statistics from the materialized stats document"""
+        try:
+            await self._collection()
+            doc = await self.stats_collection.find_one({"_id": job_stats.STATS_ID})
+            if doc is None:
+                logger.info("Job stats not materialized yet, building them")
+                doc = await self.rebuild_stats()
+            return job_stats.stats_report(doc)
+
+        except Exception as e:
+            logger.error(f"Error getting database stats: {e}")
+            return {}
+
+    async def close_connection(self):
+        """Close database connection"""
+        if self.client:
+            await self.client.close()
+            self.client = None
+            self.db = None
+            self.jobs_collection = None
+            logger.info("Database connection closed (async)")
+
+_async_db_instance = None
+
+def get_async_db() -> AsyncJobDatabase:
+    """Get or create the shared async database instance"""
+    global _async_db_instance
+    if _async_db_instance is None:
+        _async_db_instance = AsyncJobDatabase()
+    return _async_db_instance
@@ -0,0 +1,89 @@
+import hashlib
+import json
+import math
+import os
+import tempfile
+import threading
+from typing import Dict, Any, Optional, Tuple
+
+class BloomFilter:
+    """Compact probabilistic set of strings
+
+    `item in bloom` is never False for an added item, and True for an item
+    that was never added with roughly `expected_fp_rate()` probability.
+    Bit positions come from double hashing one blake2b digest.
+    """
+
+    def __init__(self, num_bits: int, num_hashes: int, bits: Optional[bytearray] = None, count: int = 0):
+        self.num_bits = max(8, num_bits)
+        self.num_hashes = max(1, num_hashes)
+        self.bits = bits if bits is not None else bytearray((self.num_bits + 7) // 8)
+        self.count = count
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_capacity(cls, capacity: int, fp_rate: float, max_bytes: Optional[int] = None) -> 'BloomFilter':
+        """Filter sized for `capacity` items at `fp_rate`, capped at `max_bytes` of memory"""
+        capacity = max(1, capacity)
+        num_bits = int(math.ceil(-capacity * math.log(fp_rate) / (math.log(2) ** 2)))
+        if max_bytes:
+            num_bits = min(num_bits, max_bytes * 8)
+        num_hashes = int(round(num_bits / capacity * math.log(2)))
+        return cls(num_bits, num_hashes)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, item: str) -> bool:
+        """Add an item, return False if it (probably) was already present"""
+        changed = False
+        with self._lock:
+            for position in self._positions(item):
+                byte, mask = position >> 3, 1 << (position & 7)
+                if not self.bits[byte] & mask:
+                    self.bits[byte] |= mask
+                    changed = True
+            if changed:
+                self.count += 1
+        return changed
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self.bits)
+
+    def expected_fp_rate(self) -> float:
+        """False positive probability at the current fill"""
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+    def save(self, path: str, meta: Optional[Dict[str, Any]] = None):
+        """Write the filter (a JSON header line, then the raw bits) atomically"""
+        header = dict(meta or {}, num_bits=self.num_bits, num_hashes=self.num_hashes, count=self.count)
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(json.dumps(header).encode() + b'\n')
+                with self._lock:
+                    f.write(bytes(self.bits))
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> Tuple['BloomFilter', Dict[str, Any]]:
+        """Read a saved filter, return (filter, header)"""
+        with open(path, 'rb') as f:
+            header = json.loads(f.readline())
+            bits = bytearray(f.read())
+        if len(bits) != (header['num_bits'] + 7) // 8:
+            raise ValueError(f"Truncated filter file: {path}")
+        return cls(header['num_bits'], header['num_hashes'], bits, header['count']), header
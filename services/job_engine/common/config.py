@@ -21,21 +21,128 @@ class Config:
         self.SERPAPI_API_KEY = os.getenv("SERPAPI_API_KEY")
 
         # database config
+        # Job store: "mongo", or "sqlite" for an embedded database file (offline runs, benchmarks)
+        self.STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "mongo").lower()
+        self.SQLITE_PATH = os.getenv("SQLITE_PATH", "jobs.sqlite3")
         self.MONGODB_URI = os.getenv("MONGODB_URI")
         self.DATABASE_NAME = os.getenv("DATABASE_NAME","jobscraper")
         self.JOBS_COLLECTION = os.getenv("JOBS_COLLECTION", "jobs")
+        self.WATERMARKS_COLLECTION = os.getenv("WATERMARKS_COLLECTION", "scrape_watermarks")
+        self.STATS_COLLECTION = os.getenv("STATS_COLLECTION", "job_stats")
+        # New-job outbox: every inserted job_id under a sequence number, for downstream consumers
+        self.OUTBOX_ENABLED = os.getenv("OUTBOX_ENABLED", "false").lower() == "true"
+        self.OUTBOX_COLLECTION = os.getenv("OUTBOX_COLLECTION", "job_outbox")
+        self.COUNTERS_COLLECTION = os.getenv("COUNTERS_COLLECTION", "counters")
+        # A missing sequence number older than this is skipped by readers instead of waited for
+        self.OUTBOX_GAP_SECONDS = float(os.getenv("OUTBOX_GAP_SECONDS", 30))
+        # Per-session changesets: job_ids added by each scrape and removed by each purge
+        self.CHANGESETS_ENABLED = os.getenv("CHANGESETS_ENABLED", "false").lower() == "true"
+        self.CHANGESETS_COLLECTION = os.getenv("CHANGESETS_COLLECTION", "job_changesets")
+        # Precomputed feeds (top jobs overall, per location and per role), rebuilt after each scrape
+        self.SNAPSHOTS_COLLECTION = os.getenv("SNAPSHOTS_COLLECTION", "feed_snapshots")
+        # Connection pool settings, shared by the sync and async clients
+        self.MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", 50))
+        self.MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", 0))
+        self.MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", 60000))
+        self.MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", 5000))
 
         # Scraping Configuration
         self.SCRAPING_ENABLED = os.getenv('SCRAPING_ENABLED', 'false').lower() == 'true'
         self.LOCATION_MODE = os.getenv('LOCATION_MODE', 'India')
         self.DAILY_SCRAPING_TIME = os.getenv('DAILY_SCRAPING_TIME', '06:00')
         self.GITHUB_ACTIONS_MODE = os.getenv('GITHUB_ACTIONS_MODE', 'false').lower() == 'true'
+        # One search per location instead of a single combined query
+        self.LOCATION_FANOUT = os.getenv('LOCATION_FANOUT', 'false').lower() == 'true'
         
         # API Limits
         self.MAX_RESULTS_PER_QUERY = int(os.getenv('MAX_RESULTS_PER_QUERY', 20))
+        self.MAX_PAGES_PER_SEARCH = int(os.getenv('MAX_PAGES_PER_SEARCH', 5))
         self.API_TIMEOUT = int(os.getenv('API_TIMEOUT', 30))
+        self.API_CONNECT_TIMEOUT = float(os.getenv('API_CONNECT_TIMEOUT', 5))
+        self.HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', 10))
         self.REQUEST_DELAY = int(os.getenv('REQUEST_DELAY', 2))
 
+        # Async scraping: roles searched in parallel, API calls capped globally
+        self.ASYNC_SCRAPING = os.getenv('ASYNC_SCRAPING', 'false').lower() == 'true'
+        self.SCRAPER_CONCURRENCY = int(os.getenv('SCRAPER_CONCURRENCY', 4))
+        self.MAX_REQUESTS_PER_SECOND = float(os.getenv('MAX_REQUESTS_PER_SECOND', 1))
+
+        # Adaptive (AIMD) rate limiting: MAX_REQUESTS_PER_SECOND is the starting rate
+        self.API_MAX_RETRIES = int(os.getenv('API_MAX_RETRIES', 3))
+        self.RATE_LIMIT_MIN_RPS = float(os.getenv('RATE_LIMIT_MIN_RPS', 0.2))
+        self.RATE_LIMIT_MAX_RPS = float(os.getenv('RATE_LIMIT_MAX_RPS', 5))
+        self.RATE_LIMIT_INCREASE_STEP = float(os.getenv('RATE_LIMIT_INCREASE_STEP', 0.1))
+        self.RATE_LIMIT_DECREASE_FACTOR = float(os.getenv('RATE_LIMIT_DECREASE_FACTOR', 0.5))
+        self.RATE_LIMIT_LATENCY_TARGET = float(os.getenv('RATE_LIMIT_LATENCY_TARGET', 5))
+        self.RATE_LIMIT_JITTER = float(os.getenv('RATE_LIMIT_JITTER', 0.1))
+
+        # Incremental scraping: stop a search once a run of already-known jobs is hit
+        self.INCREMENTAL_SCRAPING = os.getenv('INCREMENTAL_SCRAPING', 'false').lower() == 'true'
+        self.INCREMENTAL_STOP_AFTER = int(os.getenv('INCREMENTAL_STOP_AFTER', 5))
+        self.WATERMARK_SIZE = int(os.getenv('WATERMARK_SIZE', 300))
+
+        # Raw SerpAPI response store (replay and same-day reuse)
+        self.RESPONSE_STORE_ENABLED = os.getenv('RESPONSE_STORE_ENABLED', 'false').lower() == 'true'
+        self.RESPONSE_STORE_DIR = os.getenv('RESPONSE_STORE_DIR', 'response_store')
+        self.RESPONSE_STORE_TTL_DAYS = int(os.getenv('RESPONSE_STORE_TTL_DAYS', 90))
+
+        # Bloom filter of stored job_ids, checked before any database call
+        self.KNOWN_JOBS_FILTER = os.getenv('KNOWN_JOBS_FILTER', 'false').lower() == 'true'
+        self.KNOWN_JOBS_FILTER_PATH = os.getenv('KNOWN_JOBS_FILTER_PATH', 'known_jobs.bloom')
+        self.KNOWN_JOBS_FILTER_FP_RATE = float(os.getenv('KNOWN_JOBS_FILTER_FP_RATE', 0.01))
+        self.KNOWN_JOBS_FILTER_MAX_MB = float(os.getenv('KNOWN_JOBS_FILTER_MAX_MB', 16))
+        # 0 sizes the filter for twice the current job count
+        self.KNOWN_JOBS_FILTER_CAPACITY = int(os.getenv('KNOWN_JOBS_FILTER_CAPACITY', 0))
+
+        # Session checkpoints: "none", "file" or "mongo"
+        self.CHECKPOINT_BACKEND = os.getenv('CHECKPOINT_BACKEND', 'none').lower()
+        self.CHECKPOINT_DIR = os.getenv('CHECKPOINT_DIR', 'checkpoints')
+        self.CHECKPOINT_COLLECTION = os.getenv('CHECKPOINT_COLLECTION', 'scrape_sessions')
+        self.CHECKPOINT_MAX_AGE_HOURS = int(os.getenv('CHECKPOINT_MAX_AGE_HOURS', 24))
+
+        # Distributed work queue (scripts/queue_worker.py)
+        self.TASKS_COLLECTION = os.getenv('TASKS_COLLECTION', 'scrape_tasks')
+        self.TASK_LEASE_SECONDS = int(os.getenv('TASK_LEASE_SECONDS', 120))
+        self.TASK_MAX_ATTEMPTS = int(os.getenv('TASK_MAX_ATTEMPTS', 3))
+
+        # Local spool for jobs the database could not take (replayed with run_scraper.py --drain-spool)
+        self.JOB_SPOOL = os.getenv('JOB_SPOOL', 'false').lower() == 'true'
+        self.JOB_SPOOL_DIR = os.getenv('JOB_SPOOL_DIR', 'spool')
+        self.JOB_SPOOL_SEGMENT_MB = float(os.getenv('JOB_SPOOL_SEGMENT_MB', 16))
+        # fsync after this many spooled jobs or seconds, whichever comes first
+        self.JOB_SPOOL_FSYNC_EVERY = int(os.getenv('JOB_SPOOL_FSYNC_EVERY', 100))
+        self.JOB_SPOOL_FSYNC_INTERVAL = float(os.getenv('JOB_SPOOL_FSYNC_INTERVAL', 1.0))
+        # After a failed write, spool without trying the database for this long
+        self.JOB_SPOOL_RETRY_SECONDS = float(os.getenv('JOB_SPOOL_RETRY_SECONDS', 30))
+
+        # Retention (scripts/delete_old_jobs.py): "purge" deletes in chunks, "ttl" lets MongoDB expire jobs
+        self.RETENTION_MODE = os.getenv('RETENTION_MODE', 'purge').lower()
+        self.DELETE_JOBS_OLDER_THAN_DAYS = int(os.getenv('DELETE_JOBS_OLDER_THAN_DAYS', 60))
+        self.PURGE_BATCH_SIZE = int(os.getenv('PURGE_BATCH_SIZE', 1000))
+        self.PURGE_PAUSE_SECONDS = float(os.getenv('PURGE_PAUSE_SECONDS', 0.5))
+        # Purge mode can first copy jobs to date-partitioned .ndjson.gz files
+        self.ARCHIVE_BEFORE_DELETE = os.getenv('ARCHIVE_BEFORE_DELETE', 'false').lower() == 'true'
+        self.ARCHIVE_DIR = os.getenv('ARCHIVE_DIR', 'archive')
+        self.ARCHIVE_COMPRESSLEVEL = int(os.getenv('ARCHIVE_COMPRESSLEVEL', 6))
+        # TTL mode: nothing decrements the stats as jobs expire, so reads rebuild them once they are this old
+        self.STATS_MAX_AGE_SECONDS = int(os.getenv('STATS_MAX_AGE_SECONDS', 3600))
+
+        # Feed snapshots: rebuilt at the end of every scraping session
+        self.FEED_SNAPSHOTS = os.getenv('FEED_SNAPSHOTS', 'false').lower() == 'true'
+        self.FEED_SIZE = int(os.getenv('FEED_SIZE', 50))
+        # Only jobs scraped within this many days are considered for a feed
+        self.FEED_DAYS = int(os.getenv('FEED_DAYS', 30))
+        # Also write each feed as static gzipped JSON here (for a CDN), empty = off
+        self.FEED_FILES_DIR = os.getenv('FEED_FILES_DIR', '')
+
+        # Pipeline mode: fetch, process and persist stages on bounded queues
+        self.PIPELINE_MODE = os.getenv('PIPELINE_MODE', 'false').lower() == 'true'
+        self.PIPELINE_FETCH_WORKERS = int(os.getenv('PIPELINE_FETCH_WORKERS', self.SCRAPER_CONCURRENCY))
+        self.PIPELINE_PROCESS_WORKERS = int(os.getenv('PIPELINE_PROCESS_WORKERS', 2))
+        self.PIPELINE_PERSIST_WORKERS = int(os.getenv('PIPELINE_PERSIST_WORKERS', 1))
+        self.PIPELINE_QUEUE_SIZE = int(os.getenv('PIPELINE_QUEUE_SIZE', 20))
+        self.PIPELINE_BATCH_SIZE = int(os.getenv('PIPELINE_BATCH_SIZE', 50))
+
         # GitHub Actions specific settings
         if self.GITHUB_ACTIONS_MODE or os.getenv('GITHUB_ACTIONS'):
             self.GITHUB_ACTIONS_MODE = True
@@ -81,9 +188,24 @@ class Config:
         if not self.SERPAPI_API_KEY:
             errors.append("SERPAPI_API_KEY is required")
         
-        if not self.MONGODB_URI:
+        if self.STORAGE_BACKEND not in ["mongo", "sqlite"]:
+            errors.append(f"Invalid STORAGE_BACKEND: {self.STORAGE_BACKEND}. Must be 'mongo' or 'sqlite'")
+        
+        if self.STORAGE_BACKEND == "mongo" and not self.MONGODB_URI:
             errors.append("MONGODB_URI is required")
         
+        if self.STORAGE_BACKEND == "sqlite" and self.CHECKPOINT_BACKEND == "mongo":
+            errors.append("CHECKPOINT_BACKEND 'mongo' needs STORAGE_BACKEND 'mongo'")
+        
+        if self.STORAGE_BACKEND == "sqlite" and self.RETENTION_MODE == "ttl":
+            errors.append("RETENTION_MODE 'ttl' needs STORAGE_BACKEND 'mongo'")
+        
+        if self.CHECKPOINT_BACKEND not in ["none", "file", "mongo"]:
+            errors.append(f"Invalid CHECKPOINT_BACKEND: {self.CHECKPOINT_BACKEND}. Must be 'none', 'file', or 'mongo'")
+
+        if self.RETENTION_MODE not in ["purge", "ttl"]:
+            errors.append(f"Invalid RETENTION_MODE: {self.RETENTION_MODE}. Must be 'purge' or 'ttl'")
+        
         if self.LOCATION_MODE not in ["Australia", "India", "all"]:
             errors.append(f"Invalid LOCATION_MODE: {self.LOCATION_MODE}. Must be 'Australia', 'India', or 'all'")
         
@@ -110,12 +232,17 @@ class Config:
         """String representation of config (safe, no sensitive data)"""
         return f"""
             Job Scraper Configuration:
+            - Storage Backend: {self.STORAGE_BACKEND}{f' ({self.SQLITE_PATH})' if self.STORAGE_BACKEND == 'sqlite' else ''}
             - Database: {self.DATABASE_NAME}/{self.JOBS_COLLECTION}
             - Location Mode: {self.LOCATION_MODE}
             - Search Locations: {self.get_search_locations()}
+            - Location Fan-out: {self.LOCATION_FANOUT}
+            - Incremental Scraping: {self.INCREMENTAL_SCRAPING}
             - Scraping Enabled: {self.SCRAPING_ENABLED}
             - GitHub Actions Mode: {self.GITHUB_ACTIONS_MODE}
             - Max Results Per Query: {self.MAX_RESULTS_PER_QUERY}
+            - Async Scraping: {self.ASYNC_SCRAPING} (concurrency {self.SCRAPER_CONCURRENCY}, {self.MAX_REQUESTS_PER_SECOND} req/s)
+            - Pipeline Mode: {self.PIPELINE_MODE}
             - Job Roles: {len(self.JOB_ROLES)} roles configured
             - API Key: {'Configured' if self.SERPAPI_API_KEY else 'Missing'}
                 """.strip()
@@ -1,45 +1,103 @@
-import pymongo
-from pymongo import MongoClient, ASCENDING, DESCENDING
+from pymongo import MongoClient, ASCENDING, DESCENDING, UpdateOne, ReplaceOne, ReturnDocument
+from pymongo.errors import BulkWriteError
 from datetime import datetime, timezone, timedelta
-import hashlib
 import logging
-from typing import Dict, Any, Optional, List
+import os
+import re
+import threading
+import time
+from bson import ObjectId
+from typing import Dict, Any, Optional, List, Iterator, Callable
 from .config import config
+from .bloom_filter import BloomFilter
+from .storage import JobStorage
+from . import job_stats
+from . import job_search
+from . import job_outbox
+from . import job_changesets
 
 logger = logging.getLogger(__name__)
 
-class JobDatabase:
-    """Database manager for job scraper service."""
+# Index used by the TTL retention mode
+TTL_INDEX_NAME = "scraped_date_ttl"
+
+# Keyset pagination order for job feeds
+PAGE_SORT = [("scraped_date", DESCENDING), ("job_id", DESCENDING)]
+
+def client_options() -> Dict[str, Any]:
+    """Connection pool settings shared by the sync and async clients"""
+    return {
+        "maxPoolSize": config.MONGO_MAX_POOL_SIZE,
+        "minPoolSize": config.MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": config.MONGO_MAX_IDLE_TIME_MS,
+        "serverSelectionTimeoutMS": config.MONGO_SERVER_SELECTION_TIMEOUT_MS
+    }
+
+class JobDatabase(JobStorage):
+    """Database manager for job scraper service (MongoDB backend)"""
 
     def __init__(self):
         self.client = None
         self.db = None
         self.jobs_collection = None
+        self.watermarks_collection = None
+        self.stats_collection = None
+        self.outbox_collection = None
+        self.counters_collection = None
+        self.snapshots_collection = None
+        self.changesets_collection = None
+        self.known_jobs = None
+        self.known_jobs_stats = {}
+        self._known_jobs_last_id = None
+        self._known_jobs_lock = threading.Lock()
+        # Retention of the TTL index as of connect, kept current by ensure_ttl_index/drop_ttl_index
+        self.ttl_days = None
         self.connect()
-        self.setup_indexes()
 
     def connect(self):
         """Connect to database"""
         try:
-            self.client = MongoClient(
-                config.MONGODB_URI,
-                serverSelectionTimeoutMS=5000  # 5 seconds timeout
-            )
+            self.client = MongoClient(config.MONGODB_URI, **client_options())
 
             # Test connection
             self.client.server_info()
 
             self.db = self.client[config.DATABASE_NAME]
             self.jobs_collection = self.db[config.JOBS_COLLECTION]
+            self.watermarks_collection = self.db[config.WATERMARKS_COLLECTION]
+            self.stats_collection = self.db[config.STATS_COLLECTION]
+            self.outbox_collection = self.db[config.OUTBOX_COLLECTION]
+            self.counters_collection = self.db[config.COUNTERS_COLLECTION]
+            self.snapshots_collection = self.db[config.SNAPSHOTS_COLLECTION]
+            self.changesets_collection = self.db[config.CHANGESETS_COLLECTION]
 
             logger.info(f"Connected to database: {config.DATABASE_NAME}")
+            self.ensure_indexes()
 
         except Exception as e:
             logger.error(f"Failed to connect to MongoDB: {e}")
             raise
 
+    def ensure_indexes(self):
+        """Create the indexes if a fresh deployment lacks them (once per process, on connect)
+
+        Costs one listIndexes round-trip, which also tells whether a TTL
+        index expires jobs; setup_indexes only runs when the unique job_id
+        index or the text index is missing.
+        """
+        try:
+            existing = self.jobs_collection.index_information()
+        except Exception as e:
+            logger.error(f"Failed to list indexes: {e}")
+            return
+        self.ttl_days = self._ttl_days_of(existing.get(TTL_INDEX_NAME))
+        if "job_id_unique" in existing and job_search.TEXT_INDEX_NAME in existing:
+            return
+        logger.info("Job indexes missing, creating them")
+        self.setup_indexes()
+
     def setup_indexes(self):
-        """Create necessary indexes for efficient queries"""
+        """Create necessary indexes for efficient queries (idempotent, also run by scripts/setup_db.py)"""
         try:
             self.jobs_collection.create_index(
                 "job_id",
@@ -62,17 +120,49 @@ class JobDatabase:
                 name="location_date_index"
             )
 
+            # Keyset pagination order: newest first, job_id breaks ties
+            self.jobs_collection.create_index(
+                [("scraped_date", DESCENDING), ("job_id", DESCENDING)],
+                name="scraped_date_job_id_desc"
+            )
+
+            # Normalized location fields used by get_jobs_by_location
+            self.jobs_collection.create_index(
+                [("location_tokens", ASCENDING), ("scraped_date", DESCENDING), ("job_id", DESCENDING)],
+                name="location_tokens_date_index"
+            )
+
+            self.jobs_collection.create_index(
+                [("location_norm", ASCENDING), ("scraped_date", DESCENDING), ("job_id", DESCENDING)],
+                name="location_norm_date_index"
+            )
+
+            # Keyword search (search_jobs), title matches rank highest
+            self.jobs_collection.create_index(
+                job_search.text_index_spec(),
+                weights=job_search.TEXT_WEIGHTS,
+                default_language="english",
+                name=job_search.TEXT_INDEX_NAME
+            )
+
+            # Outbox trimming by age (delete_old_jobs.py)
+            self.outbox_collection.create_index("created_at", name="outbox_created_at")
+            
+            # Changesets by time range, parts in order
+            self.changesets_collection.create_index(
+                [("created_at", ASCENDING), ("changeset_id", ASCENDING), ("part", ASCENDING)],
+                name="changeset_created_at"
+            )
+
             logger.info("Indexes created successfully")
         except Exception as e:
             logger.error(f"Failed to create indexes: {e}")
             
-    def generate_job_id(self, company_name: str, job_title: str, location: str) -> str:
-        """Generate unique job ID using hash"""
-        content = f"{company_name.lower().strip()}_{job_title.lower().strip()}_{location.lower().strip()}"
-        return hashlib.md5(content.encode()).hexdigest()[:16]
-    
     def job_exists(self, job_id: str) -> bool:
         """Check if job already exists in database"""
+        # Not in the known-jobs filter means definitely not stored
+        if self.known_jobs is not None and job_id not in self.known_jobs:
+            return False
         try:
             # count_documents with limit=1 is much faster than find_one
             return self.jobs_collection.count_documents({"job_id": job_id}, limit=1) > 0
@@ -80,27 +170,26 @@ class JobDatabase:
             logger.error(f"Error checking job existence: {e}")
             return False
         
+    @staticmethod
+    def location_query(location: str, prefix: bool = False) -> Dict[str, Any]:
+        """Index-backed filter for a location search
+
+        A single place ("Pune", "new delhi") matches a location token
+        exactly, or as a prefix. A comma-separated location ("Pune,
+        Maharashtra") matches the start of the full normalized location.
+        """
+        normalized = JobDatabase.normalize_location(location)["location_norm"]
+        if "," in normalized:
+            return {"location_norm": {"$regex": f"^{re.escape(normalized)}"}}
+        if prefix:
+            return {"location_tokens": {"$regex": f"^{re.escape(normalized)}"}}
+        return {"location_tokens": normalized}
+
     def insert_job(self, job_data: Dict[str, Any]) -> bool:
         """Insert a single job into database"""
         try:
-            # Create job_id if not present
-            if "job_id" not in job_data:
-                job_data["job_id"] = self.generate_job_id(
-                    job_data['company_name'],
-                    job_data['job_title'],  
-                    job_data['location']
-                )
-
-            # Add scraped date if not present
-            if "scraped_date" not in job_data:
-                job_data["scraped_date"] = datetime.now(timezone.utc)
-
-            # Validate required fields
-            required_fields = ["job_id", "company_name", "job_title", "location", "job_link", "scraped_date"]
-            for field in required_fields:
-                if field not in job_data or not job_data[field]:
-                    logger.error(f"Missing required field: {field} in job data")
-                    return False
+            if not self._prepare_job(job_data):
+                return False
                 
             # Check if job already exists
             if self.job_exists(job_data["job_id"]):
@@ -114,49 +203,404 @@ class JobDatabase:
             
             # Insert new job
             self.jobs_collection.insert_one(job_data)
+            self._update_stats([job_data], 1)
+            self._record_outbox([job_data])
             logger.info(f"Inserted new job: {job_data['job_id']}")
             return True
         except Exception as e:
             logger.error(f"Error inserting job: {e}")
             return False
         
-    def insert_jobs_batch(self, jobs: List[Dict[str, Any]]) -> Dict[str, int]:
-        """Insert multiple jobs in batch"""
-        stats = {"inserted": 0, "skipped": 0, "failed": 0}  # Removed "updated", added "failed"
+    def insert_jobs_batch(self, jobs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Insert multiple jobs with one unordered bulk write
+
+        Each job is an upsert on job_id whose fields are only written on
+        insert, so existing jobs keep their original scraped_date. The
+        job_ids of jobs that could not be stored are listed in
+        "failed_job_ids" and those of newly inserted jobs in
+        "inserted_job_ids"; "db_error" is set when the write as a whole
+        failed (database unreachable) rather than single jobs.
+        """
+        stats = {"inserted": 0, "skipped": 0, "failed": 0, "failed_job_ids": [], "inserted_job_ids": []}
+        batch_jobs = self._prepare_batch(jobs, stats)
+        job_ids = list(batch_jobs)
+        
+        # Jobs the filter already knows are verified with one query and not written
+        if self.known_jobs is not None and job_ids:
+            existing = self._existing_job_ids(job_ids)
+            stats["skipped"] += len(existing)
+            job_ids = [job_id for job_id in job_ids if job_id not in existing]
+        
+        if not job_ids:
+            return stats
+        
+        inserted_job_ids = []
+        try:
+            result = self.jobs_collection.bulk_write(self._upsert_operations(batch_jobs, job_ids), ordered=False)
+            inserted_job_ids = self._count_bulk_result(stats, job_ids, result=result)
+        except BulkWriteError as e:
+            inserted_job_ids = self._count_bulk_result(stats, job_ids, error=e)
+        except Exception as e:
+            logger.error(f"Error writing job batch: {e}")
+            stats["failed"] += len(job_ids)
+            stats["failed_job_ids"].extend(job_ids)
+            stats["db_error"] = str(e)
+        stats["inserted_job_ids"] = inserted_job_ids
+        self._update_stats([batch_jobs[job_id] for job_id in inserted_job_ids], 1)
+        self._record_outbox([batch_jobs[job_id] for job_id in inserted_job_ids])
+        
+        if self.known_jobs is not None:
+            failed = set(stats["failed_job_ids"])
+            for job_id in job_ids:
+                if job_id not in failed:
+                    self.known_jobs.add(job_id)
         
-        for job in jobs:
+        logger.info(f"Job batch: {stats['inserted']} inserted, {stats['skipped']} already present, "
+                    f"{stats['failed']} failed")
+        return stats
+    
+    @staticmethod
+    def _upsert_operations(batch_jobs: Dict[str, Dict[str, Any]], job_ids: List[str]) -> List[UpdateOne]:
+        """Insert-only upserts keyed on job_id"""
+        operations = []
+        for job_id in job_ids:
+            fields = {key: value for key, value in batch_jobs[job_id].items() if key not in ("_id", "job_id")}
+            operations.append(UpdateOne({"job_id": job_id}, {"$setOnInsert": fields}, upsert=True))
+        return operations
+    
+    @staticmethod
+    def _count_bulk_result(stats: Dict[str, Any], job_ids: List[str], result=None,
+                           error: Optional[BulkWriteError] = None) -> List[str]:
+        """Add a bulk write's outcome to inserted/skipped/failed, return the inserted job_ids"""
+        if result is not None:
+            stats["inserted"] += result.upserted_count
+            stats["skipped"] += result.matched_count
+            return [job_ids[index] for index in (result.upserted_ids or {})]
+        
+        details = error.details
+        stats["inserted"] += details.get("nUpserted", 0)
+        stats["skipped"] += details.get("nMatched", 0)
+        for write_error in details.get("writeErrors", []):
+            # A concurrent writer inserted the same job first
+            if write_error.get("code") == 11000:
+                stats["skipped"] += 1
+                continue
+            logger.error(f"Error inserting job in batch: {write_error.get('errmsg')}")
+            stats["failed"] += 1
+            stats["failed_job_ids"].append(job_ids[write_error["index"]])
+        return [job_ids[upserted["index"]] for upserted in details.get("upserted", [])]
+    
+    def _update_stats(self, jobs: List[Dict[str, Any]], sign: int):
+        """Add inserted (sign=1) or deleted (sign=-1) jobs to the materialized stats"""
+        if not jobs:
+            return
+        try:
+            self.stats_collection.update_one(
+                {"_id": job_stats.STATS_ID}, job_stats.stats_update(jobs, sign), upsert=True
+            )
+        except Exception as e:
+            # Stats drift until the next rebuild, the jobs themselves are fine
+            logger.error(f"Error updating job stats: {e}")
+    
+    def _record_outbox(self, jobs: List[Dict[str, Any]]):
+        """Append newly inserted jobs to the outbox under consecutive sequence numbers
+
+        Written after the jobs, outside a transaction (those need a replica
+        set), so delivery is at most once: if this fails the jobs stay
+        stored but never reach the outbox, and inserting them again is a
+        skip that records nothing. Numbers taken by a failed write leave a
+        gap that readers step over after OUTBOX_GAP_SECONDS. Consumers that
+        must see every job reconcile with changesets or get_recent_jobs_page.
+        The SQLite backend writes the outbox in the job's transaction.
+        """
+        if not config.OUTBOX_ENABLED or not jobs:
+            return
+        try:
+            counter = self.counters_collection.find_one_and_update(
+                {"_id": job_outbox.OUTBOX_COUNTER_ID},
+                job_outbox.reserve_update(len(jobs)),
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+            self.outbox_collection.insert_many(job_outbox.reserved_entries(jobs, counter), ordered=False)
+        except Exception as e:
+            # Consumers miss these jobs in the feed, the jobs themselves are stored
+            logger.error(f"Error recording jobs in the outbox: {e}")
+    
+    def read_outbox(self, after_seq: int = 0, limit: int = 100) -> Dict[str, Any]:
+        """New jobs recorded after sequence number `after_seq`, oldest first
+
+        Returns {"entries": [...], "next_seq": n}; pass next_seq back as
+        after_seq to continue. Each entry has its seq, created_at and the
+        job's job_outbox.ENTRY_FIELDS.
+        """
+        docs = self.outbox_collection.find({"_id": {"$gt": after_seq}}).sort("_id", ASCENDING).limit(limit)
+        entries = [dict(doc, seq=doc.pop("_id")) for doc in docs]
+        return job_outbox.read_result(
+            job_outbox.contiguous(entries, after_seq, config.OUTBOX_GAP_SECONDS), after_seq
+        )
+    
+    def get_outbox_seq(self) -> int:
+        """Sequence number of the newest outbox entry (0 when empty)"""
+        counter = self.counters_collection.find_one({"_id": job_outbox.OUTBOX_COUNTER_ID})
+        return counter["seq"] if counter else 0
+    
+    def trim_outbox(self, before: datetime) -> int:
+        """Drop outbox entries recorded before `before`"""
+        return self.outbox_collection.delete_many({"created_at": {"$lt": before}}).deleted_count
+    
+    def watch_new_jobs(self, resume_token=None) -> Iterator[Dict[str, Any]]:
+        """Tail inserted jobs with a change stream (needs a replica set, as on Atlas)
+
+        Yields {"job": document, "resume_token": token}; pass the last token
+        back to carry on after a restart without missing inserts.
+        """
+        pipeline = [{"$match": {"operationType": "insert"}}]
+        with self.jobs_collection.watch(pipeline, resume_after=resume_token) as stream:
+            for change in stream:
+                yield {"job": change["fullDocument"], "resume_token": change["_id"]}
+    
+    def count_jobs(self, query: Dict[str, Any], limit: int = 0) -> int:
+        """Number of jobs matching a query, stopping at `limit` when given"""
+        options = {"limit": limit} if limit else {}
+        return self.jobs_collection.count_documents(query, **options)
+    
+    def delete_jobs(self, query: Dict[str, Any], batch_size: int = 1000, pause_seconds: float = 0,
+                    progress: Optional[Callable[[int, int, int], None]] = None, archive=None,
+                    removed: Optional[List[str]] = None) -> int:
+        """Delete matching jobs in bounded _id batches, keeping the materialized stats in step
+
+        Walks the matches in _id order, so each chunk is a short range read
+        plus one delete. pause_seconds between chunks leaves room for other
+        readers; progress(chunk, deleted_in_chunk, deleted_total) is called
+        after every chunk. With a JobArchive, each chunk is written to the
+        archive before it is deleted. The job_ids of deleted jobs are
+        appended to `removed` when a list is given.
+        
+        delete_many only reports a count, so a chunk that lost some of its
+        jobs to another deleter between the read and the delete cannot say
+        which ones this call removed. Such a chunk is left out of `removed`
+        and the stats are recounted once the walk is done.
+        """
+        if archive is not None:
+            fields = None
+        else:
+            fields = {"_id": 1, "job_id": 1, "scraped_date": 1,
+                      **{field: 1 for field in job_stats.DIMENSIONS.values()}}
+        deleted = 0
+        chunk = 0
+        last_id = None
+        recount = False
+        while True:
+            chunk_query = {"$and": [query, {"_id": {"$gt": last_id}}]} if last_id else query
+            docs = list(self.jobs_collection.find(chunk_query, fields).sort("_id", ASCENDING).limit(batch_size))
+            if not docs:
+                break
+            last_id = docs[-1]["_id"]
+            if archive is not None:
+                archive.write(docs)
+            
+            result = self.jobs_collection.delete_many({"_id": {"$in": [doc["_id"] for doc in docs]}})
+            deleted += result.deleted_count
+            if result.deleted_count == len(docs):
+                self._update_stats(docs, -1)
+                if removed is not None:
+                    removed.extend(doc["job_id"] for doc in docs)
+            else:
+                logger.warning(f"{len(docs) - result.deleted_count} of {len(docs)} jobs in chunk {chunk + 1} "
+                               f"were deleted elsewhere, its job_ids are not recorded")
+                recount = True
+            
+            chunk += 1
+            if progress:
+                progress(chunk, result.deleted_count, deleted)
+            if len(docs) < batch_size:
+                break
+            if pause_seconds:
+                time.sleep(pause_seconds)
+        
+        if recount:
+            self.rebuild_stats()
+        return deleted
+    
+    @staticmethod
+    def _ttl_days_of(index: Optional[Dict[str, Any]]) -> Optional[float]:
+        return index["expireAfterSeconds"] / 86400 if index else None
+    
+    def get_ttl_days(self) -> Optional[float]:
+        """Retention of the scraped_date TTL index in days, None without one (asks the server)"""
+        self.ttl_days = None
+        for index in self.jobs_collection.list_indexes():
+            if index["name"] == TTL_INDEX_NAME:
+                self.ttl_days = self._ttl_days_of(index)
+        return self.ttl_days
+    
+    def ensure_ttl_index(self, days: int) -> bool:
+        """Let MongoDB expire jobs `days` after scraped_date, return True if anything changed"""
+        seconds = int(days * 86400)
+        current = self.get_ttl_days()
+        if current is None:
+            self.jobs_collection.create_index(
+                [("scraped_date", ASCENDING)],
+                name=TTL_INDEX_NAME,
+                expireAfterSeconds=seconds
+            )
+            self.ttl_days = seconds / 86400
+            logger.info(f"Created TTL index: jobs expire {days} days after scraped_date")
+            return True
+        if int(current * 86400) != seconds:
+            self.db.command("collMod", self.jobs_collection.name,
+                            index={"name": TTL_INDEX_NAME, "expireAfterSeconds": seconds})
+            self.ttl_days = seconds / 86400
+            logger.info(f"TTL index retention changed from {current:g} to {days} days")
+            return True
+        return False
+    
+    def drop_ttl_index(self) -> bool:
+        """Stop background expiry, return True if a TTL index was dropped"""
+        if self.get_ttl_days() is None:
+            return False
+        self.jobs_collection.drop_index(TTL_INDEX_NAME)
+        self.ttl_days = None
+        logger.info("Dropped TTL index")
+        return True
+    
+    def rebuild_stats(self) -> Dict[str, Any]:
+        """Recompute the materialized stats from the jobs collection"""
+        facets = next(self.jobs_collection.aggregate(job_stats.rebuild_pipeline(), allowDiskUse=True))
+        doc = job_stats.document_from_facets(facets)
+        doc["updated_at"] = datetime.now(timezone.utc)
+        doc["rebuilt_at"] = doc["updated_at"]
+        self.stats_collection.replace_one({"_id": job_stats.STATS_ID}, doc, upsert=True)
+        logger.info(f"Job stats rebuilt: {doc['total']} jobs")
+        return doc
+    
+    def _existing_job_ids(self, job_ids: List[str]) -> set:
+        """Of a batch's job_ids, those stored already (possible filter hits checked with one $in query)"""
+        possible = [job_id for job_id in job_ids if job_id in self.known_jobs]
+        self._count_known_jobs(checked=len(job_ids), definitely_new=len(job_ids) - len(possible),
+                               possible_hits=len(possible))
+        if not possible:
+            return set()
+        
+        try:
+            existing = {doc["job_id"] for doc in self.jobs_collection.find(
+                {"job_id": {"$in": possible}}, {"_id": 0, "job_id": 1}
+            )}
+        except Exception as e:
+            # Fall back to the upsert, which is safe for existing jobs too
+            logger.error(f"Error verifying known jobs: {e}")
+            return set()
+        self._count_known_jobs(false_positives=len(possible) - len(existing))
+        return existing
+    
+    def _count_known_jobs(self, **counts):
+        # Pipeline persist workers share these counters
+        with self._known_jobs_lock:
+            for key, value in counts.items():
+                self.known_jobs_stats[key] += value
+    
+    def load_known_jobs(self, path: Optional[str] = None) -> BloomFilter:
+        """Load the known-jobs filter from disk and refresh it, or build it from the collection
+
+        A saved filter only scans jobs inserted after it was saved. It is
+        rebuilt when the collection outgrew it past twice the target false
+        positive rate.
+        """
+        path = path or config.KNOWN_JOBS_FILTER_PATH
+        target_fp_rate = config.KNOWN_JOBS_FILTER_FP_RATE
+        bloom = None
+        
+        if os.path.exists(path):
             try:
-                job_id = job.get('job_id')
-                if not job_id:
-                    job_id = self.generate_job_id(
-                        job.get('company_name', ''),
-                        job.get('job_title', ''),
-                        job.get('location', '')
-                    )
-                    job['job_id'] = job_id
-                
-                # NEW: Check if exists FIRST, before calling insert_job
-                if self.job_exists(job_id):
-                    stats["skipped"] += 1
-                    logger.debug(f"Job already exists, skipping: {job_id}")
-                else:
-                    # Job doesn't exist, try to insert
-                    if self.insert_job(job):
-                        stats["inserted"] += 1
-                    else:
-                        stats["failed"] += 1  # NEW: Track actual failures
-                        
+                bloom, header = BloomFilter.load(path)
+                last_id = header.get("last_id")
+                self._known_jobs_last_id = ObjectId(last_id) if last_id else None
+                refreshed = self._scan_job_ids(bloom, self._known_jobs_last_id)
+                logger.info(f"Loaded known-jobs filter from {path} ({refreshed} new job_ids added)")
+                if bloom.expected_fp_rate() > 2 * target_fp_rate:
+                    logger.info("Known-jobs filter is over capacity, rebuilding")
+                    bloom = None
             except Exception as e:
-                logger.error(f"Error processing job in batch: {e}")
-                stats["failed"] += 1  # CHANGED: failures are failures, not skips
+                logger.warning(f"Failed to load known-jobs filter, rebuilding: {e}")
+                bloom = None
         
-        return stats
+        if bloom is None:
+            total = self.jobs_collection.estimated_document_count()
+            capacity = config.KNOWN_JOBS_FILTER_CAPACITY or max(2 * total, 100000)
+            bloom = BloomFilter.for_capacity(capacity, target_fp_rate,
+                                             int(config.KNOWN_JOBS_FILTER_MAX_MB * 1024 * 1024))
+            self._known_jobs_last_id = None
+            added = self._scan_job_ids(bloom, None)
+            logger.info(f"Built known-jobs filter from {added} job_ids")
+        
+        self.known_jobs = bloom
+        self.known_jobs_stats = {"checked": 0, "definitely_new": 0, "possible_hits": 0, "false_positives": 0}
+        self._known_jobs_path = path
+        return bloom
+    
+    def _scan_job_ids(self, bloom: BloomFilter, after_id) -> int:
+        """Add job_ids of jobs with _id after `after_id` (all when None) to the filter"""
+        query = {"_id": {"$gt": after_id}} if after_id else {}
+        scanned = 0
+        cursor = self.jobs_collection.find(query, {"_id": 1, "job_id": 1}).sort("_id", ASCENDING)
+        for doc in cursor.batch_size(10000):
+            if doc.get("job_id"):
+                bloom.add(doc["job_id"])
+            self._known_jobs_last_id = doc["_id"]
+            scanned += 1
+        return scanned
+    
+    def save_known_jobs(self):
+        """Persist the known-jobs filter so the next run only refreshes it"""
+        if self.known_jobs is None:
+            return
+        try:
+            last_id = str(self._known_jobs_last_id) if self._known_jobs_last_id else None
+            self.known_jobs.save(self._known_jobs_path, {"last_id": last_id})
+        except Exception as e:
+            logger.warning(f"Failed to save known-jobs filter: {e}")
+    
+    def get_known_jobs_report(self) -> Dict[str, Any]:
+        """Size, fill and hit statistics of the known-jobs filter"""
+        if self.known_jobs is None:
+            return {}
+        return {
+            "items": self.known_jobs.count,
+            "size_bytes": self.known_jobs.size_bytes,
+            "hash_functions": self.known_jobs.num_hashes,
+            "target_fp_rate": config.KNOWN_JOBS_FILTER_FP_RATE,
+            "expected_fp_rate": round(self.known_jobs.expected_fp_rate(), 6),
+            **self.known_jobs_stats
+        }
+    
+    def get_watermark(self, role: str, location: str) -> Optional[Dict[str, Any]]:
+        """Get the incremental scraping watermark for a role/location search"""
+        try:
+            return self.watermarks_collection.find_one({"_id": f"{role}|{location}"})
+        except Exception as e:
+            logger.error(f"Error getting watermark: {e}")
+            return None
     
-    def get_jobs_by_location(self, location: str, limit: int = 100) -> List[Dict[str, Any]]:
-        """Get jobs filtered by location"""
+    def save_watermark(self, role: str, location: str, watermark: Dict[str, Any]) -> bool:
+        """Store the incremental scraping watermark for a role/location search"""
+        try:
+            watermark = dict(watermark, updated_at=datetime.now(timezone.utc))
+            self.watermarks_collection.update_one(
+                {"_id": f"{role}|{location}"},
+                {"$set": watermark},
+                upsert=True
+            )
+            return True
+        except Exception as e:
+            logger.error(f"Error saving watermark: {e}")
+            return False
+    
+    def get_jobs_by_location(self, location: str, limit: int = 100, prefix: bool = False) -> List[Dict[str, Any]]:
+        """Get jobs filtered by location (see location_query)"""
         try:
             jobs = list(self.jobs_collection.find(
-                {"location": {"$regex": location, "$options": "i"}},
+                self.location_query(location, prefix),
                 {"_id": 0}  # Exclude MongoDB _id field
             ).sort("scraped_date", DESCENDING).limit(limit))
             
@@ -166,6 +610,31 @@ class JobDatabase:
             return []
         
     
+    def backfill_location_fields(self, batch_size: int = 1000) -> int:
+        """Add location_norm/location_tokens to jobs stored before they existed"""
+        updated = 0
+        operations = []
+        try:
+            cursor = self.jobs_collection.find(
+                {"location_norm": {"$exists": False}}, {"_id": 1, "location": 1}
+            ).batch_size(batch_size)
+            for doc in cursor:
+                operations.append(UpdateOne(
+                    {"_id": doc["_id"]},
+                    {"$set": self.normalize_location(doc.get("location") or "")}
+                ))
+                if len(operations) >= batch_size:
+                    updated += self.jobs_collection.bulk_write(operations, ordered=False).modified_count
+                    operations = []
+                    logger.info(f"Location backfill: {updated} jobs updated")
+            if operations:
+                updated += self.jobs_collection.bulk_write(operations, ordered=False).modified_count
+        except Exception as e:
+            logger.error(f"Error backfilling location fields: {e}")
+        
+        logger.info(f"Location backfill completed: {updated} jobs updated")
+        return updated
+    
     def get_recent_jobs(self, days: int = 7, limit: int = 100) -> List[Dict[str, Any]]:
         """Get recent jobs within specified days"""
         try:
@@ -181,36 +650,160 @@ class JobDatabase:
             logger.error(f"Error getting recent jobs: {e}")
             return []    
         
+    @staticmethod
+    def keyset_query(query: Dict[str, Any], cursor: Optional[str]) -> Dict[str, Any]:
+        """Restrict a query to jobs after the cursor position in PAGE_SORT order"""
+        if not cursor:
+            return query
+        position = JobDatabase.decode_cursor(cursor)
+        after = {"$or": [
+            {"scraped_date": {"$lt": position["scraped_date"]}},
+            {"scraped_date": position["scraped_date"], "job_id": {"$lt": position["job_id"]}}
+        ]}
+        return {"$and": [query, after]} if query else after
+    
+    def _get_page(self, query: Dict[str, Any], page_size: int, cursor: Optional[str]) -> Dict[str, Any]:
+        """One keyset page: {"jobs": [...], "next_cursor": token or None}"""
+        # One extra document tells whether another page follows
+        jobs = list(self.jobs_collection.find(
+            self.keyset_query(query, cursor), {"_id": 0}
+        ).sort(PAGE_SORT).limit(page_size + 1))
+        
+        next_cursor = None
+        if len(jobs) > page_size:
+            jobs = jobs[:page_size]
+            next_cursor = self.encode_cursor(jobs[-1])
+        return {"jobs": jobs, "next_cursor": next_cursor}
+    
+    def _iter_pages(self, query: Dict[str, Any], batch_size: int) -> Iterator[Dict[str, Any]]:
+        """Stream every matching job, one keyset page at a time"""
+        cursor = None
+        while True:
+            page = self._get_page(query, batch_size, cursor)
+            yield from page["jobs"]
+            cursor = page["next_cursor"]
+            if not cursor:
+                return
+    
+    def get_recent_jobs_page(self, days: int = 7, page_size: int = 100,
+                             cursor: Optional[str] = None) -> Dict[str, Any]:
+        """Page of recent jobs; pass the returned next_cursor to get the following page"""
+        cutoff_date = datetime.now(timezone.utc) - timedelta(days=days)
+        return self._get_page({"scraped_date": {"$gte": cutoff_date}}, page_size, cursor)
+    
+    def get_jobs_by_location_page(self, location: str, page_size: int = 100, cursor: Optional[str] = None,
+                                  prefix: bool = False) -> Dict[str, Any]:
+        """Page of jobs for a location; pass the returned next_cursor to get the following page"""
+        return self._get_page(self.location_query(location, prefix), page_size, cursor)
+    
+    def iter_recent_jobs(self, days: int = 7, batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """Stream recent jobs, newest first, fetched in keyset batches"""
+        cutoff_date = datetime.now(timezone.utc) - timedelta(days=days)
+        return self._iter_pages({"scraped_date": {"$gte": cutoff_date}}, batch_size)
+    
+    def iter_jobs_by_location(self, location: str, batch_size: int = 500,
+                              prefix: bool = False) -> Iterator[Dict[str, Any]]:
+        """Stream jobs for a location, newest first, fetched in keyset batches"""
+        return self._iter_pages(self.location_query(location, prefix), batch_size)
+    
+    def search_jobs(self, text: Optional[str] = None, location: Optional[str] = None,
+                    link_type=None, job_type=None, role=None, page: int = 1,
+                    page_size: int = 20, facet_limit: int = 20) -> Dict[str, Any]:
+        """Keyword search over job_title, company_name and description
+
+        Hits are ranked by text score (title weighted highest), then newest
+        first, and paged by page number. Facet counts for location,
+        link_type and job_type cover every hit, not just the page:
+        {"jobs", "total", "page", "page_size", "pages", "facets"}.
+        """
+        page = max(1, page)
+        match = job_search.search_match(
+            text, self.location_query(location) if location else None,
+            link_type=link_type, job_type=job_type, role=role
+        )
+        try:
+            ranked = bool(text and text.strip())
+            pipeline = job_search.search_pipeline(match, ranked, page, page_size, facet_limit)
+            facets = next(self.jobs_collection.aggregate(pipeline))
+            return job_search.search_result(facets, page, page_size)
+        except Exception as e:
+            logger.error(f"Error searching jobs: {e}")
+            return job_search.empty_result(page, page_size)
+    
     def get_database_stats(self) -> Dict[str, Any]:
-        """Get database statistics"""
+        """Get database statistics from the materialized stats document
+
+        While a TTL index expires jobs in the background nothing decrements
+        the counters, so a read rebuilds them once they are older than
+        STATS_MAX_AGE_SECONDS (delete_old_jobs.py rebuilds them as well).
+        """
         try:
-            total_jobs = self.jobs_collection.count_documents({})
-            
-            # Get location distribution
-            location_pipeline = [
-                {"$group": {"_id": "$location", "count": {"$sum": 1}}},
-                {"$sort": {"count": -1}},
-                {"$limit": 10}
-            ]
-            location_stats = list(self.jobs_collection.aggregate(location_pipeline))
-            
-            # Get recent jobs count (last 7 days)
-            recent_cutoff = datetime.now(timezone.utc) - timedelta(days=7)
-            recent_jobs = self.jobs_collection.count_documents({
-                "scraped_date": {"$gte": recent_cutoff}
-            })
-            
-            return {
-                "total_jobs": total_jobs,
-                "recent_jobs_7d": recent_jobs,
-                "top_locations": location_stats,
-                "last_updated": datetime.now(timezone.utc).isoformat()
-            }
+            doc = self.stats_collection.find_one({"_id": job_stats.STATS_ID})
+            if doc is None:
+                logger.info("Job stats not materialized yet, building them")
+                doc = self.rebuild_stats()
+            elif self.ttl_days is not None and job_stats.is_stale(doc, config.STATS_MAX_AGE_SECONDS):
+                logger.info("Job stats predate jobs the TTL index may have expired, rebuilding them")
+                doc = self.rebuild_stats()
+            return job_stats.stats_report(doc)
             
         except Exception as e:
             logger.error(f"Error getting database stats: {e}")
             return {}
         
+    def save_changeset(self, parts: List[Dict[str, Any]]) -> bool:
+        """Store the parts of one changeset (see common.job_changesets.changeset_parts)"""
+        try:
+            self.changesets_collection.insert_many(parts, ordered=False)
+            return True
+        except Exception as e:
+            logger.error(f"Error saving changeset: {e}")
+            return False
+    
+    def get_changesets(self, since: datetime, until: Optional[datetime] = None,
+                       kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Changesets created in [since, until), oldest first, optionally only one kind ("scrape", "purge")"""
+        created_at = {"$gte": since}
+        if until is not None:
+            created_at["$lt"] = until
+        query = {"created_at": created_at}
+        if kind:
+            query["kind"] = kind
+        try:
+            parts = list(self.changesets_collection.find(query).sort(
+                [("created_at", ASCENDING), ("changeset_id", ASCENDING), ("part", ASCENDING)]
+            ))
+            return job_changesets.merge_parts(parts)
+        except Exception as e:
+            logger.error(f"Error getting changesets: {e}")
+            return []
+    
+    def trim_changesets(self, before: datetime) -> int:
+        """Drop changesets created before `before`"""
+        return self.changesets_collection.delete_many({"created_at": {"$lt": before}}).deleted_count
+    
+    def save_feed_snapshots(self, feeds: List[Dict[str, Any]]) -> int:
+        """Replace the stored feed snapshots with `feeds` (see common.job_feeds.build_feeds)
+
+        Feeds not in the new set (a role that was dropped) are removed.
+        """
+        if not feeds:
+            return 0
+        self.snapshots_collection.bulk_write(
+            [ReplaceOne({"_id": feed["_id"]}, feed, upsert=True) for feed in feeds], ordered=False
+        )
+        self.snapshots_collection.delete_many({"_id": {"$nin": [feed["_id"] for feed in feeds]}})
+        return len(feeds)
+    
+    def get_feed_snapshot(self, key: str) -> Optional[Dict[str, Any]]:
+        """One prebuilt feed by key ("overall", "location:india", "role:data-scientist")"""
+        try:
+            feed = self.snapshots_collection.find_one({"_id": key})
+            return dict(feed, key=feed.pop("_id")) if feed else None
+        except Exception as e:
+            logger.error(f"Error getting feed snapshot: {e}")
+            return None
+        
     def close_connection(self):
         """Close database connection"""
         if self.client:
@@ -219,12 +812,50 @@ class JobDatabase:
 
 _db_instance = None
 
-def get_db():
-    """Get or create single database instance (Singleton pattern)"""
+def get_db() -> JobStorage:
+    """Get or create single database instance (Singleton pattern) on the configured backend"""
     global _db_instance
     if _db_instance is None:
-        _db_instance = JobDatabase()
+        if config.STORAGE_BACKEND == 'sqlite':
+            from .sqlite_database import SQLiteJobDatabase
+            _db_instance = SQLiteJobDatabase()
+        else:
+            _db_instance = JobDatabase()
     return _db_instance
 
+def database_available() -> bool:
+    """Connect if not connected yet, False instead of raising when the database is unreachable"""
+    try:
+        get_db()
+        return True
+    except Exception as e:
+        logger.warning(f"Database unavailable: {e}")
+        return False
+
+def connected_db() -> Optional[JobStorage]:
+    """The job store if it is already connected, without trying to connect"""
+    return _db_instance
+
+class _LazyDatabase:
+    """Stand-in for the shared job store that connects on first real use
+
+    Importing modules that use `db` (or running --help) no longer opens a
+    database connection.
+    """
+
+    # Pure helper, no connection needed
+    generate_job_id = staticmethod(JobStorage.generate_job_id)
+
+    def __getattr__(self, name):
+        return getattr(get_db(), name)
+
+    def __setattr__(self, name, value):
+        setattr(get_db(), name, value)
+
+    def close_connection(self):
+        # Nothing to close if the database was never used
+        if _db_instance is not None:
+            _db_instance.close_connection()
+
 # For backward compatibility, keep this:
-db = get_db()
\ No newline at end of file
+db = _LazyDatabase()
\ No newline at end of file
@@ -0,0 +1,156 @@
+import gzip
+import json
+import logging
+import os
+import tempfile
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Iterator, Iterable, Union
+from .config import config
+from .job_stats import day_key
+
+logger = logging.getLogger(__name__)
+
+PARTITION_PREFIX = "scraped_date="
+PART_SUFFIX = ".ndjson.gz"
+
+DateLike = Union[str, datetime, None]
+
+def _to_day(value: DateLike) -> Optional[str]:
+    if value is None or isinstance(value, str):
+        return value
+    return day_key(value)
+
+def _encode(value: Any):
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.isoformat()
+    return str(value)
+
+class JobArchive:
+    """Cold storage for jobs removed from the hot collection
+
+    Jobs are kept as gzip-compressed NDJSON (one job per line) in one
+    directory per scrape day:
+
+        <root>/scraped_date=2025-01-31/part-<run>-<n>.ndjson.gz
+
+    Part files are written to a temporary name, fsynced and renamed, so a
+    part that exists is complete. Readers prune by partition before opening
+    any file.
+
+    Row-oriented gzip stands in for columnar files (Parquet with zstd):
+    those would need pyarrow, while this needs only the standard library
+    and stays readable with zcat and jq. Day partitions keep range reads
+    cheap; reads that filter on other fields decompress whole parts.
+    """
+
+    def __init__(self, root: Optional[str] = None, compresslevel: Optional[int] = None):
+        self.root = root or config.ARCHIVE_DIR
+        self.compresslevel = compresslevel or config.ARCHIVE_COMPRESSLEVEL
+        self.run_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S") + "-" + uuid.uuid4().hex[:6]
+        self._parts = 0
+
+    def write(self, jobs: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        """Append jobs as one new part file per scrape day, return jobs written per day"""
+        by_day = {}
+        for job in jobs:
+            scraped_date = job.get("scraped_date")
+            day = day_key(scraped_date) if isinstance(scraped_date, datetime) else "unknown"
+            by_day.setdefault(day, []).append(job)
+
+        for day, day_jobs in by_day.items():
+            self._write_part(day, day_jobs)
+        return {day: len(day_jobs) for day, day_jobs in by_day.items()}
+
+    def _write_part(self, day: str, jobs: List[Dict[str, Any]]):
+        directory = os.path.join(self.root, PARTITION_PREFIX + day)
+        os.makedirs(directory, exist_ok=True)
+        self._parts += 1
+        path = os.path.join(directory, f"part-{self.run_id}-{self._parts:05d}{PART_SUFFIX}")
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                with gzip.GzipFile(fileobj=f, mode='wb', compresslevel=self.compresslevel) as gz:
+                    for job in jobs:
+                        job = {key: value for key, value in job.items() if key != "_id"}
+                        gz.write(json.dumps(job, default=_encode, ensure_ascii=False).encode() + b'\n')
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def partitions(self, start: DateLike = None, end: DateLike = None) -> List[str]:
+        """Archived scrape days between start and end (inclusive), oldest first"""
+        if not os.path.isdir(self.root):
+            return []
+        start, end = _to_day(start), _to_day(end)
+        days = []
+        for name in os.listdir(self.root):
+            if not name.startswith(PARTITION_PREFIX):
+                continue
+            day = name[len(PARTITION_PREFIX):]
+            if (start and day < start) or (end and day > end):
+                continue
+            days.append(day)
+        return sorted(days)
+
+    def iter_jobs(self, start: DateLike = None, end: DateLike = None,
+                  filters: Optional[Dict[str, Any]] = None,
+                  fields: Optional[List[str]] = None) -> Iterator[Dict[str, Any]]:
+        """Stream archived jobs scraped between start and end (inclusive days)
+
+        filters holds field -> value equality matches (a list value matches
+        any of its items); fields limits the keys returned. scraped_date
+        comes back as a datetime.
+        """
+        filters = filters or {}
+        for day in self.partitions(start, end):
+            directory = os.path.join(self.root, PARTITION_PREFIX + day)
+            for name in sorted(os.listdir(directory)):
+                if not name.endswith(PART_SUFFIX):
+                    continue
+                with gzip.open(os.path.join(directory, name), 'rt', encoding='utf-8') as f:
+                    for line in f:
+                        job = json.loads(line)
+                        if not all(
+                            job.get(field) in value if isinstance(value, (list, tuple, set))
+                            else job.get(field) == value
+                            for field, value in filters.items()
+                        ):
+                            continue
+                        if isinstance(job.get("scraped_date"), str):
+                            job["scraped_date"] = datetime.fromisoformat(job["scraped_date"])
+                        if fields:
+                            job = {field: job[field] for field in fields if field in job}
+                        yield job
+
+    def count_jobs(self, start: DateLike = None, end: DateLike = None,
+                   filters: Optional[Dict[str, Any]] = None) -> int:
+        """Number of archived jobs matching iter_jobs' arguments"""
+        return sum(1 for _ in self.iter_jobs(start, end, filters, fields=["job_id"]))
+
+    def get_report(self) -> Dict[str, Any]:
+        """Partition count, date range, file count and size on disk"""
+        days = self.partitions()
+        files = 0
+        size = 0
+        for day in days:
+            directory = os.path.join(self.root, PARTITION_PREFIX + day)
+            for name in os.listdir(directory):
+                if name.endswith(PART_SUFFIX):
+                    files += 1
+                    size += os.path.getsize(os.path.join(directory, name))
+        return {
+            "root": self.root,
+            "partitions": len(days),
+            "first_day": days[0] if days else None,
+            "last_day": days[-1] if days else None,
+            "files": files,
+            "size_mb": round(size / (1024 * 1024), 2)
+        }
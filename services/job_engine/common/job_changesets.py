@@ -0,0 +1,85 @@
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional
+from .job_outbox import ENTRY_FIELDS
+
+logger = logging.getLogger(__name__)
+
+# Fields kept for each added job (the same as an outbox entry); removed jobs are just job_ids
+ADDED_FIELDS = ENTRY_FIELDS
+
+# Stored parts hold at most this many added + removed entries, far below the 16 MB document limit
+PART_SIZE = 5000
+
+def new_changeset_id(kind: str) -> str:
+    return f"{kind}_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+
+def added_entry(job: Dict[str, Any]) -> Dict[str, Any]:
+    return {field: job.get(field) for field in ADDED_FIELDS}
+
+def changeset_parts(changeset_id: str, kind: str, added: List[Dict[str, Any]], removed: List[str],
+                    session_id: Optional[str] = None, started_at: Optional[datetime] = None,
+                    part_size: int = PART_SIZE) -> List[Dict[str, Any]]:
+    """Documents storing one changeset, split into parts of at most part_size entries
+
+    Every part repeats the header (kind, session, times, totals); added
+    entries fill the first parts and removed job_ids the rest. An empty
+    changeset is still stored as one part, so quiet sessions show up too.
+    """
+    created_at = datetime.now(timezone.utc)
+    header = {
+        "changeset_id": changeset_id,
+        "kind": kind,
+        "session_id": session_id,
+        "started_at": started_at or created_at,
+        "created_at": created_at,
+        "added_count": len(added),
+        "removed_count": len(removed)
+    }
+    entries = [("added", entry) for entry in added] + [("removed", job_id) for job_id in removed]
+    chunks = [entries[start:start + part_size] for start in range(0, len(entries), part_size)] or [[]]
+
+    parts = []
+    for number, chunk in enumerate(chunks):
+        part = dict(header, _id=f"{changeset_id}:{number:04d}", part=number, parts=len(chunks),
+                    added=[], removed=[])
+        for side, entry in chunk:
+            part[side].append(entry)
+        parts.append(part)
+    return parts
+
+def merge_parts(parts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Changesets from their stored parts sorted by (created_at, changeset_id, part)
+
+    A changeset missing parts (a write that failed half way) is marked
+    "complete": False rather than dropped.
+    """
+    changesets = {}
+    for part in parts:
+        changeset = changesets.get(part["changeset_id"])
+        if changeset is None:
+            changeset = {key: value for key, value in part.items() if key not in ("_id", "part")}
+            changeset.update(added=[], removed=[], parts_read=0)
+            changesets[part["changeset_id"]] = changeset
+        changeset["added"].extend(part["added"])
+        changeset["removed"].extend(part["removed"])
+        changeset["parts_read"] += 1
+
+    result = []
+    for changeset in changesets.values():
+        changeset["complete"] = changeset.pop("parts_read") == changeset.pop("parts")
+        result.append(changeset)
+    return result
+
+def record_changeset(database, kind: str, added: List[Dict[str, Any]], removed: List[str],
+                     session_id: Optional[str] = None, started_at: Optional[datetime] = None) -> Dict[str, Any]:
+    """Store a changeset, return what a session summary keeps about it"""
+    changeset_id = new_changeset_id(kind)
+    try:
+        stored = database.save_changeset(changeset_parts(changeset_id, kind, added, removed, session_id, started_at))
+    except Exception as e:
+        # The database could not be reached at all (the session spooled its jobs)
+        logger.error(f"Error saving changeset {changeset_id}: {e}")
+        stored = False
+    return {"changeset_id": changeset_id, "added": len(added), "removed": len(removed), "stored": stored}
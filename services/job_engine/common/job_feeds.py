@@ -0,0 +1,124 @@
+import gzip
+import hashlib
+import json
+import os
+import re
+import tempfile
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Iterable
+from .storage import JobStorage
+
+# Key of the feed with the newest jobs overall; the others are "location:<slug>" and "role:<slug>"
+OVERALL_KEY = "overall"
+
+# Job fields kept in feed entries
+FEED_FIELDS = ("job_id", "job_title", "company_name", "location", "job_link", "link_type",
+               "job_type", "role", "scraped_date")
+
+FILE_SUFFIX = ".json.gz"
+
+def _slug(value: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", value.lower()).strip("-") or "unknown"
+
+def feed_key(kind: str, value: str) -> str:
+    """Snapshot key of a feed: feed_key("location", "New Delhi") -> "location:new-delhi" """
+    return f"{kind}:{_slug(value)}"
+
+def _encode(value: Any):
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.isoformat()
+    return str(value)
+
+def _location_matcher(location: str):
+    """Predicate matching jobs the way JobDatabase.location_query does (exact token, or
+    normalized prefix for comma-separated locations)"""
+    normalized = JobStorage.normalize_location(location)["location_norm"]
+    if "," in normalized:
+        return lambda job: (job.get("location_norm") or "").startswith(normalized)
+    return lambda job: normalized in (job.get("location_tokens") or ())
+
+def build_feeds(jobs: Iterable[Dict[str, Any]], locations: List[str], roles: List[str],
+                size: int) -> List[Dict[str, Any]]:
+    """Feed snapshot documents from jobs sorted newest first
+
+    One feed for everything, one per location and one per role, each with
+    at most `size` projected jobs. Reading stops once every feed is full.
+    """
+    built_at = datetime.now(timezone.utc)
+    feeds = {OVERALL_KEY: {"kind": "overall", "value": None, "match": lambda job: True}}
+    for location in locations:
+        feeds.setdefault(feed_key("location", location),
+                         {"kind": "location", "value": location, "match": _location_matcher(location)})
+    for role in roles:
+        feeds.setdefault(feed_key("role", role),
+                         {"kind": "role", "value": role, "match": lambda job, role=role: job.get("role") == role})
+    entries = {key: [] for key in feeds}
+    open_keys = set(feeds)
+
+    for job in jobs:
+        projected = None
+        for key in list(open_keys):
+            if not feeds[key]["match"](job):
+                continue
+            if projected is None:
+                projected = {field: job.get(field) for field in FEED_FIELDS}
+            entries[key].append(projected)
+            if len(entries[key]) >= size:
+                open_keys.discard(key)
+        if not open_keys:
+            break
+
+    built = [
+        {"_id": key, "kind": feed["kind"], "value": feed["value"], "built_at": built_at,
+         "count": len(entries[key]), "jobs": entries[key]}
+        for key, feed in feeds.items()
+    ]
+    digest = feeds_digest(built)
+    for feed in built:
+        feed["digest"] = digest
+    return built
+
+def feeds_digest(feeds: List[Dict[str, Any]]) -> str:
+    """Fingerprint of which jobs each feed lists; stored jobs never change, so equal means same feeds"""
+    content = [[feed["_id"], [job["job_id"] for job in feed["jobs"]]] for feed in feeds]
+    return hashlib.sha256(json.dumps(content, separators=(",", ":")).encode()).hexdigest()
+
+def feed_path(directory: str, key: str) -> str:
+    """Static file of a feed: <directory>/location/india.json.gz, <directory>/overall.json.gz"""
+    return os.path.join(directory, *key.split(":")) + FILE_SUFFIX
+
+def index_path(directory: str) -> str:
+    """Static file listing every feed"""
+    return os.path.join(directory, "index" + FILE_SUFFIX)
+
+def _write_gz(path: str, payload: Dict[str, Any]):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            with gzip.GzipFile(fileobj=f, mode='wb') as gz:
+                gz.write(json.dumps(payload, default=_encode, ensure_ascii=False,
+                                    separators=(",", ":")).encode())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def write_feed_files(feeds: List[Dict[str, Any]], directory: str) -> int:
+    """Write every feed as gzipped JSON plus an index.json.gz listing them, return files written"""
+    for feed in feeds:
+        payload = {key: value for key, value in feed.items() if key != "_id"}
+        _write_gz(feed_path(directory, feed["_id"]), dict(payload, key=feed["_id"]))
+
+    index = [
+        {"key": feed["_id"], "kind": feed["kind"], "value": feed["value"], "count": feed["count"],
+         "path": os.path.relpath(feed_path(directory, feed["_id"]), directory)}
+        for feed in feeds
+    ]
+    built_at = feeds[0]["built_at"] if feeds else datetime.now(timezone.utc)
+    _write_gz(index_path(directory), {"built_at": built_at, "feeds": index})
+    return len(feeds) + 1
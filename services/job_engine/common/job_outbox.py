@@ -0,0 +1,49 @@
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Any, List
+
+# Counter document (in the counters collection) handing out outbox sequence numbers
+OUTBOX_COUNTER_ID = "job_outbox"
+
+# Job fields copied into each outbox entry
+ENTRY_FIELDS = ("job_id", "job_title", "company_name", "location", "role", "link_type", "scraped_date")
+
+def _utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+def reserve_update(count: int) -> Dict[str, Any]:
+    """Counter update taking `count` sequence numbers (find_one_and_update, upsert, return AFTER)"""
+    return {"$inc": {"seq": count}}
+
+def reserved_entries(jobs: List[Dict[str, Any]], counter: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Outbox documents numbered with the sequence numbers reserve_update() just took"""
+    return outbox_entries(jobs, counter["seq"] - len(jobs) + 1)
+
+def outbox_entries(jobs: List[Dict[str, Any]], first_seq: int) -> List[Dict[str, Any]]:
+    """Outbox documents for newly inserted jobs, numbered from first_seq"""
+    now = datetime.now(timezone.utc)
+    return [
+        dict({field: job.get(field) for field in ENTRY_FIELDS}, _id=first_seq + offset, created_at=now)
+        for offset, job in enumerate(jobs)
+    ]
+
+def contiguous(entries: List[Dict[str, Any]], after_seq: int, gap_seconds: float) -> List[Dict[str, Any]]:
+    """Entries in sequence order up to the first gap that may still fill in
+
+    Writers take numbers before writing their entries, so a missing number
+    usually means a write still in flight; reading past it would skip that
+    entry for good. A gap is only stepped over once the entry after it is
+    older than gap_seconds (its writer died between the two steps).
+    """
+    settled_before = datetime.now(timezone.utc) - timedelta(seconds=gap_seconds)
+    readable = []
+    expected = after_seq + 1
+    for entry in entries:
+        if entry["seq"] != expected and _utc(entry["created_at"]) > settled_before:
+            break
+        readable.append(entry)
+        expected = entry["seq"] + 1
+    return readable
+
+def read_result(entries: List[Dict[str, Any]], after_seq: int) -> Dict[str, Any]:
+    """read_outbox() result: the entries and the offset to pass next time"""
+    return {"entries": entries, "next_seq": entries[-1]["seq"] if entries else after_seq}
@@ -0,0 +1,85 @@
+from typing import Dict, Any, List, Optional
+
+# Name and field weights of the collection's text index
+TEXT_INDEX_NAME = "job_text_index"
+TEXT_WEIGHTS = {
+    "job_title": 10,
+    "company_name": 5,
+    "description": 1
+}
+
+# Facet name -> job field
+FACETS = {
+    "location": "location",
+    "link_type": "link_type",
+    "job_type": "job_type"
+}
+
+def text_index_spec() -> List:
+    return [(field, "text") for field in TEXT_WEIGHTS]
+
+def search_pipeline(match: Dict[str, Any], ranked: bool, page: int, page_size: int,
+                    facet_limit: int = 20) -> List[Dict[str, Any]]:
+    """One aggregation returning a page of hits, the hit count and the facet counts
+
+    Ranked searches sort by text score, then newest first; without search
+    text jobs are just listed newest first.
+    """
+    sort = {"scraped_date": -1, "job_id": -1}
+    pipeline = [{"$match": match}]
+    if ranked:
+        pipeline.append({"$addFields": {"score": {"$meta": "textScore"}}})
+        sort = {"score": -1, **sort}
+
+    facets = {
+        "jobs": [
+            {"$sort": sort},
+            {"$skip": max(0, page - 1) * page_size},
+            {"$limit": page_size},
+            {"$project": {"_id": 0}}
+        ],
+        "total": [{"$count": "count"}]
+    }
+    for name, field in FACETS.items():
+        facets[name] = [{"$sortByCount": f"${field}"}, {"$limit": facet_limit}]
+    pipeline.append({"$facet": facets})
+    return pipeline
+
+def search_result(facets: Dict[str, Any], page: int, page_size: int) -> Dict[str, Any]:
+    """search_jobs() result from the output of search_pipeline()"""
+    total = facets["total"][0]["count"] if facets["total"] else 0
+    return {
+        "jobs": facets["jobs"],
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "pages": (total + page_size - 1) // page_size,
+        "facets": {
+            name: [{"value": group["_id"], "count": group["count"]} for group in facets[name]]
+            for name in FACETS
+        }
+    }
+
+def empty_result(page: int, page_size: int) -> Dict[str, Any]:
+    return search_result({"jobs": [], "total": [], **{name: [] for name in FACETS}}, page, page_size)
+
+def search_match(text: Optional[str], location_query: Optional[Dict[str, Any]] = None,
+                 **filters) -> Dict[str, Any]:
+    """$match for a search: text over TEXT_WEIGHTS' fields plus exact field filters
+
+    A filter given as a list matches any of its values; None filters are
+    ignored.
+    """
+    conditions = []
+    if text and text.strip():
+        conditions.append({"$text": {"$search": text.strip()}})
+    if location_query:
+        conditions.append(location_query)
+    for field, value in filters.items():
+        if value is None:
+            continue
+        conditions.append({field: {"$in": list(value)} if isinstance(value, (list, tuple, set)) else value})
+
+    if not conditions:
+        return {}
+    return conditions[0] if len(conditions) == 1 else {"$and": conditions}
@@ -0,0 +1,109 @@
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Any, List
+
+# The one document of the stats collection
+STATS_ID = "jobs"
+
+# Counters kept per value of these job fields, plus per scrape day
+DIMENSIONS = {
+    "by_location": "location",
+    "by_role": "role",
+    "by_link_type": "link_type"
+}
+
+def encode_key(value: Any) -> str:
+    """Make a value usable as a field name (no dots, no leading $)"""
+    key = str(value) if value not in (None, "") else "unknown"
+    key = key.replace(".", "．")
+    if key.startswith("$"):
+        key = "＄" + key[1:]
+    return key
+
+def decode_key(key: str) -> str:
+    key = key.replace("．", ".")
+    if key.startswith("＄"):
+        key = "$" + key[1:]
+    return key
+
+def day_key(scraped_date: datetime) -> str:
+    if scraped_date.tzinfo is not None:
+        scraped_date = scraped_date.astimezone(timezone.utc)
+    return scraped_date.strftime("%Y-%m-%d")
+
+def stats_increments(jobs: List[Dict[str, Any]], sign: int = 1) -> Dict[str, int]:
+    """$inc document adding (sign=1) or removing (sign=-1) jobs from the stats"""
+    increments = {}
+
+    def add(field: str):
+        increments[field] = increments.get(field, 0) + sign
+
+    for job in jobs:
+        add("total")
+        for counter, field in DIMENSIONS.items():
+            add(f"{counter}.{encode_key(job.get(field))}")
+        if isinstance(job.get("scraped_date"), datetime):
+            add(f"by_day.{day_key(job['scraped_date'])}")
+    return increments
+
+def stats_update(jobs: List[Dict[str, Any]], sign: int = 1) -> Dict[str, Any]:
+    """Update of the stats document for inserted (sign=1) or deleted (sign=-1) jobs"""
+    return {"$inc": stats_increments(jobs, sign), "$set": {"updated_at": datetime.now(timezone.utc)}}
+
+def is_stale(doc: Dict[str, Any], max_age_seconds: float) -> bool:
+    """True when the stats document was last rebuilt more than max_age_seconds ago"""
+    rebuilt_at = doc.get("rebuilt_at")
+    if rebuilt_at is None:
+        return True
+    if rebuilt_at.tzinfo is None:
+        rebuilt_at = rebuilt_at.replace(tzinfo=timezone.utc)
+    return datetime.now(timezone.utc) - rebuilt_at > timedelta(seconds=max_age_seconds)
+
+def rebuild_pipeline() -> List[Dict[str, Any]]:
+    """Aggregation computing every counter of the stats document in one pass"""
+    facets = {
+        "total": [{"$count": "count"}],
+        "by_day": [
+            {"$group": {
+                "_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$scraped_date"}},
+                "count": {"$sum": 1}
+            }}
+        ]
+    }
+    for counter, field in DIMENSIONS.items():
+        facets[counter] = [{"$group": {"_id": f"${field}", "count": {"$sum": 1}}}]
+    return [{"$facet": facets}]
+
+def document_from_facets(facets: Dict[str, Any]) -> Dict[str, Any]:
+    """Stats document from the result of rebuild_pipeline()"""
+    doc = {"total": facets["total"][0]["count"] if facets["total"] else 0}
+    for counter in list(DIMENSIONS) + ["by_day"]:
+        doc[counter] = {}
+        for group in facets[counter]:
+            key = encode_key(group["_id"])
+            doc[counter][key] = doc[counter].get(key, 0) + group["count"]
+    return doc
+
+def stats_report(doc: Dict[str, Any], recent_days: int = 7, top: int = 10) -> Dict[str, Any]:
+    """get_database_stats() result from the stats document
+
+    recent_jobs_7d counts whole UTC days: today and the 6 days before.
+    """
+    def counts(counter: str) -> Dict[str, int]:
+        return {decode_key(key): count for key, count in doc.get(counter, {}).items() if count > 0}
+
+    locations = counts("by_location")
+    by_day = counts("by_day")
+    first_day = (datetime.now(timezone.utc) - timedelta(days=recent_days - 1)).strftime("%Y-%m-%d")
+
+    return {
+        "total_jobs": doc.get("total", 0),
+        "recent_jobs_7d": sum(count for day, count in by_day.items() if day >= first_day),
+        "top_locations": [
+            {"_id": location, "count": count}
+            for location, count in sorted(locations.items(), key=lambda item: -item[1])[:top]
+        ],
+        "roles": counts("by_role"),
+        "link_types": counts("by_link_type"),
+        "jobs_per_day": dict(sorted(by_day.items())),
+        "last_updated": datetime.now(timezone.utc).isoformat()
+    }
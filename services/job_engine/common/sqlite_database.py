@@ -0,0 +1,626 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Any, Optional, List, Iterator, Callable, Tuple
+from .config import config
+from .storage import JobStorage
+from . import job_stats
+from . import job_search
+from . import job_outbox
+from . import job_changesets
+
+logger = logging.getLogger(__name__)
+
+# Job fields with their own column; the whole job is also kept as JSON in `doc`
+COLUMNS = ("job_id", "scraped_date", "location", "location_norm", "role", "link_type", "job_type",
+           "job_title", "company_name", "description")
+
+DATE_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL UNIQUE,
+    scraped_date TEXT NOT NULL,
+    location TEXT,
+    location_norm TEXT,
+    role TEXT,
+    link_type TEXT,
+    job_type TEXT,
+    job_title TEXT,
+    company_name TEXT,
+    description TEXT,
+    doc TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS job_location_tokens (
+    job_rowid INTEGER NOT NULL REFERENCES jobs(id) ON DELETE CASCADE,
+    token TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS job_outbox (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL,
+    entry TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS job_changesets (
+    id TEXT PRIMARY KEY,
+    changeset_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    part INTEGER NOT NULL,
+    doc TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS feed_snapshots (
+    key TEXT PRIMARY KEY,
+    doc TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS watermarks (
+    key TEXT PRIMARY KEY,
+    doc TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+    job_title, company_name, description,
+    content='jobs', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS jobs_fts_insert AFTER INSERT ON jobs BEGIN
+    INSERT INTO jobs_fts(rowid, job_title, company_name, description)
+    VALUES (new.id, new.job_title, new.company_name, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS jobs_fts_delete AFTER DELETE ON jobs BEGIN
+    INSERT INTO jobs_fts(jobs_fts, rowid, job_title, company_name, description)
+    VALUES ('delete', old.id, old.job_title, old.company_name, old.description);
+END;
+"""
+
+# Same access paths as JobDatabase.setup_indexes
+INDEXES = """
+CREATE INDEX IF NOT EXISTS scraped_date_job_id_desc ON jobs(scraped_date DESC, job_id DESC);
+CREATE INDEX IF NOT EXISTS location_date_index ON jobs(location, scraped_date DESC);
+CREATE INDEX IF NOT EXISTS location_norm_date_index ON jobs(location_norm, scraped_date DESC, job_id DESC);
+CREATE INDEX IF NOT EXISTS location_tokens_index ON job_location_tokens(token, job_rowid);
+CREATE INDEX IF NOT EXISTS location_tokens_job_index ON job_location_tokens(job_rowid);
+CREATE INDEX IF NOT EXISTS outbox_created_at ON job_outbox(created_at);
+CREATE INDEX IF NOT EXISTS changeset_created_at ON job_changesets(created_at, changeset_id, part);
+"""
+
+# Query operators understood by count_jobs and delete_jobs
+OPERATORS = {"$lt": "<", "$lte": "<=", "$gt": ">", "$gte": ">=", "$ne": "IS NOT"}
+
+def _date_text(value: datetime) -> str:
+    """Fixed-width UTC text, so dates compare correctly as strings"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.strftime(DATE_FORMAT)
+
+def _encode(value: Any):
+    if isinstance(value, datetime):
+        return {"$date": _date_text(value)}
+    return str(value)
+
+def _decode(obj: Dict[str, Any]):
+    # Naive UTC datetimes, as pymongo returns them
+    if len(obj) == 1 and "$date" in obj:
+        return datetime.strptime(obj["$date"], DATE_FORMAT)
+    return obj
+
+def _dumps(doc: Dict[str, Any]) -> str:
+    return json.dumps({key: value for key, value in doc.items() if key != "_id"},
+                      default=_encode, ensure_ascii=False)
+
+def _loads(text: str) -> Dict[str, Any]:
+    return json.loads(text, object_hook=_decode)
+
+def _sql_value(value: Any):
+    return _date_text(value) if isinstance(value, datetime) else value
+
+class SQLiteJobDatabase(JobStorage):
+    """Embedded job store in one SQLite file (WAL mode)
+
+    For offline runs, small deployments and hermetic pipeline benchmarks.
+    Jobs are stored as JSON with the queried fields copied into indexed
+    columns; location tokens get their own table and keyword search uses
+    an FTS5 index weighted like the MongoDB text index. Stats are counted
+    with GROUP BY queries instead of a materialized document.
+
+    One connection is shared by all threads behind a lock. Not for several
+    processes writing at once: the work queue and mongo session journals
+    need the MongoDB backend.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or config.SQLITE_PATH
+        self.conn = None
+        self._lock = threading.RLock()
+        self.connect()
+
+    def connect(self):
+        """Open the database file, creating the schema on first use"""
+        try:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            self.conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute("PRAGMA foreign_keys=ON")
+            self.conn.executescript(SCHEMA)
+            # Creating indexes is local and idempotent here, so it is not left to setup_db.py
+            self.setup_indexes()
+            logger.info(f"Connected to database: {self.path} (sqlite)")
+        except Exception as e:
+            logger.error(f"Failed to open SQLite database: {e}")
+            raise
+
+    def setup_indexes(self):
+        """Create the secondary indexes (the job_id index comes with the table)"""
+        try:
+            with self._lock:
+                self.conn.executescript(INDEXES)
+        except Exception as e:
+            logger.error(f"Failed to create indexes: {e}")
+
+    def _query(self, sql: str, params: List[Any] = ()) -> List[tuple]:
+        with self._lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def _where(self, query: Dict[str, Any]) -> Tuple[str, List[Any]]:
+        """SQL condition for a MongoDB-style filter (equality, $in and comparisons, $and)"""
+        clauses = []
+        params = []
+        for field, condition in query.items():
+            if field == "$and":
+                for sub_query in condition:
+                    sql, sub_params = self._where(sub_query)
+                    clauses.append(f"({sql})")
+                    params.extend(sub_params)
+                continue
+            if field.startswith("$"):
+                raise ValueError(f"Unsupported query operator for SQLite: {field}")
+
+            if field in COLUMNS:
+                expression, expression_params = field, []
+            else:
+                expression, expression_params = "json_extract(doc, ?)", [f"$.{field}"]
+
+            conditions = condition if isinstance(condition, dict) else {"$eq": condition}
+            for operator, value in conditions.items():
+                if operator == "$in":
+                    clauses.append(f"{expression} IN ({', '.join('?' * len(value))})")
+                    params.extend(expression_params + [_sql_value(item) for item in value])
+                elif operator == "$eq":
+                    clauses.append(f"{expression} IS ?")
+                    params.extend(expression_params + [_sql_value(value)])
+                elif operator in OPERATORS:
+                    clauses.append(f"{expression} {OPERATORS[operator]} ?")
+                    params.extend(expression_params + [_sql_value(value)])
+                else:
+                    raise ValueError(f"Unsupported query operator for SQLite: {operator}")
+        return " AND ".join(clauses) or "1", params
+
+    def _location_where(self, location: str, prefix: bool = False) -> Tuple[str, List[Any]]:
+        """Location filter matching JobDatabase.location_query"""
+        normalized = self.normalize_location(location)["location_norm"]
+        if "," in normalized:
+            return "location_norm >= ? AND location_norm < ?", [normalized, normalized + "\uffff"]
+        if prefix:
+            return ("id IN (SELECT job_rowid FROM job_location_tokens WHERE token >= ? AND token < ?)",
+                    [normalized, normalized + "\uffff"])
+        return "id IN (SELECT job_rowid FROM job_location_tokens WHERE token = ?)", [normalized]
+
+    def _insert(self, job: Dict[str, Any]) -> bool:
+        """Insert one prepared job unless its job_id exists; caller holds the transaction"""
+        row = [_sql_value(job.get(column)) for column in COLUMNS] + [_dumps(job)]
+        cursor = self.conn.execute(
+            f"INSERT OR IGNORE INTO jobs ({', '.join(COLUMNS)}, doc) VALUES ({', '.join('?' * len(row))})",
+            row
+        )
+        if not cursor.rowcount:
+            return False
+        self.conn.executemany(
+            "INSERT INTO job_location_tokens (job_rowid, token) VALUES (?, ?)",
+            [(cursor.lastrowid, token) for token in job.get("location_tokens", [])]
+        )
+        if config.OUTBOX_ENABLED:
+            # Same transaction as the job, so the sequence has no gaps
+            entry = job_outbox.outbox_entries([job], 0)[0]
+            self.conn.execute("INSERT INTO job_outbox (created_at, entry) VALUES (?, ?)",
+                              [_date_text(entry.pop("created_at")), _dumps(entry)])
+        return True
+
+    def job_exists(self, job_id: str) -> bool:
+        """Check if job already exists in database"""
+        try:
+            return bool(self._query("SELECT 1 FROM jobs WHERE job_id = ?", [job_id]))
+        except Exception as e:
+            logger.error(f"Error checking job existence: {e}")
+            return False
+
+    def insert_job(self, job_data: Dict[str, Any]) -> bool:
+        """Insert a single job into database"""
+        try:
+            if not self._prepare_job(job_data):
+                return False
+            with self._lock, self.conn:
+                inserted = self._insert(job_data)
+            if inserted:
+                logger.info(f"Inserted new job: {job_data['job_id']}")
+            else:
+                logger.info(f"Job already exists, keeping original scraped_date: {job_data['job_id']}")
+            return True
+        except Exception as e:
+            logger.error(f"Error inserting job: {e}")
+            return False
+
+    def insert_jobs_batch(self, jobs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Insert multiple jobs in one transaction (see JobDatabase.insert_jobs_batch)"""
+        stats = {"inserted": 0, "skipped": 0, "failed": 0, "failed_job_ids": [], "inserted_job_ids": []}
+        batch_jobs = self._prepare_batch(jobs, stats)
+        if not batch_jobs:
+            return stats
+
+        try:
+            with self._lock, self.conn:
+                inserted_job_ids = [job_id for job_id, job in batch_jobs.items() if self._insert(job)]
+            stats["inserted"] += len(inserted_job_ids)
+            stats["skipped"] += len(batch_jobs) - len(inserted_job_ids)
+            stats["inserted_job_ids"] = inserted_job_ids
+        except Exception as e:
+            logger.error(f"Error writing job batch: {e}")
+            stats["failed"] += len(batch_jobs)
+            stats["failed_job_ids"].extend(batch_jobs)
+            stats["db_error"] = str(e)
+
+        logger.info(f"Job batch: {stats['inserted']} inserted, {stats['skipped']} already present, "
+                    f"{stats['failed']} failed")
+        return stats
+
+    def count_jobs(self, query: Dict[str, Any], limit: int = 0) -> int:
+        """Number of jobs matching a query, stopping at `limit` when given"""
+        where, params = self._where(query)
+        if limit:
+            return self._query(f"SELECT COUNT(*) FROM (SELECT 1 FROM jobs WHERE {where} LIMIT ?)",
+                               params + [limit])[0][0]
+        return self._query(f"SELECT COUNT(*) FROM jobs WHERE {where}", params)[0][0]
+
+    def delete_jobs(self, query: Dict[str, Any], batch_size: int = 1000, pause_seconds: float = 0,
+                    progress: Optional[Callable[[int, int, int], None]] = None, archive=None,
+                    removed: Optional[List[str]] = None) -> int:
+        """Delete matching jobs in bounded rowid batches (see JobDatabase.delete_jobs)"""
+        where, params = self._where(query)
+        deleted = 0
+        chunk = 0
+        last_id = 0
+        while True:
+            rows = self._query(
+                f"SELECT id, doc, job_id FROM jobs WHERE ({where}) AND id > ? ORDER BY id LIMIT ?",
+                params + [last_id, batch_size]
+            )
+            if not rows:
+                return deleted
+            last_id = rows[-1][0]
+            if archive is not None:
+                archive.write([_loads(doc) for _, doc, _ in rows])
+
+            # RETURNING names the rows this statement deleted, not the ones read above
+            with self._lock, self.conn:
+                deleted_ids = [job_id for job_id, in self.conn.execute(
+                    f"DELETE FROM jobs WHERE id IN ({', '.join('?' * len(rows))}) RETURNING job_id",
+                    [row_id for row_id, _, _ in rows]
+                ).fetchall()]
+            deleted += len(deleted_ids)
+            if removed is not None:
+                removed.extend(deleted_ids)
+
+            chunk += 1
+            if progress:
+                progress(chunk, len(deleted_ids), deleted)
+            if len(rows) < batch_size:
+                return deleted
+            if pause_seconds:
+                time.sleep(pause_seconds)
+
+    def _stats_document(self) -> Dict[str, Any]:
+        """Counters in the shape of the MongoDB stats document"""
+        doc = {"total": self._query("SELECT COUNT(*) FROM jobs")[0][0], "by_day": {}}
+        for counter, field in job_stats.DIMENSIONS.items():
+            doc[counter] = {}
+            for value, count in self._query(f"SELECT {field}, COUNT(*) FROM jobs GROUP BY {field}"):
+                key = job_stats.encode_key(value)
+                doc[counter][key] = doc[counter].get(key, 0) + count
+        for day, count in self._query("SELECT substr(scraped_date, 1, 10), COUNT(*) FROM jobs GROUP BY 1"):
+            doc["by_day"][day] = count
+        return doc
+
+    def rebuild_stats(self) -> Dict[str, Any]:
+        """Stats are always counted from the jobs table, so this just recounts them"""
+        doc = self._stats_document()
+        doc["updated_at"] = datetime.now(timezone.utc)
+        doc["rebuilt_at"] = doc["updated_at"]
+        logger.info(f"Job stats rebuilt: {doc['total']} jobs")
+        return doc
+
+    def get_database_stats(self) -> Dict[str, Any]:
+        """Get database statistics"""
+        try:
+            return job_stats.stats_report(self._stats_document())
+        except Exception as e:
+            logger.error(f"Error getting database stats: {e}")
+            return {}
+
+    def read_outbox(self, after_seq: int = 0, limit: int = 100) -> Dict[str, Any]:
+        """New jobs recorded after sequence number `after_seq` (see JobDatabase.read_outbox)"""
+        rows = self._query("SELECT seq, created_at, entry FROM job_outbox WHERE seq > ? ORDER BY seq LIMIT ?",
+                           [after_seq, limit])
+        entries = [dict(_loads(entry), seq=seq, created_at=datetime.strptime(created_at, DATE_FORMAT))
+                   for seq, created_at, entry in rows]
+        return job_outbox.read_result(entries, after_seq)
+
+    def get_outbox_seq(self) -> int:
+        """Sequence number of the newest outbox entry (0 when empty)"""
+        rows = self._query("SELECT seq FROM sqlite_sequence WHERE name = 'job_outbox'")
+        return rows[0][0] if rows else 0
+
+    def trim_outbox(self, before: datetime) -> int:
+        """Drop outbox entries recorded before `before`"""
+        with self._lock, self.conn:
+            return self.conn.execute("DELETE FROM job_outbox WHERE created_at < ?",
+                                     [_date_text(before)]).rowcount
+
+    def save_changeset(self, parts: List[Dict[str, Any]]) -> bool:
+        """Store the parts of one changeset (see JobDatabase.save_changeset)"""
+        try:
+            with self._lock, self.conn:
+                self.conn.executemany(
+                    "INSERT INTO job_changesets (id, changeset_id, kind, created_at, part, doc) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [(part["_id"], part["changeset_id"], part["kind"], _date_text(part["created_at"]),
+                      part["part"], _dumps(part)) for part in parts]
+                )
+            return True
+        except Exception as e:
+            logger.error(f"Error saving changeset: {e}")
+            return False
+
+    def get_changesets(self, since: datetime, until: Optional[datetime] = None,
+                       kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Changesets created in [since, until), oldest first (see JobDatabase.get_changesets)"""
+        sql = "SELECT doc FROM job_changesets WHERE created_at >= ?"
+        params = [_date_text(since)]
+        if until is not None:
+            sql += " AND created_at < ?"
+            params.append(_date_text(until))
+        if kind:
+            sql += " AND kind = ?"
+            params.append(kind)
+        try:
+            rows = self._query(sql + " ORDER BY created_at, changeset_id, part", params)
+            return job_changesets.merge_parts([_loads(doc) for doc, in rows])
+        except Exception as e:
+            logger.error(f"Error getting changesets: {e}")
+            return []
+
+    def trim_changesets(self, before: datetime) -> int:
+        """Drop changesets created before `before`"""
+        with self._lock, self.conn:
+            return self.conn.execute("DELETE FROM job_changesets WHERE created_at < ?",
+                                     [_date_text(before)]).rowcount
+
+    def save_feed_snapshots(self, feeds: List[Dict[str, Any]]) -> int:
+        """Replace the stored feed snapshots with `feeds` (see JobDatabase.save_feed_snapshots)"""
+        if not feeds:
+            return 0
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM feed_snapshots")
+            self.conn.executemany(
+                "INSERT INTO feed_snapshots (key, doc) VALUES (?, ?)",
+                [(feed["_id"], _dumps({k: v for k, v in feed.items() if k != "_id"})) for feed in feeds]
+            )
+        return len(feeds)
+
+    def get_feed_snapshot(self, key: str) -> Optional[Dict[str, Any]]:
+        """One prebuilt feed by key ("overall", "location:india", "role:data-scientist")"""
+        try:
+            rows = self._query("SELECT doc FROM feed_snapshots WHERE key = ?", [key])
+            return dict(_loads(rows[0][0]), key=key) if rows else None
+        except Exception as e:
+            logger.error(f"Error getting feed snapshot: {e}")
+            return None
+
+    def get_watermark(self, role: str, location: str) -> Optional[Dict[str, Any]]:
+        """Get the incremental scraping watermark for a role/location search"""
+        key = f"{role}|{location}"
+        try:
+            rows = self._query("SELECT doc FROM watermarks WHERE key = ?", [key])
+            return dict(_loads(rows[0][0]), _id=key) if rows else None
+        except Exception as e:
+            logger.error(f"Error getting watermark: {e}")
+            return None
+
+    def save_watermark(self, role: str, location: str, watermark: Dict[str, Any]) -> bool:
+        """Store the incremental scraping watermark for a role/location search"""
+        key = f"{role}|{location}"
+        try:
+            with self._lock, self.conn:
+                rows = self.conn.execute("SELECT doc FROM watermarks WHERE key = ?", [key]).fetchall()
+                # Same field merge as MongoDB's $set
+                doc = _loads(rows[0][0]) if rows else {}
+                doc.update(watermark, updated_at=datetime.now(timezone.utc))
+                self.conn.execute(
+                    "INSERT INTO watermarks (key, doc) VALUES (?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET doc = excluded.doc",
+                    [key, _dumps(doc)]
+                )
+            return True
+        except Exception as e:
+            logger.error(f"Error saving watermark: {e}")
+            return False
+
+    def get_jobs_by_location(self, location: str, limit: int = 100, prefix: bool = False) -> List[Dict[str, Any]]:
+        """Get jobs filtered by location (see JobDatabase.location_query)"""
+        try:
+            where, params = self._location_where(location, prefix)
+            rows = self._query(f"SELECT doc FROM jobs WHERE {where} ORDER BY scraped_date DESC LIMIT ?",
+                               params + [limit])
+            return [_loads(doc) for doc, in rows]
+        except Exception as e:
+            logger.error(f"Error getting jobs by location: {e}")
+            return []
+
+    def backfill_location_fields(self, batch_size: int = 1000) -> int:
+        """Add location_norm/location_tokens to jobs stored without them"""
+        updated = 0
+        try:
+            while True:
+                rows = self._query("SELECT id, doc FROM jobs WHERE location_norm IS NULL LIMIT ?", [batch_size])
+                if not rows:
+                    break
+                with self._lock, self.conn:
+                    for row_id, doc in rows:
+                        job = _loads(doc)
+                        job.update(self.normalize_location(job.get("location") or ""))
+                        self.conn.execute("UPDATE jobs SET location_norm = ?, doc = ? WHERE id = ?",
+                                          [job["location_norm"], _dumps(job), row_id])
+                        self.conn.execute("DELETE FROM job_location_tokens WHERE job_rowid = ?", [row_id])
+                        self.conn.executemany(
+                            "INSERT INTO job_location_tokens (job_rowid, token) VALUES (?, ?)",
+                            [(row_id, token) for token in job["location_tokens"]]
+                        )
+                updated += len(rows)
+        except Exception as e:
+            logger.error(f"Error backfilling location fields: {e}")
+
+        logger.info(f"Location backfill completed: {updated} jobs updated")
+        return updated
+
+    def get_recent_jobs(self, days: int = 7, limit: int = 100) -> List[Dict[str, Any]]:
+        """Get recent jobs within specified days"""
+        try:
+            cutoff_date = datetime.now(timezone.utc) - timedelta(days=days)
+            rows = self._query("SELECT doc FROM jobs WHERE scraped_date >= ? ORDER BY scraped_date DESC LIMIT ?",
+                               [_date_text(cutoff_date), limit])
+            return [_loads(doc) for doc, in rows]
+        except Exception as e:
+            logger.error(f"Error getting recent jobs: {e}")
+            return []
+
+    def _get_page(self, where: str, params: List[Any], page_size: int, cursor: Optional[str]) -> Dict[str, Any]:
+        """One keyset page: {"jobs": [...], "next_cursor": token or None}"""
+        if cursor:
+            position = self.decode_cursor(cursor)
+            scraped_date = _date_text(position["scraped_date"])
+            where = f"({where}) AND (scraped_date < ? OR (scraped_date = ? AND job_id < ?))"
+            params = params + [scraped_date, scraped_date, position["job_id"]]
+
+        # One extra row tells whether another page follows
+        rows = self._query(
+            f"SELECT doc FROM jobs WHERE {where} ORDER BY scraped_date DESC, job_id DESC LIMIT ?",
+            params + [page_size + 1]
+        )
+        jobs = [_loads(doc) for doc, in rows]
+
+        next_cursor = None
+        if len(jobs) > page_size:
+            jobs = jobs[:page_size]
+            next_cursor = self.encode_cursor(jobs[-1])
+        return {"jobs": jobs, "next_cursor": next_cursor}
+
+    def _iter_pages(self, where: str, params: List[Any], batch_size: int) -> Iterator[Dict[str, Any]]:
+        cursor = None
+        while True:
+            page = self._get_page(where, params, batch_size, cursor)
+            yield from page["jobs"]
+            cursor = page["next_cursor"]
+            if not cursor:
+                return
+
+    def _recent_where(self, days: int) -> Tuple[str, List[Any]]:
+        cutoff_date = datetime.now(timezone.utc) - timedelta(days=days)
+        return "scraped_date >= ?", [_date_text(cutoff_date)]
+
+    def get_recent_jobs_page(self, days: int = 7, page_size: int = 100,
+                             cursor: Optional[str] = None) -> Dict[str, Any]:
+        """Page of recent jobs; pass the returned next_cursor to get the following page"""
+        return self._get_page(*self._recent_where(days), page_size, cursor)
+
+    def get_jobs_by_location_page(self, location: str, page_size: int = 100, cursor: Optional[str] = None,
+                                  prefix: bool = False) -> Dict[str, Any]:
+        """Page of jobs for a location; pass the returned next_cursor to get the following page"""
+        return self._get_page(*self._location_where(location, prefix), page_size, cursor)
+
+    def iter_recent_jobs(self, days: int = 7, batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """Stream recent jobs, newest first, fetched in keyset batches"""
+        return self._iter_pages(*self._recent_where(days), batch_size)
+
+    def iter_jobs_by_location(self, location: str, batch_size: int = 500,
+                              prefix: bool = False) -> Iterator[Dict[str, Any]]:
+        """Stream jobs for a location, newest first, fetched in keyset batches"""
+        return self._iter_pages(*self._location_where(location, prefix), batch_size)
+
+    def search_jobs(self, text: Optional[str] = None, location: Optional[str] = None,
+                    link_type=None, job_type=None, role=None, page: int = 1,
+                    page_size: int = 20, facet_limit: int = 20) -> Dict[str, Any]:
+        """Keyword search on the FTS5 index (see JobDatabase.search_jobs)
+
+        Any of the words matches, ranked by bm25 with the text index
+        weights; score is reported as -bm25 so higher is better.
+        """
+        page = max(1, page)
+        try:
+            source = "jobs"
+            params = []
+            order = "scraped_date DESC, job_id DESC"
+            terms = (text or "").split()
+            if terms:
+                weights = ", ".join(str(float(weight)) for weight in job_search.TEXT_WEIGHTS.values())
+                source = (f"jobs JOIN (SELECT rowid AS hit_id, bm25(jobs_fts, {weights}) AS rank "
+                          f"FROM jobs_fts WHERE jobs_fts MATCH ?) AS hits ON hits.hit_id = jobs.id")
+                params.append(" OR ".join('"' + term.replace('"', '""') + '"' for term in terms))
+                order = "hits.rank, " + order
+
+            clauses = []
+            if location:
+                sql, location_params = self._location_where(location)
+                clauses.append(sql)
+                params.extend(location_params)
+            filters = {field: value for field, value in
+                       (("link_type", link_type), ("job_type", job_type), ("role", role)) if value is not None}
+            for field, value in filters.items():
+                sql, filter_params = self._where(
+                    {field: {"$in": list(value)} if isinstance(value, (list, tuple, set)) else value}
+                )
+                clauses.append(sql)
+                params.extend(filter_params)
+            base = f"FROM {source} WHERE {' AND '.join(clauses) or '1'}"
+
+            score = ", -hits.rank" if terms else ""
+            rows = self._query(f"SELECT doc{score} {base} ORDER BY {order} LIMIT ? OFFSET ?",
+                               params + [page_size, (page - 1) * page_size])
+            jobs = []
+            for row in rows:
+                job = _loads(row[0])
+                if terms:
+                    job["score"] = row[1]
+                jobs.append(job)
+
+            facets = {"jobs": jobs, "total": [{"count": self._query(f"SELECT COUNT(*) {base}", params)[0][0]}]}
+            for name, field in job_search.FACETS.items():
+                facets[name] = [
+                    {"_id": value, "count": count} for value, count in self._query(
+                        f"SELECT {field}, COUNT(*) {base} GROUP BY {field} ORDER BY 2 DESC LIMIT ?",
+                        params + [facet_limit]
+                    )
+                ]
+            return job_search.search_result(facets, page, page_size)
+        except Exception as e:
+            logger.error(f"Error searching jobs: {e}")
+            return job_search.empty_result(page, page_size)
+
+    def close_connection(self):
+        """Close database connection"""
+        if self.conn:
+            with self._lock:
+                self.conn.close()
+                self.conn = None
+            logger.info("Database connection closed")
@@ -0,0 +1,270 @@
+from datetime import datetime, timezone
+import base64
+import hashlib
+import json
+import logging
+import re
+from abc import ABC, abstractmethod
+from typing import Dict, Any, Optional, List, Iterator, Callable
+
+logger = logging.getLogger(__name__)
+
+class JobStorage(ABC):
+    """Interface of the job store behind `common.database.db`
+
+    JobDatabase (MongoDB) and SQLiteJobDatabase implement it;
+    config.STORAGE_BACKEND picks one. Queries passed to count_jobs and
+    delete_jobs are MongoDB-style filters on job fields. The helpers here
+    (job ids, location normalization, validation, page cursors) are shared
+    by every backend.
+
+    Backends must implement the abstract methods; the optional features
+    at the end have defaults that report the feature as missing.
+    """
+
+    # Bloom filter of stored job_ids, only kept by backends where lookups are remote
+    known_jobs = None
+
+    @staticmethod
+    def generate_job_id(company_name: str, job_title: str, location: str) -> str:
+        """Generate unique job ID using hash"""
+        content = f"{company_name.lower().strip()}_{job_title.lower().strip()}_{location.lower().strip()}"
+        return hashlib.md5(content.encode()).hexdigest()[:16]
+
+    @staticmethod
+    def normalize_location(location: str) -> Dict[str, Any]:
+        """Lower-cased location plus its tokens: comma parts and single words
+
+        "Bengaluru, Karnataka, India" -> location_norm "bengaluru, karnataka, india",
+        location_tokens ["bengaluru", "karnataka", "india"]; "New Delhi" also
+        gets "new" and "delhi".
+        """
+        parts = [" ".join(part.split()) for part in location.lower().split(",")]
+        parts = [part for part in parts if part]
+        tokens = list(parts)
+        for part in parts:
+            for word in re.split(r"[\s/()\-]+", part):
+                if word and word not in tokens:
+                    tokens.append(word)
+        return {"location_norm": ", ".join(parts), "location_tokens": tokens}
+
+    @staticmethod
+    def _prepare_job(job_data: Dict[str, Any]) -> bool:
+        """Fill in job_id and scraped_date, return False if required fields are missing"""
+        # Create job_id if not present
+        if "job_id" not in job_data:
+            job_data["job_id"] = JobStorage.generate_job_id(
+                job_data.get('company_name', ''),
+                job_data.get('job_title', ''),
+                job_data.get('location', '')
+            )
+
+        # Add scraped date if not present
+        if "scraped_date" not in job_data:
+            job_data["scraped_date"] = datetime.now(timezone.utc)
+
+        if job_data.get("location"):
+            job_data.update(JobStorage.normalize_location(job_data["location"]))
+
+        # Validate required fields
+        required_fields = ["job_id", "company_name", "job_title", "location", "job_link", "scraped_date"]
+        for field in required_fields:
+            if field not in job_data or not job_data[field]:
+                logger.error(f"Missing required field: {field} in job data")
+                return False
+        return True
+
+    @staticmethod
+    def _prepare_batch(jobs: List[Dict[str, Any]], stats: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """Validate a batch, return its jobs by job_id (first one wins for repeats)"""
+        batch_jobs = {}
+        for job in jobs:
+            try:
+                if not JobStorage._prepare_job(job):
+                    stats["failed"] += 1
+                    stats["failed_job_ids"].append(job.get("job_id"))
+                    continue
+            except Exception as e:
+                logger.error(f"Error processing job in batch: {e}")
+                stats["failed"] += 1
+                stats["failed_job_ids"].append(job.get("job_id"))
+                continue
+
+            # The same job twice in one batch is a skip, not a second upsert
+            if job["job_id"] in batch_jobs:
+                stats["skipped"] += 1
+                continue
+            batch_jobs[job["job_id"]] = job
+        return batch_jobs
+
+    @staticmethod
+    def encode_cursor(job: Dict[str, Any]) -> str:
+        """Opaque continuation token for the position after `job`"""
+        scraped_date = job["scraped_date"]
+        if scraped_date.tzinfo is None:
+            scraped_date = scraped_date.replace(tzinfo=timezone.utc)
+        raw = json.dumps({"d": scraped_date.isoformat(), "id": job["job_id"]}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Dict[str, Any]:
+        """Turn a continuation token back into (scraped_date, job_id), ValueError if invalid"""
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            position = json.loads(raw)
+            return {"scraped_date": datetime.fromisoformat(position["d"]), "job_id": position["id"]}
+        except Exception:
+            raise ValueError("Invalid page cursor")
+
+    # Schema and maintenance
+
+    @abstractmethod
+    def setup_indexes(self):
+        ...
+
+    @abstractmethod
+    def backfill_location_fields(self, batch_size: int = 1000) -> int:
+        ...
+
+    @abstractmethod
+    def rebuild_stats(self) -> Dict[str, Any]:
+        ...
+
+    # Writes
+
+    @abstractmethod
+    def job_exists(self, job_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    def insert_job(self, job_data: Dict[str, Any]) -> bool:
+        ...
+
+    @abstractmethod
+    def insert_jobs_batch(self, jobs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        ...
+
+    @abstractmethod
+    def count_jobs(self, query: Dict[str, Any], limit: int = 0) -> int:
+        ...
+
+    @abstractmethod
+    def delete_jobs(self, query: Dict[str, Any], batch_size: int = 1000, pause_seconds: float = 0,
+                    progress: Optional[Callable[[int, int, int], None]] = None, archive=None,
+                    removed: Optional[List[str]] = None) -> int:
+        ...
+
+    @abstractmethod
+    def get_watermark(self, role: str, location: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def save_watermark(self, role: str, location: str, watermark: Dict[str, Any]) -> bool:
+        ...
+
+    # Reads
+
+    @abstractmethod
+    def get_jobs_by_location(self, location: str, limit: int = 100, prefix: bool = False) -> List[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def get_recent_jobs(self, days: int = 7, limit: int = 100) -> List[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def get_recent_jobs_page(self, days: int = 7, page_size: int = 100,
+                             cursor: Optional[str] = None) -> Dict[str, Any]:
+        ...
+
+    @abstractmethod
+    def get_jobs_by_location_page(self, location: str, page_size: int = 100, cursor: Optional[str] = None,
+                                  prefix: bool = False) -> Dict[str, Any]:
+        ...
+
+    @abstractmethod
+    def iter_recent_jobs(self, days: int = 7, batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def iter_jobs_by_location(self, location: str, batch_size: int = 500,
+                              prefix: bool = False) -> Iterator[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def search_jobs(self, text: Optional[str] = None, location: Optional[str] = None,
+                    link_type=None, job_type=None, role=None, page: int = 1,
+                    page_size: int = 20, facet_limit: int = 20) -> Dict[str, Any]:
+        ...
+
+    @abstractmethod
+    def get_database_stats(self) -> Dict[str, Any]:
+        ...
+
+    # Changesets (CHANGESETS_ENABLED)
+
+    @abstractmethod
+    def save_changeset(self, parts: List[Dict[str, Any]]) -> bool:
+        ...
+
+    @abstractmethod
+    def get_changesets(self, since: datetime, until: Optional[datetime] = None,
+                       kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def trim_changesets(self, before: datetime) -> int:
+        ...
+
+    # Feed snapshots (FEED_SNAPSHOTS)
+
+    @abstractmethod
+    def save_feed_snapshots(self, feeds: List[Dict[str, Any]]) -> int:
+        ...
+
+    @abstractmethod
+    def get_feed_snapshot(self, key: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    # New-job outbox (OUTBOX_ENABLED)
+
+    @abstractmethod
+    def read_outbox(self, after_seq: int = 0, limit: int = 100) -> Dict[str, Any]:
+        ...
+
+    @abstractmethod
+    def get_outbox_seq(self) -> int:
+        ...
+
+    @abstractmethod
+    def trim_outbox(self, before: datetime) -> int:
+        ...
+
+    @abstractmethod
+    def close_connection(self):
+        ...
+
+    # Optional features, with defaults for backends that lack them
+
+    def get_ttl_days(self) -> Optional[float]:
+        """Retention of a TTL index in days, None without one"""
+        return None
+
+    def ensure_ttl_index(self, days: int) -> bool:
+        raise NotImplementedError(f"{type(self).__name__} has no TTL expiry, use RETENTION_MODE=purge")
+
+    def drop_ttl_index(self) -> bool:
+        return False
+
+    def watch_new_jobs(self, resume_token=None) -> Iterator[Dict[str, Any]]:
+        raise NotImplementedError(f"{type(self).__name__} has no change streams, poll read_outbox instead")
+
+    def load_known_jobs(self, path: Optional[str] = None):
+        logger.info(f"Known-jobs filter not used with {type(self).__name__}, lookups are local")
+        return None
+
+    def save_known_jobs(self):
+        pass
+
+    def get_known_jobs_report(self) -> Dict[str, Any]:
+        return {}
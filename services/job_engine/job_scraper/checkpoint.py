@@ -0,0 +1,268 @@
+import json
+import logging
+import os
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Optional, List
+
+from common.config import config
+
+logger = logging.getLogger(__name__)
+
+class SessionJournal(ABC):
+    """Crash-safe record of the work a scraping session has completed
+
+    Work is tracked at three levels: finished roles (with their result),
+    finished (role, location) searches and, for searches still paging, the
+    last saved page with its next_page_token. A resumed session skips
+    everything already recorded and continues partial searches from their
+    token. Subclasses persist each record as soon as it is made.
+    """
+
+    def __init__(self, session_id: Optional[str] = None):
+        self.session_id = session_id or self.new_session_id()
+        self._lock = threading.Lock()
+        self.started_at = None
+        self.params = {}
+        self.roles = {}
+        self.units = {}
+        self.pages = {}
+        self.finished = False
+
+    @staticmethod
+    def new_session_id() -> str:
+        return f"{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+
+    @staticmethod
+    def unit_key(role: str, location: str) -> str:
+        # Also used as a Mongo field name, which must not contain dots
+        return f"{role}|{location}".replace('.', '_')
+
+    @staticmethod
+    def role_key(role: str) -> str:
+        return role.replace('.', '_')
+
+    @property
+    def resumed(self) -> bool:
+        return bool(self.roles or self.units or self.pages)
+
+    def start(self, roles: List[str], max_jobs_per_role: int):
+        """Record session parameters (kept from the first run when resuming)"""
+        with self._lock:
+            if self.started_at is None:
+                self.started_at = datetime.now(timezone.utc).isoformat()
+                self.params = {
+                    'roles': roles,
+                    'max_jobs_per_role': max_jobs_per_role,
+                    'location_mode': config.LOCATION_MODE
+                }
+                self._write({'type': 'start', 'started_at': self.started_at, 'params': self.params})
+        if self.resumed:
+            logger.info(f"Resuming session {self.session_id}: {len(self.roles)} roles and "
+                        f"{len(self.units)} searches already completed")
+
+    def completed_role(self, role: str) -> Optional[Dict]:
+        return self.roles.get(self.role_key(role))
+
+    def completed_unit(self, role: str, location: str) -> Optional[Dict]:
+        return self.units.get(self.unit_key(role, location))
+
+    def page_progress(self, role: str, location: str) -> Optional[Dict]:
+        return self.pages.get(self.unit_key(role, location))
+
+    def record_page(self, role: str, location: str, page: int, next_page_token: Optional[str],
+                    collected: int, stats: Dict):
+        """Record a saved page and where the search continues from"""
+        key = self.unit_key(role, location)
+        progress = {
+            'page': page,
+            'next_page_token': next_page_token,
+            'collected': collected,
+            'stats': dict(stats)
+        }
+        with self._lock:
+            self.pages[key] = progress
+            self._write({'type': 'page', 'key': key, **progress})
+
+    def record_unit(self, role: str, location: str, stats: Dict):
+        """Record a finished (role, location) search"""
+        key = self.unit_key(role, location)
+        with self._lock:
+            self.units[key] = dict(stats)
+            self.pages.pop(key, None)
+            self._write({'type': 'unit', 'key': key, 'stats': self.units[key]})
+
+    def record_role(self, role: str, result: Dict):
+        """Record a finished role"""
+        key = self.role_key(role)
+        with self._lock:
+            self.roles[key] = dict(result)
+            self._write({'type': 'role', 'role': key, 'result': self.roles[key]})
+
+    def finish(self, summary: Dict):
+        """Mark the session complete"""
+        with self._lock:
+            self.finished = True
+            self._write({'type': 'finish', 'summary': summary})
+
+    def _apply(self, entry: Dict):
+        """Rebuild in-memory state from one stored record"""
+        kind = entry.get('type')
+        if kind == 'start':
+            self.started_at = entry['started_at']
+            self.params = entry.get('params', {})
+        elif kind == 'page':
+            self.pages[entry['key']] = {k: entry[k] for k in ('page', 'next_page_token', 'collected', 'stats')}
+        elif kind == 'unit':
+            self.units[entry['key']] = entry['stats']
+            self.pages.pop(entry['key'], None)
+        elif kind == 'role':
+            self.roles[entry['role']] = entry['result']
+        elif kind == 'finish':
+            self.finished = True
+
+    @abstractmethod
+    def _write(self, entry: Dict):
+        """Persist one record before the call returns"""
+
+class FileSessionJournal(SessionJournal):
+    """Journal kept as an append-only JSON lines file, fsynced per record"""
+
+    def __init__(self, session_id: Optional[str] = None, directory: Optional[str] = None):
+        super().__init__(session_id)
+        self.directory = directory or config.CHECKPOINT_DIR
+        os.makedirs(self.directory, exist_ok=True)
+        self.path = os.path.join(self.directory, f"{self.session_id}.jsonl")
+        self._torn = False
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    self._apply(json.loads(line))
+                except (ValueError, KeyError):
+                    # A crash mid-write can leave a torn last line
+                    logger.warning(f"Ignoring unreadable journal line in {self.path}")
+                self._torn = not line.endswith('\n')
+
+    def _write(self, entry: Dict):
+        entry = dict(entry, at=datetime.now(timezone.utc).isoformat())
+        try:
+            with open(self.path, 'a') as f:
+                # Start on a fresh line after a torn one, so this record stays readable
+                f.write(('\n' if self._torn else '') + json.dumps(entry, default=str) + '\n')
+                self._torn = False
+                f.flush()
+                os.fsync(f.fileno())
+        except Exception as e:
+            logger.error(f"Failed to write session journal: {e}")
+
+    @classmethod
+    def latest_unfinished(cls, directory: Optional[str] = None) -> Optional[str]:
+        """Most recent recent-enough session id whose journal has no finish record"""
+        directory = directory or config.CHECKPOINT_DIR
+        if not os.path.isdir(directory):
+            return None
+        cutoff = resume_cutoff()
+        for name in sorted(os.listdir(directory), reverse=True):
+            if name.endswith('.jsonl'):
+                journal = cls(name[:-len('.jsonl')], directory)
+                if journal.started_at and journal.started_at < cutoff:
+                    break  # Names sort by start time, everything after is older
+                if not journal.finished:
+                    return journal.session_id
+        return None
+
+class MongoSessionJournal(SessionJournal):
+    """Journal kept as one document per session in the jobs database"""
+
+    def __init__(self, session_id: Optional[str] = None):
+        super().__init__(session_id)
+        from common.database import db
+        self.collection = db.db[config.CHECKPOINT_COLLECTION]
+        self._load()
+
+    def _load(self):
+        doc = self.collection.find_one({"_id": self.session_id})
+        if not doc:
+            return
+        self.started_at = doc.get('started_at')
+        self.params = doc.get('params', {})
+        self.roles = doc.get('roles', {})
+        self.units = doc.get('units', {})
+        self.pages = doc.get('pages', {})
+        self.finished = doc.get('status') == 'finished'
+
+    def _write(self, entry: Dict):
+        kind = entry['type']
+        now = datetime.now(timezone.utc)
+        if kind == 'start':
+            update = {"$set": {"started_at": entry['started_at'], "params": entry['params'], "status": "running"}}
+        elif kind == 'page':
+            update = {"$set": {f"pages.{entry['key']}": self.pages[entry['key']]}}
+        elif kind == 'unit':
+            update = {"$set": {f"units.{entry['key']}": entry['stats']},
+                      "$unset": {f"pages.{entry['key']}": ""}}
+        elif kind == 'role':
+            update = {"$set": {f"roles.{entry['role']}": entry['result']}}
+        else:
+            update = {"$set": {"status": "finished", "summary": entry['summary']}}
+        update.setdefault("$set", {})["updated_at"] = now
+
+        try:
+            self.collection.update_one({"_id": self.session_id}, update, upsert=True)
+        except Exception as e:
+            logger.error(f"Failed to write session journal: {e}")
+
+    @classmethod
+    def latest_unfinished(cls) -> Optional[str]:
+        """Most recent session id that never recorded a finish"""
+        from common.database import db
+        doc = db.db[config.CHECKPOINT_COLLECTION].find_one(
+            {"status": "running", "started_at": {"$gte": resume_cutoff()}},
+            {"_id": 1},
+            sort=[("started_at", -1)]
+        )
+        return doc["_id"] if doc else None
+
+def resume_cutoff() -> str:
+    """Sessions started before this (ISO timestamp) are too old to resume as 'latest'"""
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=config.CHECKPOINT_MAX_AGE_HOURS)
+    return cutoff.isoformat()
+
+def open_journal(resume: Optional[str] = None) -> Optional[SessionJournal]:
+    """Open a journal on the configured backend
+
+    resume: a session id, 'latest' for the newest unfinished session, or
+    None to start a new session. Returns None when checkpointing is off;
+    asking to resume then raises ValueError, there is nothing to resume from.
+    """
+    backend = config.CHECKPOINT_BACKEND
+    if backend == 'none':
+        if resume:
+            raise ValueError("Resuming a session needs CHECKPOINT_BACKEND=file or mongo")
+        return None
+
+    from common.database import database_available
+    if backend == 'mongo' and config.JOB_SPOOL and not database_available():
+        # The session still runs into the spool, so keep its journal on disk
+        logger.warning(f"Database unavailable, using the file journal in {config.CHECKPOINT_DIR}")
+        backend = 'file'
+
+    journal_class = MongoSessionJournal if backend == 'mongo' else FileSessionJournal
+    session_id = None
+    if resume == 'latest':
+        session_id = journal_class.latest_unfinished()
+        if not session_id:
+            logger.info("No unfinished session to resume, starting a new one")
+    elif resume:
+        session_id = resume
+
+    journal = journal_class(session_id)
+    logger.info(f"Session journal: {journal.session_id} ({backend})")
+    return journal
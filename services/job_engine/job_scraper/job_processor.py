@@ -206,8 +206,22 @@ class JobProcessor:
         
         return False
     
-    def process_job(self, job_data: Dict) -> Optional[Dict]:
-        """Process single job and return cleaned data with link fallback"""
+    def get_job_id(self, job_data: Dict) -> Optional[str]:
+        """Compute the database job_id of a raw result without processing it"""
+        company_name = (job_data.get('company_name') or '').strip()
+        job_title = (job_data.get('job_title') or job_data.get('title') or '').strip()
+        location = (job_data.get('location') or '').strip()
+
+        if not company_name or not job_title or not location:
+            return None
+
+        return db.generate_job_id(company_name, job_title, location)
+
+    def process_job(self, job_data: Dict, role: Optional[str] = None) -> Optional[Dict]:
+        """Process single job and return cleaned data with link fallback
+
+        role is the searched job role the result came from, stored for stats.
+        """
         try:
             # Extract required fields
             company_name = job_data.get('company_name', '').strip()
@@ -239,6 +253,9 @@ class JobProcessor:
                 'scraped_date': datetime.now(timezone.utc)
             }
             
+            if role:
+                job_doc['role'] = role
+            
             # Add optional fields if available
             if 'description' in job_data:
                 job_doc['description'] = job_data['description'][:500]  # Limit description length
@@ -246,8 +263,10 @@ class JobProcessor:
             if 'salary' in job_data:
                 job_doc['salary'] = job_data['salary']
             
-            if 'job_type' in job_data:
-                job_doc['job_type'] = job_data['job_type']
+            # SerpAPI reports the job type as detected_extensions.schedule_type ("Full-time")
+            job_type = job_data.get('job_type') or (job_data.get('detected_extensions') or {}).get('schedule_type')
+            if job_type:
+                job_doc['job_type'] = job_type
             
             if 'posted_at' in job_data:
                 job_doc['posted_at'] = job_data['posted_at']
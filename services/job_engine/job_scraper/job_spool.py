@@ -0,0 +1,202 @@
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Iterator
+
+logger = logging.getLogger(__name__)
+
+# Segments being written end in OPEN_SUFFIX and are renamed to SEALED_SUFFIX when full or closed
+OPEN_SUFFIX = '.open'
+SEALED_SUFFIX = '.ndjson'
+
+def _encode(value: Any):
+    if isinstance(value, datetime):
+        return {'$date': value.isoformat()}
+    return str(value)
+
+def _decode(obj: Dict[str, Any]):
+    if len(obj) == 1 and '$date' in obj:
+        return datetime.fromisoformat(obj['$date'])
+    return obj
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+class JobSpool:
+    """Durable local spool for jobs the database could not take
+
+    Jobs are appended as JSON lines to a segment file. fsync is batched:
+    it runs once `fsync_every` jobs or `fsync_interval` seconds have been
+    written since the last one, and on close, so a crash loses at most
+    that window. Full segments are sealed (renamed) and a new one is
+    started. replay() drains sealed segments into the database with bulk
+    writes and deletes each one once all its jobs are stored.
+
+    After a failed write the spool reports the database as down for
+    `retry_seconds`, so callers spool straight away instead of waiting
+    on the driver's timeout for every batch.
+    """
+
+    def __init__(self, directory: str, segment_max_bytes: int = 16 * 1024 * 1024,
+                 fsync_every: int = 100, fsync_interval: float = 1.0, retry_seconds: float = 30.0):
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        self.fsync_every = max(1, fsync_every)
+        self.fsync_interval = fsync_interval
+        self.retry_seconds = retry_seconds
+        self._lock = threading.Lock()
+        self._file = None
+        self._path = None
+        self._unsynced = 0
+        self._last_fsync = time.monotonic()
+        self._db_down_until = 0.0
+        self.stats = {'spooled': 0, 'fsyncs': 0, 'segments': 0}
+        os.makedirs(directory, exist_ok=True)
+        self._seal_orphans()
+
+    def _seal_orphans(self):
+        """Seal open segments left behind by processes that are gone"""
+        for name in os.listdir(self.directory):
+            if not name.endswith(OPEN_SUFFIX):
+                continue
+            try:
+                pid = int(name[:-len(OPEN_SUFFIX)].rsplit('-', 1)[1])
+            except (IndexError, ValueError):
+                continue
+            if pid != os.getpid() and not _pid_alive(pid):
+                path = os.path.join(self.directory, name)
+                os.replace(path, path[:-len(OPEN_SUFFIX)] + SEALED_SUFFIX)
+                logger.info(f"Sealed spool segment left by process {pid}: {name}")
+
+    def db_down(self) -> bool:
+        """True while a recent write failure says not to try the database"""
+        return time.monotonic() < self._db_down_until
+
+    def mark_db_down(self):
+        self._db_down_until = time.monotonic() + self.retry_seconds
+
+    def append(self, jobs: List[Dict[str, Any]]):
+        """Append jobs to the active segment, fsyncing when the batch window is reached"""
+        if not jobs:
+            return
+        lines = b''.join(json.dumps(job, default=_encode, ensure_ascii=False).encode() + b'\n'
+                         for job in jobs)
+        with self._lock:
+            if self._file is None:
+                self._open_segment()
+            self._file.write(lines)
+            self._unsynced += len(jobs)
+            self.stats['spooled'] += len(jobs)
+
+            if (self._unsynced >= self.fsync_every
+                    or time.monotonic() - self._last_fsync >= self.fsync_interval):
+                self._sync()
+            if self._file.tell() >= self.segment_max_bytes:
+                self._seal()
+
+    def _open_segment(self):
+        name = f"segment-{time.time_ns():020d}-{os.getpid()}{OPEN_SUFFIX}"
+        self._path = os.path.join(self.directory, name)
+        self._file = open(self._path, 'ab')
+        self.stats['segments'] += 1
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_fsync = time.monotonic()
+        self.stats['fsyncs'] += 1
+
+    def _seal(self):
+        self._sync()
+        self._file.close()
+        os.replace(self._path, self._path[:-len(OPEN_SUFFIX)] + SEALED_SUFFIX)
+        self._file = None
+        self._path = None
+
+    def close(self):
+        """fsync and seal the active segment"""
+        with self._lock:
+            if self._file is not None:
+                self._seal()
+
+    def segments(self) -> List[str]:
+        """Sealed segment paths, oldest first"""
+        return sorted(
+            os.path.join(self.directory, name) for name in os.listdir(self.directory)
+            if name.endswith(SEALED_SUFFIX)
+        )
+
+    @staticmethod
+    def read_segment(path: str) -> Iterator[Dict[str, Any]]:
+        """Jobs of one segment; a torn last line from a crash is skipped"""
+        with open(path, 'rb') as f:
+            for line_number, line in enumerate(f, 1):
+                try:
+                    yield json.loads(line, object_hook=_decode)
+                except ValueError:
+                    logger.warning(f"Skipping unreadable line {line_number} in {path}")
+
+    def pending_jobs(self) -> int:
+        """Jobs waiting in sealed segments"""
+        count = 0
+        for path in self.segments():
+            with open(path, 'rb') as f:
+                count += sum(1 for _ in f)
+        return count
+
+    def replay(self, database, batch_size: int = 500) -> Dict[str, Any]:
+        """Drain sealed segments into the database with bulk writes
+
+        Stops at the first batch the database fails to take; that segment
+        stays and the next replay starts it over (re-inserting its jobs is
+        harmless, they are upserts). Jobs rejected as invalid are dropped.
+        """
+        self.close()
+        summary = {'segments': 0, 'jobs': 0, 'inserted': 0, 'skipped': 0, 'invalid': 0}
+
+        for path in self.segments():
+            batch = []
+            for job in self.read_segment(path):
+                batch.append(job)
+                if len(batch) >= batch_size:
+                    if not self._replay_batch(database, batch, summary):
+                        return self._replay_summary(summary)
+                    batch = []
+            if batch and not self._replay_batch(database, batch, summary):
+                return self._replay_summary(summary)
+
+            os.remove(path)
+            summary['segments'] += 1
+            logger.info(f"Spool segment replayed: {os.path.basename(path)}")
+
+        return self._replay_summary(summary)
+
+    def _replay_batch(self, database, batch: List[Dict[str, Any]], summary: Dict[str, Any]) -> bool:
+        try:
+            result = database.insert_jobs_batch(batch)
+        except Exception as e:
+            # Not even connected
+            result = {'db_error': str(e)}
+        if result.get('db_error'):
+            logger.error(f"Spool replay stopped, database unavailable: {result['db_error']}")
+            summary['error'] = result['db_error']
+            return False
+        summary['jobs'] += len(batch)
+        summary['inserted'] += result['inserted']
+        summary['skipped'] += result['skipped']
+        summary['invalid'] += result['failed']
+        return True
+
+    def _replay_summary(self, summary: Dict[str, Any]) -> Dict[str, Any]:
+        summary['remaining_segments'] = len(self.segments())
+        return summary
@@ -0,0 +1,309 @@
+import logging
+import queue
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from common.config import config
+
+logger = logging.getLogger(__name__)
+
+# Tells a stage worker that no more input will arrive
+_DONE = object()
+
+class StageStats:
+    """Input queue depth and throughput of one pipeline stage"""
+
+    def __init__(self, name: str, workers: int, queue_size: Optional[int]):
+        self.name = name
+        self.workers = workers
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self.items = 0
+        self.busy_seconds = 0.0
+        self.depth_samples = 0
+        self.depth_total = 0
+        self.max_depth = 0
+        self.blocked_puts = 0
+        self.started = None
+        self.finished = None
+
+    def sample_depth(self, depth: int, blocked: bool = False):
+        with self._lock:
+            self.depth_samples += 1
+            self.depth_total += depth
+            self.max_depth = max(self.max_depth, depth)
+            if blocked:
+                self.blocked_puts += 1
+
+    def record(self, items: int, busy_seconds: float):
+        with self._lock:
+            now = time.monotonic()
+            if self.started is None:
+                self.started = now - busy_seconds
+            self.finished = now
+            self.items += items
+            self.busy_seconds += busy_seconds
+
+    def to_dict(self) -> Dict:
+        elapsed = (self.finished - self.started) if self.started is not None else 0.0
+        return {
+            'workers': self.workers,
+            'queue_size': self.queue_size,
+            'items': self.items,
+            'max_queue_depth': self.max_depth,
+            'avg_queue_depth': round(self.depth_total / self.depth_samples, 2) if self.depth_samples else 0,
+            'blocked_puts': self.blocked_puts,
+            'busy_seconds': round(self.busy_seconds, 2),
+            'items_per_second': round(self.items / elapsed, 2) if elapsed > 0 else 0
+        }
+
+class _Unit:
+    """Progress of one (role, location) search moving through the pipeline"""
+
+    def __init__(self, role: str, label: str, query: str, api_location: Optional[str], stats: Dict):
+        self.role = role
+        self.label = label
+        self.query = query
+        self.api_location = api_location
+        self.stats = stats
+        self.watermark = None
+        self.outstanding = 0
+        self.fetched = False
+        self.closed = False
+
+class ScrapePipeline:
+    """Fetch, process and persist stages joined by bounded queues
+
+    Fetch workers page through searches and queue raw result pages, process
+    workers run JobProcessor on them and queue the cleaned jobs, and persist
+    workers save those in batches. Each stage has its own worker count, so
+    network, CPU and database work overlap. A full queue blocks the stage
+    feeding it, which keeps a slow database from letting fetched pages pile
+    up in memory.
+
+    Completed searches and roles are checkpointed in the session journal;
+    page-level progress is not, since pages are saved out of order.
+    """
+
+    def __init__(self, scraper, fetch_workers: Optional[int] = None,
+                 process_workers: Optional[int] = None, persist_workers: Optional[int] = None,
+                 queue_size: Optional[int] = None, batch_size: Optional[int] = None):
+        self.scraper = scraper
+        self.fetch_workers = max(1, fetch_workers or config.PIPELINE_FETCH_WORKERS)
+        self.process_workers = max(1, process_workers or config.PIPELINE_PROCESS_WORKERS)
+        self.persist_workers = max(1, persist_workers or config.PIPELINE_PERSIST_WORKERS)
+        self.queue_size = max(1, queue_size or config.PIPELINE_QUEUE_SIZE)
+        self.batch_size = max(1, batch_size or config.PIPELINE_BATCH_SIZE)
+        self.flush_interval = 1.0
+
+        from job_scraper.job_processor import JobProcessor
+        self.processor = JobProcessor()
+        self._lock = threading.Lock()
+
+    def run(self, roles: List[str], max_jobs: int) -> Tuple[List[Dict], Dict]:
+        """Scrape roles through the pipeline, return (role results, stage stats)"""
+        journal = self.scraper.journal
+
+        # Queues: searches -> raw pages -> processed jobs
+        self.fetch_queue = queue.Queue()
+        self.process_queue = queue.Queue(maxsize=self.queue_size)
+        self.persist_queue = queue.Queue(maxsize=self.queue_size * self.batch_size)
+        self.stage_stats = {
+            'fetch': StageStats('fetch', self.fetch_workers, None),
+            'process': StageStats('process', self.process_workers, self.queue_size),
+            'persist': StageStats('persist', self.persist_workers, self.queue_size * self.batch_size)
+        }
+
+        stored_roles = {}
+        role_units = {}
+        seen_job_ids = {}
+        for role in roles:
+            stored = journal.completed_role(role) if journal else None
+            if stored:
+                logger.info(f"Role {role} already completed in session {journal.session_id}, skipping")
+                stored_roles[role] = dict(stored, resumed=True)
+                continue
+
+            seen_job_ids[role] = set()
+            role_units[role] = []
+            for label, query, api_location in self.scraper.build_search_units(role):
+                stats = journal.completed_unit(role, label) if journal else None
+                unit = _Unit(role, label, query, api_location, stats or self.scraper.new_unit_stats())
+                role_units[role].append(unit)
+                if stats:
+                    logger.info(f"Skipping {role} in {label}, already completed in this session")
+                    unit.closed = True
+                else:
+                    self.fetch_queue.put(unit)
+
+        threads = []
+        stages = (
+            ('fetch', self.fetch_workers, self._fetch_worker, (max_jobs, seen_job_ids)),
+            ('process', self.process_workers, self._process_worker, ()),
+            ('persist', self.persist_workers, self._persist_worker, ())
+        )
+        for name, count, target, args in stages:
+            workers = [threading.Thread(target=target, args=args, name=f"{name}-{i}", daemon=True)
+                       for i in range(count)]
+            for worker in workers:
+                worker.start()
+            threads.append(workers)
+
+        # Shut the stages down in order once each one's input is drained
+        for stage_queue, workers in zip((self.fetch_queue, self.process_queue, self.persist_queue), threads):
+            for _ in workers:
+                stage_queue.put(_DONE)
+            for worker in workers:
+                worker.join()
+
+        results = []
+        for role in roles:
+            if role in stored_roles:
+                results.append(stored_roles[role])
+                continue
+
+            units = role_units[role]
+            result = self.scraper._merge_unit_results(
+                role, len(units), ((unit.label, unit.stats) for unit in units)
+            )
+            logger.info(f"Role {role}: {result['jobs_saved']} jobs saved "
+                       f"(Direct: {result['direct_links']}, Google: {result['google_links']})")
+            if journal and 'error' not in result:
+                journal.record_role(role, result)
+            results.append(result)
+
+        pipeline_stats = {name: stats.to_dict() for name, stats in self.stage_stats.items()}
+        return results, pipeline_stats
+
+    def _put(self, stage_queue: queue.Queue, stats: StageStats, item):
+        """Put with backpressure, counting puts that had to wait for room"""
+        blocked = False
+        try:
+            stage_queue.put_nowait(item)
+        except queue.Full:
+            blocked = True
+            stage_queue.put(item)
+        stats.sample_depth(stage_queue.qsize(), blocked)
+
+    def _fetch_worker(self, max_jobs: int, seen_job_ids: Dict[str, set]):
+        stats = self.stage_stats['fetch']
+        while True:
+            unit = self.fetch_queue.get()
+            if unit is _DONE:
+                return
+
+            try:
+                unit.watermark = self.scraper.load_watermark(unit.role, unit.label)
+                pages = self.scraper.iter_search_jobs(
+                    unit.query, unit.api_location, max_jobs, self.processor,
+                    seen_job_ids[unit.role], unit.stats, unit.watermark
+                )
+                # Time spent fetching, excluding time blocked on a full process queue
+                started = time.monotonic()
+                for raw_jobs in pages:
+                    stats.record(1, time.monotonic() - started)
+                    with self._lock:
+                        unit.outstanding += len(raw_jobs)
+                    self._put(self.process_queue, self.stage_stats['process'], (unit, raw_jobs))
+                    started = time.monotonic()
+            except Exception as e:
+                logger.error(f"Search failed for {unit.role} in {unit.label}: {e}")
+                unit.stats['error'] = str(e)
+
+            with self._lock:
+                unit.fetched = True
+            self._maybe_close(unit)
+
+    def _process_worker(self):
+        stats = self.stage_stats['process']
+        link_keys = {'direct': 'direct_links', 'google': 'google_links', 'none': 'no_links'}
+
+        while True:
+            item = self.process_queue.get()
+            if item is _DONE:
+                return
+
+            unit, raw_jobs = item
+            started = time.monotonic()
+            processed_jobs = []
+            dropped = 0
+            for job_data in raw_jobs:
+                processed_job = self.processor.process_job(job_data, unit.role)
+                if processed_job:
+                    processed_jobs.append(processed_job)
+                else:
+                    dropped += 1
+
+            with self._lock:
+                unit.stats['jobs_processed'] += len(processed_jobs)
+                unit.stats['no_links'] += dropped
+                for job in processed_jobs:
+                    link_type = job.get('link_type', 'none')
+                    if link_type in link_keys:
+                        unit.stats[link_keys[link_type]] += 1
+                unit.outstanding -= dropped
+            stats.record(len(raw_jobs), time.monotonic() - started)
+
+            for job in processed_jobs:
+                self._put(self.persist_queue, self.stage_stats['persist'], (unit, job))
+            if dropped:
+                self._maybe_close(unit)
+
+    def _persist_worker(self):
+        batch = []
+        done = False
+
+        while not done:
+            try:
+                item = self.persist_queue.get(timeout=self.flush_interval)
+                if item is _DONE:
+                    done = True
+                else:
+                    batch.append(item)
+            except queue.Empty:
+                pass
+
+            # Flush full batches, and partial ones whenever the queue runs dry
+            if batch and (done or len(batch) >= self.batch_size or self.persist_queue.empty()):
+                self._save_batch(batch)
+                batch = []
+
+    def _save_batch(self, batch: List[Tuple[_Unit, Dict]]):
+        started = time.monotonic()
+        try:
+            saved = self.scraper.save_jobs([job for _, job in batch])
+        except Exception as e:
+            logger.error(f"Failed to save batch of {len(batch)} jobs: {e}")
+            saved = [False] * len(batch)
+        self.stage_stats['persist'].record(len(batch), time.monotonic() - started)
+
+        units = []
+        with self._lock:
+            for (unit, job), stored in zip(batch, saved):
+                unit.outstanding -= 1
+                if stored:
+                    unit.stats['jobs_saved'] += 1
+                if unit.watermark and stored:
+                    unit.watermark.record_stored([job['job_id']])
+                elif unit.watermark:
+                    unit.watermark.mark_incomplete()
+                if unit not in units:
+                    units.append(unit)
+        for unit in units:
+            self._maybe_close(unit)
+
+    def _maybe_close(self, unit: _Unit):
+        """Finish a search once it is fetched and all its jobs went through"""
+        with self._lock:
+            if unit.closed or not unit.fetched or unit.outstanding > 0:
+                return
+            unit.closed = True
+
+        # Only move the watermark forward after a search that actually ran
+        if unit.watermark and 'error' not in unit.stats:
+            self.scraper.save_watermark(unit.role, unit.label, unit.watermark)
+
+        journal = self.scraper.journal
+        if journal and 'error' not in unit.stats:
+            journal.record_unit(unit.role, unit.label, unit.stats)
@@ -0,0 +1,138 @@
+import random
+import threading
+import time
+import logging
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class RateLimiter:
+    """Thread-safe AIMD rate limiter shared by every worker that calls SerpAPI
+
+    The request rate grows additively while calls succeed quickly and is cut
+    multiplicatively on 429s or slow responses, so runs settle near the
+    highest rate the API tolerates. Retry-After is honoured globally: one
+    throttled worker pauses all of them.
+    """
+
+    def __init__(self, requests_per_second: float, min_rate: float = 0.2, max_rate: float = 5.0,
+                 increase_step: float = 0.1, decrease_factor: float = 0.5,
+                 latency_target: float = 5.0, jitter: float = 0.1):
+        self.min_rate = min_rate
+        self.max_rate = max(max_rate, min_rate)
+        self.rate = min(max(requests_per_second, self.min_rate), self.max_rate)
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.latency_target = latency_target
+        self.jitter = jitter
+
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+        self._blocked_until = 0.0
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Reset the per-session counters"""
+        with self._lock:
+            self.stats = {
+                'requests': 0,
+                'retries': 0,
+                'throttled_responses': 0,
+                'throttled_seconds': 0.0,
+                'paced_seconds': 0.0,
+                'rate_decreases': 0,
+            }
+
+    def acquire(self) -> float:
+        """Block until the caller may send a request, return seconds waited
+
+        Waiting is counted as throttled_seconds for the part spent in a
+        backoff or Retry-After pause, and as paced_seconds otherwise.
+        """
+        with self._lock:
+            now = time.monotonic()
+            interval = 1.0 / self.rate
+            paced_slot = max(now, self._next_slot)
+            slot = max(paced_slot, self._blocked_until)
+            throttled = slot - paced_slot
+            # Jitter keeps concurrent workers from firing in lockstep
+            slot += random.uniform(0, self.jitter * interval)
+            self._next_slot = slot + interval
+            self.stats['requests'] += 1
+
+        wait_time = slot - now
+        if wait_time > 0:
+            with self._lock:
+                self.stats['throttled_seconds'] += throttled
+                self.stats['paced_seconds'] += wait_time - throttled
+            logger.debug(f"Rate limiter waiting {wait_time:.2f} seconds")
+            time.sleep(wait_time)
+        return wait_time
+
+    def record_success(self, latency: float):
+        """Additive increase, or multiplicative decrease when the API slows down"""
+        with self._lock:
+            if latency > self.latency_target:
+                self._decrease(f"slow response ({latency:.1f}s)")
+            else:
+                self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def record_throttled(self, retry_after: Optional[float], attempt: int, retry: bool = True):
+        """Handle a 429: cut the rate and pause every worker until Retry-After
+
+        retry=False for a 429 on the caller's last attempt, which is not retried.
+        """
+        with self._lock:
+            self.stats['throttled_responses'] += 1
+            if retry:
+                self.stats['retries'] += 1
+            self._decrease("rate limit response")
+            pause = retry_after if retry_after is not None else self._backoff(attempt)
+            self._blocked_until = max(self._blocked_until, time.monotonic() + pause)
+        logger.warning(f"Rate limit hit, pausing requests for {pause:.1f} seconds")
+
+    def record_error(self, attempt: int):
+        """Back off exponentially (with jitter) after a failed request"""
+        with self._lock:
+            self.stats['retries'] += 1
+            pause = self._backoff(attempt)
+            self._blocked_until = max(self._blocked_until, time.monotonic() + pause)
+
+    def get_stats(self) -> Dict:
+        """Counters for the current session plus the rate we ended on"""
+        with self._lock:
+            stats = dict(self.stats)
+        stats['throttled_seconds'] = round(stats['throttled_seconds'], 2)
+        stats['paced_seconds'] = round(stats['paced_seconds'], 2)
+        stats['current_rate'] = round(self.rate, 3)
+        return stats
+
+    def _decrease(self, reason: str):
+        """Multiplicative decrease, caller must hold the lock"""
+        self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+        self.stats['rate_decreases'] += 1
+        logger.info(f"Lowering request rate to {self.rate:.2f}/s after {reason}")
+
+    def _backoff(self, attempt: int) -> float:
+        """Exponential backoff with random jitter on top"""
+        base = 2 ** attempt
+        return base + random.uniform(0, base)
+
+    @staticmethod
+    def parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """Parse a Retry-After header given either as seconds or an HTTP date"""
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+            if retry_at.tzinfo is None:
+                retry_at = retry_at.replace(tzinfo=timezone.utc)
+            return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
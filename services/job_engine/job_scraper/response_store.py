@@ -0,0 +1,164 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone, timedelta, date
+from typing import Dict, Any, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# Only these parts of a SerpAPI response are worth keeping
+STORED_KEYS = ('search_parameters', 'jobs_results', 'serpapi_pagination')
+
+class ResponseStore:
+    """Compressed, content-addressed on-disk store of raw SerpAPI responses
+
+    Layout:
+        objects/<sha[:2]>/<sha>.json.gz   payloads, addressed by content hash
+        refs/<YYYY-MM-DD>/<key>.json      (query, location, page, date) -> object
+
+    Identical payloads are stored once. Refs are grouped by day, so TTL
+    eviction drops whole day directories and then unreferenced objects.
+    """
+
+    def __init__(self, base_dir: str, ttl_days: int = 90):
+        self.base_dir = base_dir
+        self.objects_dir = os.path.join(base_dir, 'objects')
+        self.refs_dir = os.path.join(base_dir, 'refs')
+        self.ttl_days = ttl_days
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.refs_dir, exist_ok=True)
+
+    @staticmethod
+    def request_key(query: str, location: Optional[str], page: int, day: str) -> str:
+        """Stable key for one request on one day"""
+        content = json.dumps([query, location or '', page, day])
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    @staticmethod
+    def today() -> str:
+        return datetime.now(timezone.utc).date().isoformat()
+
+    def put(self, query: str, location: Optional[str], page: int, payload: Dict[str, Any]) -> Optional[str]:
+        """Store a response, return its content hash"""
+        try:
+            trimmed = {key: payload[key] for key in STORED_KEYS if key in payload}
+            raw = json.dumps(trimmed, sort_keys=True, separators=(',', ':'), default=str).encode()
+            digest = hashlib.sha256(raw).hexdigest()
+
+            object_path = self._object_path(digest)
+            if not os.path.exists(object_path):
+                os.makedirs(os.path.dirname(object_path), exist_ok=True)
+                self._atomic_write(object_path, gzip.compress(raw))
+
+            day = self.today()
+            ref = {
+                'query': query,
+                'location': location,
+                'page': page,
+                'date': day,
+                'object': digest,
+                'stored_at': datetime.now(timezone.utc).isoformat()
+            }
+            ref_path = os.path.join(self.refs_dir, day, f"{self.request_key(query, location, page, day)}.json")
+            os.makedirs(os.path.dirname(ref_path), exist_ok=True)
+            self._atomic_write(ref_path, json.dumps(ref).encode())
+            return digest
+        except Exception as e:
+            logger.warning(f"Failed to store response: {e}")
+            return None
+
+    def get(self, query: str, location: Optional[str], page: int, day: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Get the stored response for a request (today by default)"""
+        day = day or self.today()
+        ref_path = os.path.join(self.refs_dir, day, f"{self.request_key(query, location, page, day)}.json")
+        try:
+            with open(ref_path) as f:
+                ref = json.load(f)
+            return self.load_object(ref['object'])
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Failed to read stored response: {e}")
+            return None
+
+    def load_object(self, digest: str) -> Dict[str, Any]:
+        """Load a payload by content hash"""
+        with open(self._object_path(digest), 'rb') as f:
+            return json.loads(gzip.decompress(f.read()))
+
+    def iter_responses(self, since: Optional[date] = None,
+                       until: Optional[date] = None) -> Iterator[Dict[str, Any]]:
+        """Yield stored refs (oldest day first) with their payload under 'payload'"""
+        for day in sorted(os.listdir(self.refs_dir)):
+            try:
+                day_date = date.fromisoformat(day)
+            except ValueError:
+                continue
+            if (since and day_date < since) or (until and day_date > until):
+                continue
+
+            day_dir = os.path.join(self.refs_dir, day)
+            for name in sorted(os.listdir(day_dir)):
+                try:
+                    with open(os.path.join(day_dir, name)) as f:
+                        ref = json.load(f)
+                    ref['payload'] = self.load_object(ref['object'])
+                    yield ref
+                except Exception as e:
+                    logger.warning(f"Skipping unreadable stored response {day}/{name}: {e}")
+
+    def evict_expired(self, ttl_days: Optional[int] = None) -> Dict[str, int]:
+        """Drop refs older than the TTL, then objects nothing points to"""
+        ttl_days = self.ttl_days if ttl_days is None else ttl_days
+        cutoff = datetime.now(timezone.utc).date() - timedelta(days=ttl_days)
+        stats = {'days_removed': 0, 'objects_removed': 0}
+
+        for day in os.listdir(self.refs_dir):
+            try:
+                if date.fromisoformat(day) < cutoff:
+                    shutil.rmtree(os.path.join(self.refs_dir, day))
+                    stats['days_removed'] += 1
+            except ValueError:
+                continue
+
+        if stats['days_removed']:
+            referenced = set()
+            for day in os.listdir(self.refs_dir):
+                day_dir = os.path.join(self.refs_dir, day)
+                for name in os.listdir(day_dir):
+                    try:
+                        with open(os.path.join(day_dir, name)) as f:
+                            referenced.add(json.load(f)['object'])
+                    except Exception:
+                        continue
+
+            for prefix in os.listdir(self.objects_dir):
+                prefix_dir = os.path.join(self.objects_dir, prefix)
+                for name in os.listdir(prefix_dir):
+                    if name.split('.')[0] not in referenced:
+                        os.remove(os.path.join(prefix_dir, name))
+                        stats['objects_removed'] += 1
+
+        if stats['days_removed']:
+            logger.info(f"Response store eviction: {stats['days_removed']} days, "
+                        f"{stats['objects_removed']} objects removed")
+        return stats
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], f"{digest}.json.gz")
+
+    def _atomic_write(self, path: str, data: bytes):
+        """Write via a temp file so readers never see partial files"""
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
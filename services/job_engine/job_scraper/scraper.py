@@ -1,12 +1,23 @@
 import requests
+from requests.adapters import HTTPAdapter
 import time
+import asyncio
 import logging
-from datetime import datetime, timezone
-from typing import List, Dict, Optional
-from urllib.parse import urlparse, parse_qs
+import threading
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone, date
+from typing import List, Dict, Optional, Tuple, Iterator
 
 from common.config import config
-from common.database import db
+from common.database import db, database_available, connected_db
+from common import job_feeds
+from common import job_changesets
+from job_scraper.rate_limiter import RateLimiter
+from job_scraper.watermark import Watermark
+from job_scraper.response_store import ResponseStore
+from job_scraper.job_spool import JobSpool
+from job_scraper.checkpoint import SessionJournal
 
 logger = logging.getLogger(__name__)
 
@@ -18,13 +29,91 @@ class JobScraper:
         self.base_url = "https://serpapi.com/search"
         self.request_delay = config.REQUEST_DELAY
         self.max_results = config.MAX_RESULTS_PER_QUERY
+        self.concurrency = config.SCRAPER_CONCURRENCY
+        self.location_fanout = config.LOCATION_FANOUT
+        self.max_pages = config.MAX_PAGES_PER_SEARCH
+        self.incremental = config.INCREMENTAL_SCRAPING
+        self._seen_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        
+        self.max_retries = config.API_MAX_RETRIES
+        
+        # Shared by every worker so concurrent roles respect one global rate
+        self.rate_limiter = RateLimiter(
+            config.MAX_REQUESTS_PER_SECOND,
+            min_rate=config.RATE_LIMIT_MIN_RPS,
+            max_rate=config.RATE_LIMIT_MAX_RPS,
+            increase_step=config.RATE_LIMIT_INCREASE_STEP,
+            decrease_factor=config.RATE_LIMIT_DECREASE_FACTOR,
+            latency_target=config.RATE_LIMIT_LATENCY_TARGET,
+            jitter=config.RATE_LIMIT_JITTER
+        )
         
         # Validate API key
         if not self.api_key:
             raise ValueError("API key not configured. Check environment variables.")
         
+        # (connect, read) timeouts for every SerpAPI call
+        self.timeout = (config.API_CONNECT_TIMEOUT, config.API_TIMEOUT)
+        self.session = self._create_session()
+        
+        # Raw responses are kept on disk for replay and same-day reuse
+        self.response_store = None
+        if config.RESPONSE_STORE_ENABLED:
+            self.response_store = ResponseStore(config.RESPONSE_STORE_DIR, config.RESPONSE_STORE_TTL_DAYS)
+        self._cache_hits = 0
+        
+        # Jobs the database cannot take are kept on disk instead of being lost
+        self.spool = None
+        if config.JOB_SPOOL:
+            self.spool = JobSpool(
+                config.JOB_SPOOL_DIR,
+                segment_max_bytes=int(config.JOB_SPOOL_SEGMENT_MB * 1024 * 1024),
+                fsync_every=config.JOB_SPOOL_FSYNC_EVERY,
+                fsync_interval=config.JOB_SPOOL_FSYNC_INTERVAL,
+                retry_seconds=config.JOB_SPOOL_RETRY_SECONDS
+            )
+        self.journal = None
+        # Jobs added by the running session, collected for its changeset (CHANGESETS_ENABLED)
+        self._session_added = None
+        
+        # Scraping goes on into the spool when the database is down from the start
+        if self.spool and not database_available():
+            logger.warning(f"Database unavailable at startup, spooling jobs to {self.spool.directory}")
+            self.spool.mark_db_down()
+        
+        # Already-stored jobs are recognised without a database round-trip
+        if config.KNOWN_JOBS_FILTER and connected_db() is not None and db.known_jobs is None:
+            db.load_known_jobs()
+        
         logger.info("Job scraper initialized with Google fallback enabled")
     
+    def _create_session(self) -> requests.Session:
+        """Create a long-lived session so SerpAPI connections are kept alive and reused"""
+        # Every worker may hold a connection at once, so never pool fewer than the concurrency
+        searches_per_role = len(config.get_search_locations()) if self.location_fanout else 1
+        pool_size = max(config.HTTP_POOL_SIZE, self.concurrency * searches_per_role)
+        
+        # Retries are handled by search_jobs and the rate limiter, not urllib3
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        
+        logger.debug(f"HTTP session created (pool size: {pool_size}, timeouts: {self.timeout})")
+        return session
+    
+    def close(self):
+        """Close pooled HTTP connections, persist the known-jobs filter and seal the spool"""
+        if self.session:
+            self.session.close()
+            self.session = None
+        if connected_db() is not None:
+            db.save_known_jobs()
+        if self.spool:
+            self.spool.close()
+    
     def build_search_query(self, role: str, locations: List[str]) -> str:
         """Build single optimized search query"""
         # Create location string
@@ -38,8 +127,23 @@ class JobScraper:
     
     from typing import List, Dict, Optional
     def search_jobs(self, query: str, location: str) -> Optional[List[Dict]]:
-        """Search jobs using SerpAPI with retry logic"""
-        max_retries = 3
+        """Search jobs using SerpAPI with retry logic (first page only)"""
+        page = self.search_jobs_page(query, location)
+        return None if page is None else page[0]
+    
+    def search_jobs_page(self, query: str, location: Optional[str], next_page_token: Optional[str] = None,
+                         page: int = 0) -> Optional[Tuple[List[Dict], Optional[str]]]:
+        """Fetch one page of results, return (jobs, next_page_token) or None on failure"""
+        if self.response_store:
+            cached = self.response_store.get(query, location, page)
+            if cached is not None:
+                with self._stats_lock:
+                    self._cache_hits += 1
+                logger.info(f"Using stored response for page {page} of: {query[:50]}")
+                return (cached.get('jobs_results', []),
+                        cached.get('serpapi_pagination', {}).get('next_page_token'))
+        
+        max_retries = self.max_retries
         
         for attempt in range(max_retries):
             try:
@@ -51,160 +155,744 @@ class JobScraper:
                     'num': self.max_results,
                     'sort_by': 'date'
                 }
+                if next_page_token:
+                    params['next_page_token'] = next_page_token
                 
-                response = requests.get(self.base_url, params=params, timeout=30)
+                self.rate_limiter.acquire()
+                request_start = time.monotonic()
+                response = self.session.get(self.base_url, params=params, timeout=self.timeout)
                 
                 if response.status_code == 429:  # Rate limit exceeded
-                    wait_time = 2 ** attempt
-                    logger.warning(f"Rate limit hit, waiting {wait_time} seconds...")
-                    time.sleep(wait_time)
+                    retry_after = RateLimiter.parse_retry_after(response.headers.get('Retry-After'))
+                    last_attempt = attempt == max_retries - 1
+                    # Other workers still honour the pause, but no retry follows the last attempt
+                    self.rate_limiter.record_throttled(retry_after, attempt, retry=not last_attempt)
+                    if last_attempt:
+                        logger.error(f"API request attempt {attempt + 1} was rate limited")
+                        logger.error("All API request attempts failed")
+                        return None
                     continue
                     
                 response.raise_for_status()
+                self.rate_limiter.record_success(time.monotonic() - request_start)
                 
                 data = response.json()
                 jobs = data.get('jobs_results', [])
+                token = data.get('serpapi_pagination', {}).get('next_page_token')
+                
+                if self.response_store:
+                    self.response_store.put(query, location, page, data)
                 
                 logger.info(f"Found {len(jobs)} jobs")
-                return jobs
+                return jobs, token
                 
             except requests.RequestException as e:
                 logger.error(f"API request attempt {attempt + 1} failed: {type(e).__name__}")
                 if attempt == max_retries - 1:
                     logger.error("All API request attempts failed")
                     return None
-                time.sleep(2 ** attempt)
+                self.rate_limiter.record_error(attempt)
                 
         return None
     
-    def scrape_role(self, role: str, max_jobs: int = 20) -> Dict:
-        """Scrape jobs for a specific role"""
-        logger.info(f"Starting job search for: {role}")
+    def iter_search_jobs(self, query: str, location: Optional[str], max_jobs: int,
+                         processor, seen_job_ids: set, search_stats: Dict,
+                         watermark: Optional[Watermark] = None,
+                         cursor: Optional[Dict] = None) -> Iterator[List[Dict]]:
+        """Lazily page through results, yielding each page's new (unseen) jobs
+
+        Stops once max_jobs new jobs were yielded, a page comes back empty,
+        there is no next page, or (with a watermark) a run of already-known
+        jobs is hit. The next page is requested before the current batch is
+        yielded, so the caller's processing overlaps the fetch while at most
+        two pages are held in memory. search_stats is updated in place with
+        api_calls, pages, jobs_found, duplicates, known and error.
+
+        cursor ({'page', 'next_page_token', 'collected'}) is the resumable
+        position: it is updated in place and, when passed in from a
+        checkpoint, paging continues from it.
+
+        The watermark is only used to skip known jobs here; the caller
+        records jobs in it once they are stored. New jobs left unfetched or
+        cut by max_jobs mark it incomplete.
+        """
+        if cursor is None:
+            cursor = {}
+        cursor.setdefault('page', 0)
+        cursor.setdefault('next_page_token', None)
+        cursor.setdefault('collected', 0)
         
-        # Get search locations
-        locations = config.get_search_locations()
+        # A checkpointed search with no next page has nothing left to fetch
+        if cursor['page'] > 0 and not cursor['next_page_token']:
+            return
         
-        # Build single search query
-        query = self.build_search_query(role, locations)
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="page") as fetcher:
+            pending = fetcher.submit(self.search_jobs_page, query, location,
+                                     cursor['next_page_token'], cursor['page'])
+            search_stats['api_calls'] += 1
+            
+            while pending is not None:
+                page = pending.result()
+                pending = None
+                
+                if page is None:
+                    # A failed first page fails the search; later pages keep what we have
+                    if cursor['page'] == 0:
+                        search_stats['error'] = 'API_FAILURE'
+                    else:
+                        logger.warning(f"Pagination stopped early after {cursor['page']} pages")
+                        if watermark:
+                            watermark.mark_incomplete()
+                    return
+                
+                raw_jobs, next_page_token = page
+                cursor['page'] += 1
+                cursor['next_page_token'] = next_page_token
+                search_stats['pages'] += 1
+                search_stats['jobs_found'] += len(raw_jobs)
+                if not raw_jobs:
+                    cursor['next_page_token'] = None
+                    return
+                
+                new_jobs, duplicates = self._claim_new_jobs(raw_jobs, processor, seen_job_ids)
+                search_stats['duplicates'] += duplicates
+                if watermark:
+                    new_jobs, known = watermark.filter_new(new_jobs, processor)
+                    search_stats['known'] += known
+                remaining = max_jobs - cursor['collected']
+                if watermark and len(new_jobs) > remaining:
+                    watermark.mark_incomplete()
+                new_jobs = new_jobs[:remaining]
+                cursor['collected'] += len(new_jobs)
+                
+                # Request the next page before handing this one to the caller
+                more = next_page_token and not (watermark and watermark.exhausted)
+                if more and cursor['collected'] < max_jobs and cursor['page'] < self.max_pages:
+                    pending = fetcher.submit(self.search_jobs_page, query, location,
+                                             next_page_token, cursor['page'])
+                    search_stats['api_calls'] += 1
+                elif more and watermark:
+                    # Stopped by max_jobs or the page limit with results left
+                    watermark.mark_incomplete()
+                
+                if new_jobs:
+                    yield new_jobs
+    
+    def _claim_new_jobs(self, raw_jobs: List[Dict], processor, seen_job_ids: set) -> Tuple[List[Dict], int]:
+        """Drop jobs already returned by this role's searches, return (new_jobs, duplicates)"""
+        new_jobs = []
+        duplicates = 0
+        
+        # Concurrent location searches share seen_job_ids
+        with self._seen_lock:
+            for job_data in raw_jobs:
+                job_id = processor.get_job_id(job_data)
+                if job_id and job_id in seen_job_ids:
+                    duplicates += 1
+                    continue
+                if job_id:
+                    seen_job_ids.add(job_id)
+                new_jobs.append(job_data)
         
-        # Use first location as primary location for API
-        primary_location = locations[0]
+        return new_jobs, duplicates
+    
+    def build_search_units(self, role: str) -> List[Tuple[str, str, Optional[str]]]:
+        """Build (label, query, api_location) searches for a role
+
+        Default: one combined query with the first location as the API
+        location. Fan-out mode: one search per configured location.
+        """
+        locations = config.get_search_locations()
         
-        # Search jobs
-        raw_jobs = self.search_jobs(query, primary_location)
+        if not self.location_fanout or len(locations) < 2:
+            query = self.build_search_query(role, locations)
+            # Use first location as primary location for API
+            return [(locations[0], query, locations[0])]
         
-        if raw_jobs is None:
-            logger.error(f"API failed for {role} - skipping this role")
-            return {
-                'role': role,
-                'jobs_found': 0,
-                'jobs_processed': 0,
-                'jobs_saved': 0,
-                'direct_links': 0,
-                'google_links': 0,
-                'no_links': 0,
-                'error': 'API_FAILURE'  
-            }
+        units = []
+        for location in locations:
+            query = self.build_search_query(role, [location])
+            # "Remote" is not a geographic location, the query text carries it
+            api_location = None if location.lower() == 'remote' else location
+            units.append((location, query, api_location))
+        return units
+    
+    def scrape_role(self, role: str, max_jobs: int = 20, polite: bool = True) -> Dict:
+        """Scrape jobs for a specific role
+
+        polite=False drops the fixed sleeps; the async mode relies on the
+        shared rate limiter instead. In fan-out mode max_jobs applies to
+        each location search.
+        """
+        logger.info(f"Starting job search for: {role}")
         
-        if len(raw_jobs) == 0:
-            logger.warning(f"No jobs found for {role} (API worked, just empty results)")
-            return {
-                'role': role,
-                'jobs_found': 0,
-                'jobs_processed': 0,
-                'jobs_saved': 0,
-                'direct_links': 0,
-                'google_links': 0,
-                'no_links': 0
-            }
+        units = self.build_search_units(role)
         
-        # Process jobs
         from job_scraper.job_processor import JobProcessor
         processor = JobProcessor()
         
-        processed_jobs = []
-        link_stats = {'direct': 0, 'google': 0, 'none': 0}
+        seen_job_ids = set()
+        
+        # Searches finished before a crash are merged from the session journal
+        pending_units = []
+        completed = []
+        for label, query, api_location in units:
+            stats = self.journal.completed_unit(role, label) if self.journal else None
+            if stats:
+                logger.info(f"Skipping {role} in {label}, already completed in this session")
+                completed.append((label, stats))
+            else:
+                pending_units.append((label, query, api_location))
         
-        for job_data in raw_jobs[:max_jobs]:
-            processed_job = processor.process_job(job_data)
+        # Searches run concurrently; results are merged as each one completes
+        with ThreadPoolExecutor(max_workers=max(1, len(pending_units)), thread_name_prefix="search") as executor:
+            futures = {
+                executor.submit(self._scrape_search_unit, role, label, query, api_location,
+                                max_jobs, processor, seen_job_ids, polite): label
+                for label, query, api_location in pending_units
+            }
+            
+            result = self._merge_unit_results(role, len(units),
+                                              self._iter_unit_results(role, completed, futures))
+        
+        logger.info(f"Successfully parsed {result['jobs_processed']} jobs for role: {role}")
+        
+        # Add delay between role searches
+        if polite and 'error' not in result:
+            time.sleep(self.request_delay)
+        
+        logger.info(f"Role {role}: {result['jobs_saved']} jobs saved")
+        return result
+    
+    def _merge_unit_results(self, role: str, unit_count: int,
+                            unit_results: Iterator[Tuple[str, Dict]]) -> Dict:
+        """Merge (label, stats) of a role's searches into the role result"""
+        result = {
+            'role': role,
+            'jobs_found': 0,
+            'jobs_processed': 0,
+            'jobs_saved': 0,
+            'direct_links': 0,
+            'google_links': 0,
+            'no_links': 0,
+            'jobs_known': 0,
+            'api_calls': 0
+        }
+        location_results = {}
+        failed_locations = []
+        
+        for label, stats in unit_results:
+            result['api_calls'] += stats['api_calls']
+            result['jobs_known'] += stats.get('known', 0)
+            
+            if 'error' in stats:
+                logger.error(f"API failed for {role} in {label}")
+                failed_locations.append(label)
+                location_results[label] = {'error': stats['error']}
+                continue
+            
+            if stats['jobs_found'] == 0:
+                logger.warning(f"No jobs found for {role} in {label} (API worked, just empty results)")
+            
+            location_results[label] = stats
+            
+            for key in ('jobs_found', 'jobs_processed', 'jobs_saved',
+                        'direct_links', 'google_links', 'no_links'):
+                result[key] += stats[key]
+            
+            logger.info(f"Link stats ({label}) - Direct: {stats['direct_links']}, "
+                       f"Google: {stats['google_links']}, None: {stats['no_links']}, "
+                       f"Duplicates: {stats['duplicates']}, Known: {stats['known']}, "
+                       f"Pages: {stats['pages']}")
+        
+        if len(failed_locations) == unit_count:
+            logger.error(f"API failed for {role} - skipping this role")
+            result['error'] = 'API_FAILURE'
+        
+        if self.location_fanout and unit_count > 1:
+            result['locations'] = location_results
+        
+        return result
+    
+    def _iter_unit_results(self, role: str, completed: List[Tuple[str, Dict]],
+                           futures: Dict) -> Iterator[Tuple[str, Dict]]:
+        """Yield (label, stats) for journaled searches, then running ones as they finish"""
+        yield from completed
+        
+        for future in as_completed(futures):
+            label = futures[future]
+            try:
+                yield label, future.result()
+            except Exception as e:
+                logger.error(f"Search failed for {role} in {label}: {e}")
+                yield label, {'error': str(e), 'api_calls': 0}
+    
+    def _scrape_search_unit(self, role: str, label: str, query: str, api_location: Optional[str],
+                            max_jobs: int, processor, seen_job_ids: set, polite: bool = True) -> Dict:
+        """Page through one search, processing and saving each batch as it arrives"""
+        stats = self.new_unit_stats()
+        
+        # Continue a search the previous run of this session left half-way
+        cursor = None
+        progress = self.journal.page_progress(role, label) if self.journal else None
+        if progress:
+            logger.info(f"Resuming {role} in {label} from page {progress['page']}")
+            stats.update(progress['stats'])
+            cursor = {key: progress[key] for key in ('page', 'next_page_token', 'collected')}
+        
+        watermark = self.load_watermark(role, label)
+        
+        cursor = cursor or {}
+        for new_jobs in self.iter_search_jobs(query, api_location, max_jobs, processor,
+                                              seen_job_ids, stats, watermark, cursor):
+            batch_stats = self._process_and_save(new_jobs, processor, polite, role=role, watermark=watermark)
+            for key, value in batch_stats.items():
+                stats[key] += value
+            
+            if self.journal:
+                self.journal.record_page(role, label, cursor['page'], cursor['next_page_token'],
+                                         cursor['collected'], stats)
+        
+        # Only move the watermark forward after a search that actually ran
+        if watermark and 'error' not in stats:
+            self.save_watermark(role, label, watermark)
+        
+        if self.journal and 'error' not in stats:
+            self.journal.record_unit(role, label, stats)
+        
+        return stats
+    
+    @staticmethod
+    def new_unit_stats() -> Dict:
+        """Zeroed stats of one (role, location) search"""
+        return {
+            'jobs_found': 0,
+            'jobs_processed': 0,
+            'jobs_saved': 0,
+            'direct_links': 0,
+            'google_links': 0,
+            'no_links': 0,
+            'duplicates': 0,
+            'api_calls': 0,
+            'pages': 0,
+            'known': 0
+        }
+    
+    def load_watermark(self, role: str, label: str) -> Optional[Watermark]:
+        """Watermark of a search in incremental mode, None otherwise"""
+        if not self.incremental:
+            return None
+        try:
+            doc = db.get_watermark(role, label)
+        except Exception as e:
+            if not self.spool:
+                raise
+            # Without its watermark the search runs in full; the jobs go to the spool anyway
+            logger.warning(f"Watermark of {role} in {label} unavailable: {e}")
+            return None
+        return Watermark.from_document(
+            role, label, doc,
+            stop_after=config.INCREMENTAL_STOP_AFTER, max_size=config.WATERMARK_SIZE
+        )
+    
+    def save_watermark(self, role: str, label: str, watermark: Watermark):
+        """Store a search's watermark; with the spool enabled a down database only logs a warning"""
+        try:
+            db.save_watermark(role, label, watermark.to_document())
+        except Exception as e:
+            if not self.spool:
+                raise
+            logger.warning(f"Could not save watermark of {role} in {label}: {e}")
+    
+    def _process_and_save(self, raw_jobs: List[Dict], processor, polite: bool = True,
+                          scraped_date: Optional[datetime] = None, role: Optional[str] = None,
+                          watermark: Optional[Watermark] = None) -> Dict:
+        """Process and save one batch of new raw search results
+
+        Stored jobs are recorded in the watermark; a failed save marks it
+        incomplete so the job is looked for again next run.
+        """
+        stats = {
+            'jobs_processed': 0,
+            'jobs_saved': 0,
+            'direct_links': 0,
+            'google_links': 0,
+            'no_links': 0
+        }
+        link_keys = {'direct': 'direct_links', 'google': 'google_links', 'none': 'no_links'}
+        
+        processed_jobs = []
+        for job_data in raw_jobs:
+            processed_job = processor.process_job(job_data, role)
             if processed_job:
+                if scraped_date:
+                    processed_job['scraped_date'] = scraped_date
                 processed_jobs.append(processed_job)
                 # Track link types
                 link_type = processed_job.get('link_type', 'none')
-                if link_type in link_stats:
-                    link_stats[link_type] += 1
+                if link_type in link_keys:
+                    stats[link_keys[link_type]] += 1
             else:
-                link_stats['none'] += 1
+                stats['no_links'] += 1
             
             # Small delay to be respectful
-            time.sleep(0.1)
+            if polite:
+                time.sleep(0.1)
         
-        logger.info(f"Successfully parsed {len(processed_jobs)} jobs for role: {role}")
-        logger.info(f"Link stats - Direct: {link_stats['direct']}, Google: {link_stats['google']}, None: {link_stats['none']}")
+        stats['jobs_processed'] = len(processed_jobs)
         
         # Save to database
-        saved_count = 0
-        for job in processed_jobs:
-            if db.insert_job(job):
-                saved_count += 1
+        stored = self.save_jobs(processed_jobs)
+        stats['jobs_saved'] = sum(stored)
+        if watermark:
+            watermark.record_stored(job['job_id'] for job, ok in zip(processed_jobs, stored) if ok)
+            if not all(stored):
+                watermark.mark_incomplete()
         
-        # Add delay between role searches
-        time.sleep(self.request_delay)
+        return stats
+    
+    def save_jobs(self, jobs: List[Dict]) -> List[bool]:
+        """Save processed jobs, one flag per job: stored (new or already present) or not
+
+        With the spool enabled, jobs count as stored once spooled: while the
+        database is unreachable they go to disk for a later --drain-spool.
+        """
+        if not jobs:
+            return []
+        if self.spool and self.spool.db_down():
+            self.spool.append(jobs)
+            return [True] * len(jobs)
         
-        result = {
-            'role': role,
+        try:
+            result = db.insert_jobs_batch(jobs)
+        except Exception as e:
+            # The database could not even be reached (no connection yet)
+            if not self.spool:
+                raise
+            result = {"inserted_job_ids": [], "failed_job_ids": [job.get('job_id') for job in jobs],
+                      "db_error": str(e)}
+        if self._session_added is not None and result.get("inserted_job_ids"):
+            inserted = set(result["inserted_job_ids"])
+            added = {job['job_id']: job_changesets.added_entry(job) for job in jobs if job.get('job_id') in inserted}
+            with self._stats_lock:
+                self._session_added.extend(added.values())
+        failed = set(result["failed_job_ids"])
+        if self.spool and result.get("db_error"):
+            self.spool.mark_db_down()
+            self.spool.append([job for job in jobs if job.get('job_id') in failed])
+            logger.warning(f"Database unavailable, spooled {len(failed)} jobs to {self.spool.directory}")
+            return [True] * len(jobs)
+        return [job.get('job_id') not in failed for job in jobs]
+    
+    def drain_spool(self, batch_size: int = 500) -> Dict:
+        """Replay spooled jobs into the database"""
+        spool = self.spool or JobSpool(config.JOB_SPOOL_DIR)
+        started = time.time()
+        summary = spool.replay(db, batch_size)
+        summary['duration_seconds'] = time.time() - started
+        return summary
+    
+    def build_feed_snapshots(self) -> Dict:
+        """Rebuild the precomputed feeds from one newest-first pass over recent jobs
+
+        Feeds cover everything, each search location and each configured
+        role, and are stored as snapshots (one key lookup to read) and,
+        with FEED_FILES_DIR, as static .json.gz files. When every feed
+        lists the same jobs as the stored ones nothing is written.
+        """
+        started = time.time()
+        feeds = job_feeds.build_feeds(
+            db.iter_recent_jobs(config.FEED_DAYS),
+            config.get_search_locations(), config.get_job_roles(), config.FEED_SIZE
+        )
+        
+        stored = db.get_feed_snapshot(job_feeds.OVERALL_KEY)
+        files_missing = config.FEED_FILES_DIR and not os.path.exists(job_feeds.index_path(config.FEED_FILES_DIR))
+        if stored and stored.get('digest') == feeds[0]['digest'] and not files_missing:
+            logger.info("Feed snapshots unchanged, nothing rewritten")
+            return {'feeds': 0, 'files': 0, 'unchanged': True,
+                    'duration_seconds': round(time.time() - started, 2)}
+        
+        summary = {'feeds': db.save_feed_snapshots(feeds), 'files': 0}
+        if config.FEED_FILES_DIR:
+            summary['files'] = job_feeds.write_feed_files(feeds, config.FEED_FILES_DIR)
+            summary['directory'] = config.FEED_FILES_DIR
+        summary['duration_seconds'] = round(time.time() - started, 2)
+        logger.info(f"Feed snapshots rebuilt: {summary['feeds']} feeds, {summary['files']} files")
+        return summary
+    
+    def scrape_page(self, query: str, api_location: Optional[str], role: str, max_jobs: int,
+                    next_page_token: Optional[str] = None, page: int = 0,
+                    collected: int = 0) -> Tuple[Dict, Optional[str], int]:
+        """Fetch, process and save one results page of a search on its own (work queue tasks)
+
+        `collected` jobs of the search were saved by earlier pages. Returns
+        (stats, next_page_token, collected): the token is None when no
+        further page should be fetched, stats hold 'error' if the page
+        could not be fetched.
+        """
+        from job_scraper.job_processor import JobProcessor
+        processor = JobProcessor()
+        
+        result = self.search_jobs_page(query, api_location, next_page_token, page)
+        if result is None:
+            return {'error': 'API_FAILURE'}, None, collected
+        
+        raw_jobs, next_page_token = result
+        new_jobs, duplicates = self._claim_new_jobs(raw_jobs, processor, set())
+        new_jobs = new_jobs[:max_jobs - collected]
+        
+        stats = self._process_and_save(new_jobs, processor, polite=False, role=role)
+        stats.update({
             'jobs_found': len(raw_jobs),
-            'jobs_processed': len(processed_jobs),
-            'jobs_saved': saved_count,
-            'direct_links': link_stats['direct'],
-            'google_links': link_stats['google'],
-            'no_links': link_stats['none']
+            'duplicates': duplicates,
+            'api_calls': 1,
+            'pages': 1
+        })
+        
+        collected += len(new_jobs)
+        if not (raw_jobs and next_page_token and collected < max_jobs and page + 1 < self.max_pages):
+            next_page_token = None
+        return stats, next_page_token, collected
+    
+    def replay_stored_responses(self, since: Optional[date] = None, until: Optional[date] = None) -> Dict:
+        """Rebuild jobs from stored SerpAPI responses without any network calls
+
+        Jobs keep the time their response was stored as scraped_date.
+        """
+        store = self.response_store or ResponseStore(config.RESPONSE_STORE_DIR, config.RESPONSE_STORE_TTL_DAYS)
+        logger.info(f"Replaying stored responses from {store.base_dir}")
+        
+        from job_scraper.job_processor import JobProcessor
+        processor = JobProcessor()
+        
+        replay_start = datetime.now(timezone.utc)
+        seen_job_ids = set()
+        days = set()
+        summary = {
+            'responses_replayed': 0,
+            'jobs_found': 0,
+            'jobs_processed': 0,
+            'jobs_saved': 0,
+            'direct_links': 0,
+            'google_links': 0,
+            'no_links': 0,
+            'duplicates': 0
         }
         
-        logger.info(f"Role {role}: {saved_count} jobs saved")
-        return result
+        for stored in store.iter_responses(since, until):
+            raw_jobs = stored['payload'].get('jobs_results', [])
+            summary['responses_replayed'] += 1
+            summary['jobs_found'] += len(raw_jobs)
+            days.add(stored['date'])
+            
+            new_jobs, duplicates = self._claim_new_jobs(raw_jobs, processor, seen_job_ids)
+            summary['duplicates'] += duplicates
+            
+            # Queries are built as "<role> jobs in (<locations>)"
+            role = stored['query'].split(' jobs in ')[0] if ' jobs in ' in stored['query'] else None
+            stats = self._process_and_save(
+                new_jobs, processor, polite=False,
+                scraped_date=datetime.fromisoformat(stored['stored_at']), role=role
+            )
+            for key, value in stats.items():
+                summary[key] += value
+        
+        summary['days_replayed'] = len(days)
+        summary['duration_seconds'] = (datetime.now(timezone.utc) - replay_start).total_seconds()
+        
+        logger.info(f"Replay completed: {summary['responses_replayed']} responses, "
+                   f"{summary['jobs_saved']} jobs saved")
+        return summary
     
-    def scrape_multiple_roles(self, roles: List[str], max_jobs_per_role: int = 20) -> Dict:
-        """Scrape multiple roles efficiently"""
+    def scrape_multiple_roles(self, roles: List[str], max_jobs_per_role: int = 20,
+                              journal: Optional[SessionJournal] = None) -> Dict:
+        """Scrape multiple roles efficiently
+
+        With a session journal, completed work is checkpointed as it happens
+        and work recorded by an earlier run of the same session is skipped.
+        """
         logger.info(f"Starting scraping session for {len(roles)} roles")
         logger.info(f"Location mode: {config.LOCATION_MODE}")
         
-        session_start = datetime.now(timezone.utc)
+        session_start = self._start_session(roles, max_jobs_per_role, journal)
         results = []
+        
+        for i, role in enumerate(roles, 1):
+            logger.info(f"Processing role {i}/{len(roles)}: {role}")
+            results.append(self._run_role(role, max_jobs_per_role))
+        
+        return self.build_summary(roles, results, session_start)
+    
+    async def scrape_multiple_roles_async(self, roles: List[str], max_jobs_per_role: int = 20,
+                                          concurrency: Optional[int] = None,
+                                          journal: Optional[SessionJournal] = None) -> Dict:
+        """Scrape roles concurrently, bounded by a concurrency limit and the global rate limiter"""
+        concurrency = max(1, concurrency or self.concurrency)
+        logger.info(f"Starting async scraping session for {len(roles)} roles (concurrency: {concurrency})")
+        logger.info(f"Location mode: {config.LOCATION_MODE}")
+        
+        session_start = self._start_session(roles, max_jobs_per_role, journal)
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        # Blocking HTTP and DB calls run on a pool sized to the concurrency limit
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="scraper") as executor:
+            async def run_role(role: str) -> Dict:
+                async with semaphore:
+                    return await loop.run_in_executor(
+                        executor, self._run_role, role, max_jobs_per_role, False
+                    )
+            
+            # gather keeps results in the same order as roles
+            results = await asyncio.gather(*(run_role(role) for role in roles))
+        
+        return self.build_summary(roles, list(results), session_start)
+    
+    def scrape_multiple_roles_concurrent(self, roles: List[str], max_jobs_per_role: int = 20,
+                                         concurrency: Optional[int] = None,
+                                         journal: Optional[SessionJournal] = None) -> Dict:
+        """Synchronous entry point for the async scraping mode"""
+        return asyncio.run(self.scrape_multiple_roles_async(roles, max_jobs_per_role, concurrency, journal))
+    
+    def scrape_multiple_roles_pipeline(self, roles: List[str], max_jobs_per_role: int = 20,
+                                       journal: Optional[SessionJournal] = None) -> Dict:
+        """Scrape roles through the staged fetch/process/persist pipeline
+
+        Same summary as the other modes, plus per-stage queue depth and
+        throughput under 'pipeline'.
+        """
+        from job_scraper.pipeline import ScrapePipeline
+        
+        pipeline = ScrapePipeline(self)
+        logger.info(f"Starting pipeline scraping session for {len(roles)} roles "
+                   f"(workers - fetch: {pipeline.fetch_workers}, process: {pipeline.process_workers}, "
+                   f"persist: {pipeline.persist_workers})")
+        logger.info(f"Location mode: {config.LOCATION_MODE}")
+        
+        session_start = self._start_session(roles, max_jobs_per_role, journal)
+        results, pipeline_stats = pipeline.run(roles, max_jobs_per_role)
+        
+        return self.build_summary(roles, results, session_start, pipeline=pipeline_stats)
+    
+    def _start_session(self, roles: List[str], max_jobs_per_role: int,
+                       journal: Optional[SessionJournal]) -> datetime:
+        """Reset per-session state, return the session start time"""
+        self.rate_limiter.reset_stats()
+        self._cache_hits = 0
+        self.journal = journal
+        self._session_added = [] if config.CHANGESETS_ENABLED else None
+        if journal:
+            journal.start(roles, max_jobs_per_role)
+        return datetime.now(timezone.utc)
+    
+    def _run_role(self, role: str, max_jobs: int, polite: bool = True) -> Dict:
+        """Scrape one role inside a session, never raising"""
+        if self.journal:
+            stored = self.journal.completed_role(role)
+            if stored:
+                logger.info(f"Role {role} already completed in session {self.journal.session_id}, skipping")
+                return dict(stored, resumed=True)
+        
+        try:
+            result = self.scrape_role(role, max_jobs, polite)
+        except Exception as e:
+            logger.error(f"Failed to scrape role {role}: {e}")
+            return self._failed_result(role, str(e))
+        
+        logger.info(f"Role {role}: {result['jobs_saved']} jobs saved "
+                   f"(Direct: {result['direct_links']}, Google: {result['google_links']})")
+        
+        # Failed roles stay open so a resumed session retries them
+        if self.journal and 'error' not in result:
+            self.journal.record_role(role, result)
+        return result
+    
+    def _failed_result(self, role: str, error: str) -> Dict:
+        """Result entry for a role that raised during scraping"""
+        return {
+            'role': role,
+            'jobs_found': 0,
+            'jobs_processed': 0,
+            'jobs_saved': 0,
+            'direct_links': 0,
+            'google_links': 0,
+            'no_links': 0,
+            'error': error
+        }
+    
+    def build_summary(self, roles: List[str], results: List[Dict], session_start: datetime,
+                       **extra) -> Dict:
+        """Summarize a finished session and run the post-run stages
+
+        Records the session's changeset, rebuilds feed snapshots and
+        finishes the journal; extra keys are added to the summary as-is.
+        """
+        summary = self.summarize_results(roles, results, session_start, **extra)
+        
+        # Jobs this session added, stored as a changeset and referenced from the summary
+        if self._session_added is not None:
+            summary['changeset'] = job_changesets.record_changeset(
+                db, 'scrape', self._session_added, [],
+                session_id=self.journal.session_id if self.journal else None, started_at=session_start
+            )
+            self._session_added = None
+        
+        # Post-scrape stage: feeds are read far more often than they change
+        if config.FEED_SNAPSHOTS:
+            try:
+                summary['feed_snapshots'] = self.build_feed_snapshots()
+            except Exception as e:
+                logger.error(f"Failed to rebuild feed snapshots: {e}")
+                summary['feed_snapshots'] = {'error': str(e)}
+        
+        if self.journal:
+            summary['session_id'] = self.journal.session_id
+            summary['resumed_roles'] = sum(1 for result in results if result.get('resumed'))
+            self.journal.finish({k: v for k, v in summary.items() if k != 'results'})
+            self.journal = None
+        
+        logger.info(f"Scraping completed. Total jobs saved: {summary['total_jobs_saved']}")
+        logger.info(f"Link breakdown - Direct: {summary['total_direct_links']}, "
+                   f"Google: {summary['total_google_links']}, None: {summary['total_no_links']}")
+        logger.info(f"API calls used: {summary['total_api_calls']}")
+        logger.info(f"Rate limiter - Retries: {summary['rate_limiter']['retries']}, "
+                   f"Throttled: {summary['rate_limiter']['throttled_seconds']}s, "
+                   f"Final rate: {summary['rate_limiter']['current_rate']}/s")
+        
+        return summary
+    
+    def summarize_results(self, roles: List[str], results: List[Dict], session_start: datetime,
+                          **extra) -> Dict:
+        """Aggregate per-role results into the session summary without side effects"""
         total_api_calls = 0
         total_jobs_saved = 0
         total_direct_links = 0
         total_google_links = 0
         total_no_links = 0
         
-        for i, role in enumerate(roles, 1):
-            logger.info(f"Processing role {i}/{len(roles)}: {role}")
+        location_totals = {}
+        
+        for result in results:
+            total_api_calls += result.get('api_calls', 0)
+            total_jobs_saved += result['jobs_saved']
+            total_direct_links += result['direct_links']
+            total_google_links += result['google_links']
+            total_no_links += result['no_links']
             
-            try:
-                result = self.scrape_role(role, max_jobs_per_role)
-                results.append(result)
-                
-                total_api_calls += 1  # One API call per role
-                total_jobs_saved += result['jobs_saved']
-                total_direct_links += result['direct_links']
-                total_google_links += result['google_links']
-                total_no_links += result['no_links']
-                
-                logger.info(f"Role {role}: {result['jobs_saved']} jobs saved "
-                           f"(Direct: {result['direct_links']}, Google: {result['google_links']})")
-                
-            except Exception as e:
-                logger.error(f"Failed to scrape role {role}: {e}")
-                results.append({
-                    'role': role,
-                    'jobs_found': 0,
-                    'jobs_processed': 0,
-                    'jobs_saved': 0,
-                    'direct_links': 0,
-                    'google_links': 0,
-                    'no_links': 0,
-                    'error': str(e)
+            # Fan-out mode reports every role per location as well
+            for location, stats in result.get('locations', {}).items():
+                totals = location_totals.setdefault(location, {
+                    'jobs_saved': 0, 'direct_links': 0, 'google_links': 0, 'no_links': 0, 'errors': 0
                 })
+                if 'error' in stats:
+                    totals['errors'] += 1
+                    continue
+                for key in ('jobs_saved', 'direct_links', 'google_links', 'no_links'):
+                    totals[key] += stats[key]
+        
+        # Pages served from the response store cost no API credits
+        total_api_calls -= self._cache_hits
         
         session_end = datetime.now(timezone.utc)
         duration = (session_end - session_start).total_seconds()
@@ -217,15 +905,19 @@ class JobScraper:
             'location_mode': config.LOCATION_MODE,
             'roles_processed': len(roles),
             'total_api_calls': total_api_calls,
+            'stored_responses_used': self._cache_hits,
             'total_jobs_saved': total_jobs_saved,
             'total_direct_links': total_direct_links,
             'total_google_links': total_google_links,
             'total_no_links': total_no_links,
+            'rate_limiter': self.rate_limiter.get_stats(),
             'results': results
         }
-        
-        logger.info(f"Scraping completed. Total jobs saved: {total_jobs_saved}")
-        logger.info(f"Link breakdown - Direct: {total_direct_links}, Google: {total_google_links}, None: {total_no_links}")
-        logger.info(f"API calls used: {total_api_calls}")
-        
-        return summary
\ No newline at end of file
+        if location_totals:
+            summary['location_totals'] = location_totals
+        if connected_db() is not None and db.known_jobs is not None:
+            summary['known_jobs_filter'] = db.get_known_jobs_report()
+        if self.spool and self.spool.stats['spooled']:
+            summary['spool'] = dict(self.spool.stats, directory=self.spool.directory)
+        summary.update(extra)
+        return summary
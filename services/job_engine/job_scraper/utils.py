@@ -1,7 +1,7 @@
 import logging
 from datetime import datetime, timezone
 from typing import Dict, List
-from common.database import db
+from common.database import db, get_db, connected_db
 
 logger = logging.getLogger(__name__)
 
@@ -16,22 +16,84 @@ class ScrapingUtils:
         print("="*60)
         print(f"Duration: {results['duration_seconds']:.1f} seconds")
         print(f"Location Mode: {results['location_mode']}")
+        if results.get('session_id'):
+            print(f"Session: {results['session_id']} ({results['resumed_roles']} roles resumed)")
         print(f"API Calls Used: {results['total_api_calls']}")
         print(f"Total Jobs Saved: {results['total_jobs_saved']}")
         print(f"Direct Links: {results['total_direct_links']}")
         print(f"Google Links: {results['total_google_links']}")
         print(f"No Links: {results['total_no_links']}")
         
+        limiter_stats = results.get('rate_limiter')
+        if limiter_stats:
+            print(f"API Retries: {limiter_stats['retries']} ({limiter_stats['throttled_responses']} rate limited)")
+            print(f"Throttled Time: {limiter_stats['throttled_seconds']:.1f} seconds (backoff and Retry-After), "
+                  f"pacing {limiter_stats['paced_seconds']:.1f} seconds")
+            print(f"Final Request Rate: {limiter_stats['current_rate']}/s")
+        
+        bloom_stats = results.get('known_jobs_filter')
+        if bloom_stats:
+            print(f"Known-jobs Filter: {bloom_stats['items']} jobs in {bloom_stats['size_bytes'] / 1024:.0f} KB, "
+                  f"expected false positives {bloom_stats['expected_fp_rate']:.4%} "
+                  f"(target {bloom_stats['target_fp_rate']:.2%})")
+            print(f"  └─ Checked: {bloom_stats['checked']}, definitely new: {bloom_stats['definitely_new']}, "
+                  f"verified: {bloom_stats['possible_hits']}, false positives: {bloom_stats['false_positives']}")
+        
+        spool_stats = results.get('spool')
+        if spool_stats:
+            print(f"Spooled (database unavailable): {spool_stats['spooled']} jobs in {spool_stats['directory']} "
+                  f"({spool_stats['segments']} segments, {spool_stats['fsyncs']} fsyncs), "
+                  f"run --drain-spool once it is back")
+        
+        changeset = results.get('changeset')
+        if changeset:
+            print(f"Changeset {changeset['changeset_id']}: {changeset['added']} jobs added"
+                  f"{'' if changeset['stored'] else ' (not stored)'}")
+        
+        feed_stats = results.get('feed_snapshots')
+        if feed_stats:
+            if 'error' in feed_stats:
+                print(f"Feed snapshots: rebuild failed ({feed_stats['error']})")
+            elif feed_stats.get('unchanged'):
+                print("Feed snapshots: unchanged, nothing rewritten")
+            else:
+                print(f"Feed snapshots: {feed_stats['feeds']} feeds rebuilt, "
+                      f"{feed_stats['files']} static files in {feed_stats['duration_seconds']}s")
+        
+        if results.get('pipeline'):
+            print("\nPipeline Stages:")
+            for stage, stats in results['pipeline'].items():
+                print(f"  {stage}: {stats['items']} items, {stats['items_per_second']}/s "
+                      f"({stats['workers']} workers, queue depth avg {stats['avg_queue_depth']} / "
+                      f"max {stats['max_queue_depth']}, {stats['blocked_puts']} blocked)")
+        
         print("\nRole Results:")
         for result in results['results']:
-            print(f"  {result['role']}: {result['jobs_saved']} jobs saved")
+            known = f" ({result['jobs_known']} already known)" if result.get('jobs_known') else ""
+            resumed = " [resumed]" if result.get('resumed') else ""
+            print(f"  {result['role']}: {result['jobs_saved']} jobs saved{known}{resumed}")
             print(f"    └─ Direct: {result['direct_links']}, Google: {result['google_links']}, None: {result['no_links']}")
+            for location, stats in result.get('locations', {}).items():
+                if 'error' in stats:
+                    print(f"       {location}: failed ({stats['error']})")
+                else:
+                    print(f"       {location}: {stats['jobs_saved']} saved "
+                          f"(Direct: {stats['direct_links']}, Google: {stats['google_links']}, "
+                          f"Duplicates: {stats['duplicates']})")
+        
+        if results.get('location_totals'):
+            print("\nLocation Results:")
+            for location, totals in results['location_totals'].items():
+                print(f"  {location}: {totals['jobs_saved']} jobs saved "
+                      f"(Direct: {totals['direct_links']}, Google: {totals['google_links']}, "
+                      f"None: {totals['no_links']}, Failed searches: {totals['errors']})")
         
-        # Database stats
-        stats = db.get_database_stats()
-        print(f"\nDatabase Stats:")
-        print(f"  Total Jobs: {stats.get('total_jobs', 0)}")
-        print(f"  Recent Jobs (7d): {stats.get('recent_jobs_7d', 0)}")
+        # Database stats (not when the session ran into the spool without a connection)
+        if connected_db() is not None:
+            stats = db.get_database_stats()
+            print(f"\nDatabase Stats:")
+            print(f"  Total Jobs: {stats.get('total_jobs', 0)}")
+            print(f"  Recent Jobs (7d): {stats.get('recent_jobs_7d', 0)}")
         
         # Link type distribution
         if results['total_jobs_saved'] > 0:
@@ -54,10 +116,12 @@ class ScrapingUtils:
         
         # Check database connection
         try:
-            db.get_database_stats()
+            get_db()
             logger.info("Database connection successful")
         except Exception as e:
-            raise ValueError(f"Database connection failed: {e}")
+            if not config.JOB_SPOOL:
+                raise ValueError(f"Database connection failed: {e}")
+            logger.warning(f"Database connection failed, jobs will be spooled to {config.JOB_SPOOL_DIR}: {e}")
         
         # Log configuration
         logger.info(f"Location Mode: {config.LOCATION_MODE}")
@@ -0,0 +1,85 @@
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple, Iterable
+
+logger = logging.getLogger(__name__)
+
+class Watermark:
+    """Known job_ids for one (role, location) search, kept between runs
+
+    Results come back newest first, so once `stop_after` already-known jobs
+    appear in a row the rest of the search is assumed to be old as well.
+    A job_id only becomes known once its job is stored (record_stored), so
+    jobs cut by max_jobs or lost to a failed save are picked up next time.
+    A run that left such jobs behind is saved as incomplete, and the next
+    run pages past known jobs instead of stopping at them.
+    """
+
+    def __init__(self, role: str, location: str, known_job_ids: Optional[List[str]] = None,
+                 complete: bool = True, stop_after: int = 5, max_size: int = 300):
+        self.role = role
+        self.location = location
+        self.previous_job_ids = list(known_job_ids or [])
+        self.known_job_ids = set(self.previous_job_ids)
+        # The last run left new jobs behind, so a run of known jobs does not mean the rest is old
+        self.stop_enabled = complete
+        self.stop_after = stop_after
+        self.max_size = max_size
+
+        self._lock = threading.Lock()
+        self.stored_job_ids = []
+        self.complete = True
+        self.known_run = 0
+        self.exhausted = False
+
+    @classmethod
+    def from_document(cls, role: str, location: str, doc: Optional[Dict], **kwargs) -> 'Watermark':
+        """Build a watermark from its stored document (or an empty one)"""
+        doc = doc or {}
+        return cls(role, location, doc.get('job_ids'), doc.get('complete', True), **kwargs)
+
+    def filter_new(self, raw_jobs: List[Dict], processor) -> Tuple[List[Dict], int]:
+        """Split a page into unknown jobs, return (new_jobs, known_count)
+
+        Marks the watermark exhausted and drops the rest of the page once a
+        run of known jobs is hit (unless the last run was incomplete).
+        """
+        new_jobs = []
+        known = 0
+
+        for job_data in raw_jobs:
+            job_id = processor.get_job_id(job_data)
+
+            if job_id and job_id in self.known_job_ids:
+                known += 1
+                self.known_run += 1
+                if self.stop_enabled and self.known_run >= self.stop_after:
+                    logger.info(f"Reached known jobs for {self.role} in {self.location}, stopping")
+                    self.exhausted = True
+                    break
+                continue
+
+            self.known_run = 0
+            new_jobs.append(job_data)
+
+        return new_jobs, known
+
+    def record_stored(self, job_ids: Iterable[str]):
+        """Mark jobs as known once they are stored (saved, or already in the database)"""
+        with self._lock:
+            self.stored_job_ids.extend(job_id for job_id in job_ids if job_id)
+
+    def mark_incomplete(self):
+        """Note that new jobs were left behind (max_jobs, page limit or failed saves)"""
+        self.complete = False
+
+    def to_document(self) -> Dict:
+        """Fields to store: newest job_ids first, capped at max_size"""
+        with self._lock:
+            job_ids = list(dict.fromkeys(self.stored_job_ids + self.previous_job_ids))
+        return {
+            'role': self.role,
+            'location': self.location,
+            'job_ids': job_ids[:self.max_size],
+            'complete': self.complete
+        }
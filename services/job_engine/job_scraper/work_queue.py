@@ -0,0 +1,312 @@
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Any, List, Optional
+
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from common.config import config
+from common.database import db
+from job_scraper.checkpoint import SessionJournal
+
+logger = logging.getLogger(__name__)
+
+class WorkQueue:
+    """Mongo-backed queue of (role, location, page) scraping tasks
+
+    Workers claim tasks atomically with a lease that a heartbeat keeps
+    extending. A task whose lease runs out (crashed or stuck worker) becomes
+    claimable again. Finishing a page enqueues the next one with its
+    pagination token, so pages of one search are spread across workers too.
+    """
+
+    def __init__(self):
+        if config.STORAGE_BACKEND != 'mongo':
+            raise ValueError("The work queue needs STORAGE_BACKEND=mongo")
+        self.collection = db.db[config.TASKS_COLLECTION]
+        self.lease_seconds = config.TASK_LEASE_SECONDS
+        self.max_attempts = config.TASK_MAX_ATTEMPTS
+
+    def setup_indexes(self):
+        """Indexes for claiming and for idempotent enqueueing"""
+        try:
+            self.collection.create_index(
+                [("session_id", ASCENDING), ("role", ASCENDING), ("location", ASCENDING), ("page", ASCENDING)],
+                unique=True,
+                name="task_unique"
+            )
+            self.collection.create_index(
+                [("session_id", ASCENDING), ("status", ASCENDING), ("created_at", ASCENDING)],
+                name="task_claim_index"
+            )
+        except Exception as e:
+            logger.error(f"Failed to create task indexes: {e}")
+
+    def add_task(self, session_id: str, role: str, location: str, query: str,
+                 api_location: Optional[str], max_jobs: int, page: int = 0,
+                 next_page_token: Optional[str] = None, collected: int = 0) -> bool:
+        """Enqueue one page task, ignoring tasks that already exist"""
+        now = datetime.now(timezone.utc)
+        try:
+            self.collection.insert_one({
+                "session_id": session_id,
+                "role": role,
+                "location": location,
+                "query": query,
+                "api_location": api_location,
+                "page": page,
+                "next_page_token": next_page_token,
+                "max_jobs": max_jobs,
+                "collected": collected,
+                "status": "pending",
+                "attempts": 0,
+                "worker_id": None,
+                "lease_expires": None,
+                "stats": None,
+                "created_at": now,
+                "updated_at": now
+            })
+            return True
+        except DuplicateKeyError:
+            return False
+
+    def claim(self, session_id: str, worker_id: str) -> Optional[Dict[str, Any]]:
+        """Atomically claim the oldest pending (or lease-expired) task"""
+        now = datetime.now(timezone.utc)
+        return self.collection.find_one_and_update(
+            {
+                "session_id": session_id,
+                "attempts": {"$lt": self.max_attempts},
+                "$or": [
+                    {"status": "pending"},
+                    {"status": "claimed", "lease_expires": {"$lt": now}}
+                ]
+            },
+            {
+                "$set": {
+                    "status": "claimed",
+                    "worker_id": worker_id,
+                    "lease_expires": now + timedelta(seconds=self.lease_seconds),
+                    "updated_at": now
+                },
+                "$inc": {"attempts": 1}
+            },
+            sort=[("created_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    def heartbeat(self, task_id, worker_id: str) -> bool:
+        """Extend the lease, False if another worker took the task over"""
+        now = datetime.now(timezone.utc)
+        result = self.collection.update_one(
+            {"_id": task_id, "worker_id": worker_id, "status": "claimed"},
+            {"$set": {"lease_expires": now + timedelta(seconds=self.lease_seconds), "updated_at": now}}
+        )
+        return result.matched_count == 1
+
+    def complete(self, task_id, worker_id: str, stats: Dict) -> bool:
+        """Mark a claimed task done with its stats"""
+        result = self.collection.update_one(
+            {"_id": task_id, "worker_id": worker_id, "status": "claimed"},
+            {"$set": {"status": "done", "stats": stats, "lease_expires": None,
+                      "updated_at": datetime.now(timezone.utc)}}
+        )
+        return result.matched_count == 1
+
+    def release(self, task, worker_id: str, error: str):
+        """Give a failed task back, or fail it for good after too many attempts"""
+        status = "failed" if task["attempts"] >= self.max_attempts else "pending"
+        self.collection.update_one(
+            {"_id": task["_id"], "worker_id": worker_id},
+            {"$set": {"status": status, "error": error, "lease_expires": None,
+                      "updated_at": datetime.now(timezone.utc)}}
+        )
+
+    def reap_expired(self, session_id: str) -> int:
+        """Fail tasks whose lease ran out on their last allowed attempt"""
+        result = self.collection.update_many(
+            {
+                "session_id": session_id,
+                "status": "claimed",
+                "attempts": {"$gte": self.max_attempts},
+                "lease_expires": {"$lt": datetime.now(timezone.utc)}
+            },
+            {"$set": {"status": "failed", "error": "LEASE_EXPIRED", "lease_expires": None}}
+        )
+        return result.modified_count
+
+    def has_open_tasks(self, session_id: str) -> bool:
+        """True while any task is pending or being worked on"""
+        return self.collection.count_documents(
+            {"session_id": session_id, "status": {"$in": ["pending", "claimed"]}},
+            limit=1
+        ) > 0
+
+    def get_tasks(self, session_id: str) -> List[Dict[str, Any]]:
+        """All task records of a session"""
+        return list(self.collection.find({"session_id": session_id}).sort("created_at", ASCENDING))
+
+    def latest_session(self) -> Optional[str]:
+        """Session id of the most recently created task"""
+        doc = self.collection.find_one({}, {"session_id": 1}, sort=[("created_at", -1)])
+        return doc["session_id"] if doc else None
+
+class QueueWorker:
+    """Claims tasks from the work queue and scrapes them until none are left"""
+
+    def __init__(self, scraper, queue: Optional[WorkQueue] = None, worker_id: Optional[str] = None):
+        self.scraper = scraper
+        self.queue = queue or WorkQueue()
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:4]}"
+
+    def enqueue_session(self, roles: List[str], max_jobs: int, session_id: Optional[str] = None) -> str:
+        """Enqueue the first page of every (role, location) search"""
+        session_id = session_id or SessionJournal.new_session_id()
+        self.queue.setup_indexes()
+
+        added = 0
+        for role in roles:
+            for label, query, api_location in self.scraper.build_search_units(role):
+                if self.queue.add_task(session_id, role, label, query, api_location, max_jobs):
+                    added += 1
+
+        logger.info(f"Enqueued {added} tasks for session {session_id}")
+        return session_id
+
+    def run(self, session_id: str, poll_interval: float = 5.0) -> Dict[str, int]:
+        """Work on a session until it has no open tasks, return this worker's counts"""
+        counts = {"completed": 0, "failed": 0}
+        logger.info(f"Worker {self.worker_id} joining session {session_id}")
+
+        while True:
+            task = self.queue.claim(session_id, self.worker_id)
+            if task is None:
+                self.queue.reap_expired(session_id)
+                if not self.queue.has_open_tasks(session_id):
+                    break
+                # Others still hold tasks that may expire or add next pages
+                time.sleep(poll_interval)
+                continue
+
+            if self._run_task(task):
+                counts["completed"] += 1
+            else:
+                counts["failed"] += 1
+
+        logger.info(f"Worker {self.worker_id} finished: {counts['completed']} tasks done, "
+                    f"{counts['failed']} failed")
+        return counts
+
+    def _run_task(self, task: Dict[str, Any]) -> bool:
+        """Scrape one page while a heartbeat keeps the lease alive
+
+        The next page is enqueued before this task is completed, so a crash
+        in between cannot lose it. Enqueueing is idempotent (unique index on
+        session, role, location and page): a worker that lost the lease and
+        the one that took the task over add the same page only once.
+        """
+        stop_heartbeat = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(task["_id"], stop_heartbeat), daemon=True)
+        heartbeat.start()
+
+        try:
+            stats, next_page_token, collected = self.scraper.scrape_page(
+                task["query"], task["api_location"], task["role"], task["max_jobs"],
+                task["next_page_token"], task["page"], task["collected"]
+            )
+        except Exception as e:
+            logger.error(f"Task {task['role']} / {task['location']} page {task['page']} failed: {e}")
+            self.queue.release(task, self.worker_id, str(e))
+            return False
+        finally:
+            stop_heartbeat.set()
+            heartbeat.join()
+
+        if 'error' in stats:
+            self.queue.release(task, self.worker_id, stats['error'])
+            return False
+
+        if next_page_token:
+            self.queue.add_task(
+                task["session_id"], task["role"], task["location"], task["query"],
+                task["api_location"], task["max_jobs"], task["page"] + 1, next_page_token, collected
+            )
+
+        if not self.queue.complete(task["_id"], self.worker_id, stats):
+            logger.warning(f"Lost lease on task {task['_id']}, result discarded by the queue")
+            return False
+        return True
+
+    def _heartbeat(self, task_id, stop: threading.Event):
+        interval = max(1.0, self.queue.lease_seconds / 3)
+        while not stop.wait(interval):
+            if not self.queue.heartbeat(task_id, self.worker_id):
+                logger.warning(f"Heartbeat rejected for task {task_id}")
+                return
+
+def summarize_session(scraper, session_id: str, queue: Optional[WorkQueue] = None) -> Dict:
+    """Aggregate a queue session's task records into the usual session summary"""
+    queue = queue or WorkQueue()
+    tasks = queue.get_tasks(session_id)
+    if not tasks:
+        raise ValueError(f"No tasks found for session {session_id}")
+
+    stat_keys = ('jobs_found', 'jobs_processed', 'jobs_saved', 'direct_links',
+                 'google_links', 'no_links', 'duplicates', 'api_calls', 'pages')
+    roles = []
+    by_role = {}
+
+    for task in tasks:
+        role = task["role"]
+        if role not in by_role:
+            roles.append(role)
+            by_role[role] = {}
+        location = by_role[role].setdefault(task["location"], {key: 0 for key in stat_keys})
+
+        if task["status"] == "done":
+            for key in stat_keys:
+                location[key] += task["stats"].get(key, 0)
+        elif task["status"] == "failed":
+            location["api_calls"] += task["attempts"]
+            location.setdefault("failed_tasks", 0)
+            location["failed_tasks"] += 1
+        else:
+            location.setdefault("open_tasks", 0)
+            location["open_tasks"] += 1
+
+    results = []
+    for role in roles:
+        result = {'role': role}
+        for key in ('jobs_found', 'jobs_processed', 'jobs_saved', 'direct_links',
+                    'google_links', 'no_links', 'api_calls'):
+            result[key] = sum(stats[key] for stats in by_role[role].values())
+
+        locations = {}
+        for label, stats in by_role[role].items():
+            # A search whose first page never succeeded failed as a whole
+            if stats["pages"] == 0 and stats.get("failed_tasks"):
+                locations[label] = {'error': 'API_FAILURE'}
+            else:
+                locations[label] = stats
+        if all('error' in stats for stats in locations.values()):
+            result['error'] = 'API_FAILURE'
+        if len(locations) > 1:
+            result['locations'] = locations
+        results.append(result)
+
+    # Summarizing only reads the task records; the post-run stages belong to the workers' session
+    summary = scraper.summarize_results(roles, results, tasks[0]["created_at"].replace(tzinfo=timezone.utc))
+    # Rate limiting happened in the workers, not in this process
+    summary.pop('rate_limiter', None)
+    summary['session_id'] = session_id
+    summary['tasks'] = {
+        status: sum(1 for task in tasks if task["status"] == status)
+        for status in ("pending", "claimed", "done", "failed")
+    }
+    summary['workers'] = sorted({task["worker_id"] for task in tasks if task["worker_id"]})
+    return summary
@@ -2,6 +2,13 @@
 Auto-delete old jobs script for GitHub Actions
 Deletes jobs older than specified days based on scraped_date
 Default: 60 days
+
+RETENTION_MODE=purge (default) deletes in chunks of PURGE_BATCH_SIZE with
+PURGE_PAUSE_SECONDS between them; RETENTION_MODE=ttl hands expiry to a
+MongoDB TTL index on scraped_date instead.
+
+With ARCHIVE_BEFORE_DELETE=true, purge mode writes each chunk to
+ARCHIVE_DIR (see common/job_archive.py) before deleting it.
 """
 
 import os
@@ -14,13 +21,81 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from common.logging_config import setup_logging
 
-def delete_old_jobs(days_old: int = 60, dry_run: bool = False):
-    """Delete jobs older than specified days"""
+def trim_outbox(db, days_old: int):
+    """Drop outbox entries older than the retention period (OUTBOX_ENABLED)"""
+    from common.config import config
+    if not config.OUTBOX_ENABLED:
+        return 0
+    trimmed = db.trim_outbox(datetime.now(timezone.utc) - timedelta(days=days_old))
+    print(f"::notice::Trimmed {trimmed} outbox entries older than {days_old} days")
+    return trimmed
+
+def trim_changesets(db, days_old: int):
+    """Drop changesets older than the retention period (CHANGESETS_ENABLED)"""
+    from common.config import config
+    if not config.CHANGESETS_ENABLED:
+        return 0
+    trimmed = db.trim_changesets(datetime.now(timezone.utc) - timedelta(days=days_old))
+    print(f"::notice::Trimmed {trimmed} changeset parts older than {days_old} days")
+    return trimmed
+
+def apply_ttl_retention(days_old: int = 60, dry_run: bool = False):
+    """Keep the TTL index in line with the retention period"""
     logger = logging.getLogger(__name__)
     
     try:
         # Import after path setup
         from common.database import db
+        from common.config import config
+        
+        if config.ARCHIVE_BEFORE_DELETE:
+            print("::warning::ARCHIVE_BEFORE_DELETE is ignored in ttl mode, MongoDB deletes expired jobs itself")
+        if config.CHANGESETS_ENABLED:
+            print("::warning::No changeset in ttl mode, MongoDB does not report which jobs it expired")
+        
+        current_days = db.get_ttl_days()
+        if dry_run:
+            print(f"::notice::DRY RUN - TTL index retention: {current_days} days, wanted: {days_old} days")
+            return {"mode": "ttl", "ttl_days": current_days, "days_threshold": days_old, "dry_run": True}
+        
+        changed = db.ensure_ttl_index(days_old)
+        if changed:
+            print(f"::notice::TTL index set: jobs expire {days_old} days after scraped_date")
+        else:
+            print(f"::notice::TTL index already expires jobs after {days_old} days")
+        
+        # MongoDB expires documents itself, so the counters are recomputed
+        stats = db.rebuild_stats()
+        print(f"::notice::Total jobs: {stats['total']}")
+        trim_outbox(db, days_old)
+        trim_changesets(db, days_old)
+        
+        return {
+            "mode": "ttl",
+            "ttl_days": days_old,
+            "changed": changed,
+            "total_after": stats['total'],
+            "days_threshold": days_old,
+            "dry_run": False
+        }
+        
+    except Exception as e:
+        logger.error(f"Failed to apply TTL retention: {e}")
+        print(f"::error::Failed to apply TTL retention: {e}")
+        raise
+
+def delete_old_jobs(days_old: int = 60, dry_run: bool = False, batch_size: int = 1000,
+                    pause_seconds: float = 0.5, archive_dir: str = None):
+    """Delete jobs older than specified days in throttled chunks"""
+    logger = logging.getLogger(__name__)
+    
+    try:
+        # Import after path setup
+        from common.database import db
+        from common.config import config
+        from common import job_changesets
+        
+        purge_start = datetime.now(timezone.utc)
         
         # Get database stats before deletion
         stats_before = db.get_database_stats()
@@ -31,9 +106,20 @@ def delete_old_jobs(days_old: int = 60, dry_run: bool = False):
         
         logger.info(f"Checking for jobs older than {days_old} days")
         
-        # Find old jobs count
         old_jobs_query = {"scraped_date": {"$lt": cutoff_date}}
-        old_jobs_count = db.jobs_collection.count_documents(old_jobs_query)
+        
+        # A leftover TTL index would keep deleting behind the purge
+        if not dry_run and db.drop_ttl_index():
+            print("::notice::Dropped TTL index (RETENTION_MODE=purge)")
+        if not dry_run:
+            trim_outbox(db, days_old)
+            trim_changesets(db, days_old)
+        
+        # Only a dry run counts; a purge just checks there is something to delete
+        if dry_run:
+            old_jobs_count = db.count_jobs(old_jobs_query)
+        else:
+            old_jobs_count = db.count_jobs(old_jobs_query, limit=1)
         
         if old_jobs_count == 0:
             print(f"::notice::No jobs older than {days_old} days found")
@@ -58,10 +144,28 @@ def delete_old_jobs(days_old: int = 60, dry_run: bool = False):
                 "dry_run": True
             }
         
-        # Actually delete old jobs
-        logger.info(f"Deleting {old_jobs_count} old jobs...")
-        delete_result = db.jobs_collection.delete_many(old_jobs_query)
-        deleted_count = delete_result.deleted_count
+        # Actually delete old jobs, chunk by chunk
+        logger.info(f"Deleting jobs older than {days_old} days in chunks of {batch_size}...")
+        
+        def report_chunk(chunk: int, chunk_deleted: int, total_deleted: int):
+            print(f"::notice::Chunk {chunk}: deleted {chunk_deleted} jobs ({total_deleted} so far)")
+        
+        archive = None
+        if archive_dir:
+            from common.job_archive import JobArchive
+            archive = JobArchive(archive_dir)
+            logger.info(f"Archiving jobs to {archive_dir} before deleting them")
+        
+        # job_ids of deleted jobs, for this purge's changeset
+        removed = [] if config.CHANGESETS_ENABLED else None
+        deleted_count = db.delete_jobs(old_jobs_query, batch_size, pause_seconds, report_chunk, archive, removed)
+        
+        changeset = None
+        if removed is not None:
+            changeset = job_changesets.record_changeset(db, 'purge', [], removed, started_at=purge_start)
+            print(f"::notice::Changeset {changeset['changeset_id']}: {changeset['removed']} jobs removed")
+            if not changeset['stored']:
+                print("::warning::Changeset could not be stored")
         
         # Get stats after deletion
         stats_after = db.get_database_stats()
@@ -69,9 +173,15 @@ def delete_old_jobs(days_old: int = 60, dry_run: bool = False):
         
         print(f"::notice::Deletion completed successfully")
         print(f"::notice::Total jobs before: {total_jobs_before} | Deleted: {deleted_count} | Remaining: {total_jobs_after}")
+        if archive:
+            report = archive.get_report()
+            print(f"::notice::Archive: {report['partitions']} days ({report['first_day']} to {report['last_day']}), "
+                  f"{report['files']} files, {report['size_mb']} MB")
         
         return {
             "deleted_count": deleted_count,
+            "archived": archive is not None,
+            "changeset": changeset,
             "total_before": total_jobs_before,
             "total_after": total_jobs_after,
             "days_threshold": days_old,
@@ -90,12 +200,17 @@ def main():
     try:
         logger.info("Starting auto-deletion of old jobs")
         
-        # Get configuration from environment - DEFAULT: 60 days
-        days_old = int(os.getenv('DELETE_JOBS_OLDER_THAN_DAYS', '60'))
+        # Import after path setup
+        from common.config import config
+        
+        # Retention settings come from config - DEFAULT: 60 days
+        days_old = config.DELETE_JOBS_OLDER_THAN_DAYS
         dry_run = os.getenv('DRY_RUN', 'false').lower() == 'true'
         
         # Validate environment variables
-        required_vars = ['MONGODB_URI', 'DATABASE_NAME', 'JOBS_COLLECTION']
+        required_vars = ['DATABASE_NAME', 'JOBS_COLLECTION']
+        if config.STORAGE_BACKEND == 'mongo':
+            required_vars.append('MONGODB_URI')
         missing_vars = [var for var in required_vars if not os.getenv(var)]
         
         if missing_vars:
@@ -103,7 +218,15 @@ def main():
             sys.exit(1)
         
         # Run deletion
-        results = delete_old_jobs(days_old, dry_run)
+        if config.RETENTION_MODE == 'ttl':
+            results = apply_ttl_retention(days_old, dry_run)
+        else:
+            results = delete_old_jobs(
+                days_old, dry_run,
+                batch_size=config.PURGE_BATCH_SIZE,
+                pause_seconds=config.PURGE_PAUSE_SECONDS,
+                archive_dir=config.ARCHIVE_DIR if config.ARCHIVE_BEFORE_DELETE else None
+            )
         
         logger.info("Auto-deletion completed successfully")
         return True
@@ -26,10 +26,11 @@ def validate_github_environment():
     # Check required environment variables
     required_vars = [
         'SERPAPI_API_KEY',
-        'MONGODB_URI',
         'DATABASE_NAME',
         'JOBS_COLLECTION'
     ]
+    if os.getenv('STORAGE_BACKEND', 'mongo').lower() == 'mongo':
+        required_vars.append('MONGODB_URI')
     
     missing_vars = []
     for var in required_vars:
@@ -50,8 +51,9 @@ def run_scraping_session():
         # Import after path setup
         from job_scraper.scraper import JobScraper
         from job_scraper.utils import ScrapingUtils
+        from job_scraper.checkpoint import open_journal
         from common.config import config
-        from common.database import db
+        from common.database import db, connected_db
         
         # Validate configuration
         ScrapingUtils.validate_configuration()
@@ -69,18 +71,69 @@ def run_scraping_session():
         logger.info(f"Max jobs per role: {max_jobs}")
         logger.info(f"Test mode: {test_mode}")
         logger.info(f"Roles to scrape: {len(selected_roles)}")
+        logger.info(f"Async mode: {config.ASYNC_SCRAPING} (concurrency: {config.SCRAPER_CONCURRENCY})")
         
         # Initialize scraper
         scraper = JobScraper()
         
+        # Jobs an earlier run spooled (restored by the workflow) go into the database first
+        if scraper.spool and scraper.spool.segments() and not scraper.spool.db_down():
+            drained = scraper.drain_spool()
+            print(f"::notice::Spool replayed: {drained['jobs']} jobs, "
+                  f"{drained['remaining_segments']} segments left")
+        
+        # Session journal; RESUME_SESSION=latest continues an interrupted run
+        journal = open_journal(os.getenv('RESUME_SESSION') or None)
+        if journal and journal.params.get('roles'):
+            selected_roles = journal.params['roles']
+            max_jobs = journal.params.get('max_jobs_per_role', max_jobs)
+            print(f"::notice::Resuming session {journal.session_id}")
+        
         # Run scraping
-        results = scraper.scrape_multiple_roles(selected_roles, max_jobs)
+        if config.PIPELINE_MODE:
+            results = scraper.scrape_multiple_roles_pipeline(selected_roles, max_jobs, journal)
+        elif config.ASYNC_SCRAPING:
+            results = scraper.scrape_multiple_roles_concurrent(selected_roles, max_jobs, journal=journal)
+        else:
+            results = scraper.scrape_multiple_roles(selected_roles, max_jobs, journal)
+        if scraper.response_store:
+            scraper.response_store.evict_expired()
+        scraper.close()
         
         # Print results for GitHub Actions logs
         print(f"\n::notice::Scraping completed successfully!")
         print(f"::notice::Jobs saved: {results['total_jobs_saved']}")
         print(f"::notice::API calls used: {results['total_api_calls']}")
         print(f"::notice::Duration: {results['duration_seconds']:.1f} seconds")
+        changeset = results.get('changeset')
+        if changeset:
+            print(f"::notice::Changeset {changeset['changeset_id']}: {changeset['added']} jobs added")
+            if not changeset['stored']:
+                print("::warning::Changeset could not be stored")
+        feed_stats = results.get('feed_snapshots')
+        if feed_stats and 'error' in feed_stats:
+            print(f"::warning::Feed snapshots not rebuilt: {feed_stats['error']}")
+        elif feed_stats and feed_stats.get('unchanged'):
+            print("::notice::Feed snapshots unchanged")
+        elif feed_stats:
+            print(f"::notice::Feed snapshots: {feed_stats['feeds']} feeds, {feed_stats['files']} static files")
+        spool_stats = results.get('spool')
+        if spool_stats:
+            print(f"::warning::Database unavailable, {spool_stats['spooled']} jobs spooled to "
+                  f"{spool_stats['directory']}")
+        if results.get('session_id'):
+            print(f"::notice::Session: {results['session_id']} ({results['resumed_roles']} roles resumed)")
+        
+        limiter_stats = results.get('rate_limiter', {})
+        if limiter_stats:
+            print(f"::notice::API retries: {limiter_stats['retries']} | "
+                  f"Throttled: {limiter_stats['throttled_seconds']:.1f}s | "
+                  f"Pacing: {limiter_stats['paced_seconds']:.1f}s | "
+                  f"Final rate: {limiter_stats['current_rate']}/s")
+        
+        for stage, stats in results.get('pipeline', {}).items():
+            print(f"::notice::Pipeline {stage}: {stats['items']} items at {stats['items_per_second']}/s, "
+                  f"max queue depth {stats['max_queue_depth']}")
         
         # Print link distribution
         direct_links = results['total_direct_links']
@@ -99,9 +152,10 @@ def run_scraping_session():
                 print(f"::notice::Results saved to: {filename}")
         
         # Database stats
-        stats = db.get_database_stats()
-        print(f"::notice::Database total jobs: {stats.get('total_jobs', 0)}")
-        print(f"::notice::Recent jobs (7d): {stats.get('recent_jobs_7d', 0)}")
+        if connected_db() is not None:
+            stats = db.get_database_stats()
+            print(f"::notice::Database total jobs: {stats.get('total_jobs', 0)}")
+            print(f"::notice::Recent jobs (7d): {stats.get('recent_jobs_7d', 0)}")
         
         return True
         
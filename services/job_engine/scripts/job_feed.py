@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Read newly inserted jobs from the outbox (OUTBOX_ENABLED), or the
+per-session changesets (CHANGESETS_ENABLED) for a time range.
+Prints one JSON line per job, in sequence order. A consumer keeps the last
+seq it processed and passes it back with --after to resume.
+
+On MongoDB the outbox is written after the jobs, not in the same
+transaction: a job is listed at most once, and one whose outbox write
+failed is never listed (the failure is logged by the writer). Consumers
+that must not miss jobs should also reconcile against --changesets.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from datetime import datetime, timezone
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.logging_config import setup_logging
+
+# Initialize logger
+logger = None  # Will be set in main()
+
+def parse_arguments():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(
+        description="New-job feed from the outbox",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python job_feed.py --after 0                  # Everything still in the outbox
+  python job_feed.py --after 1520 --follow      # Keep polling for jobs after seq 1520
+  python job_feed.py --change-stream            # Tail inserts with a change stream (replica set only)
+  python job_feed.py --changesets 2025-01-01    # Added/removed jobs per session since a date
+        """
+    )
+
+    parser.add_argument(
+        '--after',
+        type=int,
+        default=None,
+        help='Print entries after this sequence number (default: only new ones)'
+    )
+
+    parser.add_argument(
+        '--limit',
+        type=int,
+        default=100,
+        help='Entries per read (default: 100)'
+    )
+
+    parser.add_argument(
+        '--follow',
+        action='store_true',
+        help='Keep polling for new entries'
+    )
+
+    parser.add_argument(
+        '--poll-interval',
+        type=float,
+        default=5.0,
+        help='With --follow: seconds between polls once caught up (default: 5)'
+    )
+
+    parser.add_argument(
+        '--change-stream',
+        action='store_true',
+        help='Tail inserted jobs with a MongoDB change stream instead of the outbox'
+    )
+
+    parser.add_argument(
+        '--changesets',
+        metavar='SINCE',
+        type=datetime.fromisoformat,
+        help='Print the changesets created since this date/time (ISO), one per line'
+    )
+
+    parser.add_argument(
+        '--until',
+        type=datetime.fromisoformat,
+        help='With --changesets: end of the time range (exclusive)'
+    )
+
+    parser.add_argument(
+        '--kind',
+        choices=['scrape', 'purge'],
+        help='With --changesets: only changesets of this kind'
+    )
+
+    return parser.parse_args()
+
+def utc(value):
+    return value.replace(tzinfo=timezone.utc) if value and value.tzinfo is None else value
+
+def print_entry(entry):
+    print(json.dumps(entry, default=str, ensure_ascii=False), flush=True)
+
+def follow_outbox(db, after_seq: int, limit: int, follow: bool, poll_interval: float):
+    """Print outbox entries after after_seq; with follow, poll until interrupted"""
+    while True:
+        result = db.read_outbox(after_seq, limit)
+        for entry in result["entries"]:
+            print_entry(entry)
+        after_seq = result["next_seq"]
+
+        if len(result["entries"]) < limit:
+            if not follow:
+                return after_seq
+            time.sleep(poll_interval)
+
+def main():
+    """Main function for the job feed"""
+    args = parse_arguments()
+
+    global logger
+    # stdout carries the feed, so only warnings are logged
+    logger = setup_logging(quiet=True)
+
+    try:
+        # Import after path setup
+        from common.database import db
+        from common.config import config
+
+        if args.changesets:
+            for changeset in db.get_changesets(utc(args.changesets), utc(args.until), args.kind):
+                print_entry(changeset)
+            return
+
+        if args.change_stream:
+            for change in db.watch_new_jobs():
+                print_entry(change["job"])
+            return
+
+        if not config.OUTBOX_ENABLED:
+            logger.warning("OUTBOX_ENABLED is off, no new entries will be recorded")
+
+        after_seq = db.get_outbox_seq() if args.after is None else args.after
+        last_seq = follow_outbox(db, after_seq, args.limit, args.follow, args.poll_interval)
+        logger.info(f"Read outbox up to seq {last_seq}")
+
+    except KeyboardInterrupt:
+        logger.info("Job feed interrupted by user")
+
+    except Exception as e:
+        print(f"\nError: {e}", file=sys.stderr)
+        logger.error(f"Job feed failed: {e}", exc_info=True)
+        sys.exit(1)
+
+    finally:
+        try:
+            from common.database import db
+            db.close_connection()
+        except Exception as e:
+            logger.warning(f"Failed to close database connection: {e}")
+
+if __name__ == "__main__":
+    main()
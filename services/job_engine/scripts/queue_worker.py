@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Distributed scraping through the Mongo work queue.
+One process enqueues a session, then any number of workers (local processes
+or GitHub Actions matrix jobs) drain it in parallel.
+"""
+
+import os
+import sys
+import argparse
+from datetime import datetime
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.logging_config import setup_logging
+
+# Initialize logger
+logger = None  # Will be set in main()
+
+def parse_arguments():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(
+        description="Distributed Job Scraper (work queue)",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python queue_worker.py enqueue --all                 # Queue every role, prints the session id
+  python queue_worker.py work --session latest         # Work on the newest session
+  python queue_worker.py summary --session <id>        # Aggregate results from task records
+        """
+    )
+    
+    parser.add_argument(
+        'command',
+        choices=['enqueue', 'work', 'summary'],
+        help='enqueue a new session, work on a session, or summarize one'
+    )
+    
+    parser.add_argument(
+        '--session',
+        default='latest',
+        help="Session id to work on or summarize (default: latest)"
+    )
+    
+    parser.add_argument(
+        '--all',
+        action='store_true',
+        help='With enqueue: queue all configured job roles'
+    )
+    
+    parser.add_argument(
+        '--test',
+        action='store_true',
+        help='With enqueue: queue the first 3 roles only'
+    )
+    
+    parser.add_argument(
+        '--max-jobs',
+        type=int,
+        default=20,
+        help='With enqueue: maximum jobs per role search (default: 20)'
+    )
+    
+    parser.add_argument(
+        '--poll-interval',
+        type=float,
+        default=5.0,
+        help='With work: seconds to wait while other workers hold the remaining tasks'
+    )
+    
+    parser.add_argument(
+        '--save-results',
+        action='store_true',
+        help='With summary: save the summary to a JSON file'
+    )
+    
+    parser.add_argument(
+        '--github',
+        action='store_true',
+        help='GitHub Actions log format'
+    )
+    
+    return parser.parse_args()
+
+def resolve_session(queue, session: str) -> str:
+    """Turn 'latest' into the newest session id"""
+    if session != 'latest':
+        return session
+    session_id = queue.latest_session()
+    if not session_id:
+        raise ValueError("No queued sessions found")
+    return session_id
+
+def main():
+    """Main function for work queue commands"""
+    args = parse_arguments()
+
+    global logger
+    logger = setup_logging(github_mode=args.github)
+    
+    try:
+        # Import after path setup
+        from job_scraper.scraper import JobScraper
+        from job_scraper.utils import ScrapingUtils
+        from job_scraper.work_queue import WorkQueue, QueueWorker, summarize_session
+        from common.config import config
+        
+        ScrapingUtils.validate_configuration()
+        
+        scraper = JobScraper()
+        queue = WorkQueue()
+        worker = QueueWorker(scraper, queue)
+        
+        if args.command == 'enqueue':
+            all_roles = config.get_job_roles()
+            roles = all_roles[:3] if args.test or not args.all else all_roles
+            session_id = worker.enqueue_session(roles, args.max_jobs)
+            print(f"Session: {session_id}")
+            # Lets a workflow pass the id on to its worker jobs
+            if os.getenv('GITHUB_OUTPUT'):
+                with open(os.environ['GITHUB_OUTPUT'], 'a') as f:
+                    f.write(f"session_id={session_id}\n")
+        
+        elif args.command == 'work':
+            session_id = resolve_session(queue, args.session)
+            counts = worker.run(session_id, args.poll_interval)
+            print(f"Worker {worker.worker_id}: {counts['completed']} tasks completed, {counts['failed']} failed")
+        
+        else:
+            session_id = resolve_session(queue, args.session)
+            results = summarize_session(scraper, session_id, queue)
+            ScrapingUtils.print_session_summary(results)
+            print(f"\nTasks: {results['tasks']} | Workers: {len(results['workers'])}")
+            
+            if args.save_results:
+                filename = ScrapingUtils.save_results_to_file(
+                    results, f"scraping_results_{session_id}_{datetime.now().strftime('%H%M%S')}.json"
+                )
+                if filename:
+                    print(f"Results saved to: {filename}")
+        
+        scraper.close()
+    
+    except KeyboardInterrupt:
+        print("\n\nWorker interrupted by user.")
+        logger.info("Worker interrupted by user")
+    
+    except Exception as e:
+        print(f"\nError: {e}")
+        logger.error(f"Work queue command failed: {e}", exc_info=True)
+        sys.exit(1)
+    
+    finally:
+        try:
+            from common.database import db
+            db.close_connection()
+        except Exception as e:
+            logger.warning(f"Failed to close database connection: {e}")
+
+if __name__ == "__main__":
+    main()
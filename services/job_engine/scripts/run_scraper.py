@@ -7,13 +7,14 @@ import os
 import sys
 import logging
 import argparse
-from datetime import datetime
+from datetime import datetime, date
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from job_scraper.scraper import JobScraper
 from job_scraper.utils import ScrapingUtils
+from job_scraper.checkpoint import open_journal
 from common.config import config
 from common.database import db
 
@@ -34,7 +35,13 @@ Examples:
   python run_scraper.py --test             # Test with first 3 roles
   python run_scraper.py --roles 1,3,5      # Scrape specific roles by number
   python run_scraper.py --max-jobs 50      # Limit jobs per role
+  python run_scraper.py --all --async      # Scrape roles concurrently
+  python run_scraper.py --all --pipeline   # Overlap fetching, processing and saving
+  python run_scraper.py --all --incremental  # Only fetch jobs newer than the last run
+  python run_scraper.py --all --resume latest  # Continue the last interrupted session
   python run_scraper.py --quiet            # Minimal output
+  python run_scraper.py --replay --since 2025-01-01  # Rebuild jobs from stored responses
+  python run_scraper.py --drain-spool     # Write spooled jobs to the database
         """
     )
     
@@ -60,7 +67,40 @@ Examples:
         '--max-jobs',
         type=int,
         default=20,
-        help='Maximum jobs per role (default: 20)'
+        help='Maximum jobs per role, or per location search with LOCATION_FANOUT (default: 20)'
+    )
+    
+    parser.add_argument(
+        '--async',
+        dest='async_mode',
+        action='store_true',
+        help='Scrape roles concurrently (default: ASYNC_SCRAPING from config)'
+    )
+    
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=None,
+        help=f'Maximum roles scraped at once in async mode (default: {config.SCRAPER_CONCURRENCY})'
+    )
+    
+    parser.add_argument(
+        '--pipeline',
+        action='store_true',
+        help='Run fetch, process and persist as separate stages (default: PIPELINE_MODE from config)'
+    )
+    
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Stop each search at already-known jobs (default: INCREMENTAL_SCRAPING from config)'
+    )
+    
+    parser.add_argument(
+        '--resume',
+        metavar='SESSION_ID',
+        help="Resume a checkpointed session by id, or 'latest' for the last unfinished one "
+             "(needs CHECKPOINT_BACKEND=file or mongo)"
     )
     
     parser.add_argument(
@@ -75,6 +115,36 @@ Examples:
         help='Save detailed results to JSON file'
     )
     
+    parser.add_argument(
+        '--replay',
+        action='store_true',
+        help='Rebuild jobs from stored SerpAPI responses without network calls'
+    )
+    
+    parser.add_argument(
+        '--since',
+        type=date.fromisoformat,
+        help='With --replay: first day to replay (YYYY-MM-DD)'
+    )
+    
+    parser.add_argument(
+        '--until',
+        type=date.fromisoformat,
+        help='With --replay: last day to replay (YYYY-MM-DD)'
+    )
+    
+    parser.add_argument(
+        '--drain-spool',
+        action='store_true',
+        help='Write jobs spooled while the database was down (JOB_SPOOL_DIR) and exit'
+    )
+    
+    parser.add_argument(
+        '--build-feeds',
+        action='store_true',
+        help='Rebuild the feed snapshots (and FEED_FILES_DIR files) from stored jobs and exit'
+    )
+    
     parser.add_argument(
         '--list-roles',
         action='store_true',
@@ -117,6 +187,53 @@ def select_roles(args):
         # Interactive mode
         return ScrapingUtils.get_role_selection_menu(all_roles)
 
+def run_replay(args):
+    """Rebuild jobs from the response store instead of calling SerpAPI"""
+    scraper = JobScraper()
+    results = scraper.replay_stored_responses(args.since, args.until)
+    scraper.close()
+    
+    print(f"\nReplayed {results['responses_replayed']} stored responses "
+          f"from {results['days_replayed']} days in {results['duration_seconds']:.1f} seconds")
+    print(f"Jobs found: {results['jobs_found']} | Processed: {results['jobs_processed']} | "
+          f"Saved: {results['jobs_saved']} | Duplicates: {results['duplicates']}")
+    print(f"Direct Links: {results['direct_links']} | Google Links: {results['google_links']} | "
+          f"No Links: {results['no_links']}")
+    
+    if args.save_results:
+        filename = ScrapingUtils.save_results_to_file(results)
+        if filename:
+            print(f"Results saved to: {filename}")
+
+def run_drain_spool():
+    """Replay the job spool into the database"""
+    scraper = JobScraper()
+    results = scraper.drain_spool()
+    scraper.close()
+    
+    print(f"\nDrained {results['segments']} spool segments in {results['duration_seconds']:.1f} seconds")
+    print(f"Jobs: {results['jobs']} | Inserted: {results['inserted']} | "
+          f"Already present: {results['skipped']} | Invalid: {results['invalid']}")
+    if results.get('error'):
+        print(f"Stopped early, database unavailable: {results['error']}")
+    if results['remaining_segments']:
+        print(f"{results['remaining_segments']} segments still waiting")
+        return False
+    return True
+
+def run_build_feeds():
+    """Rebuild the feed snapshots without scraping"""
+    scraper = JobScraper()
+    results = scraper.build_feed_snapshots()
+    scraper.close()
+    
+    if results.get('unchanged'):
+        print("\nFeeds unchanged since the last rebuild, nothing rewritten")
+        return
+    print(f"\nRebuilt {results['feeds']} feeds in {results['duration_seconds']:.1f} seconds")
+    if results['files']:
+        print(f"Static files: {results['files']} in {results['directory']}")
+
 def main():
     """Main function for manual scraper execution"""
     args = parse_arguments()
@@ -141,6 +258,19 @@ def main():
         # Validate configuration
         ScrapingUtils.validate_configuration()
         
+        if args.replay:
+            run_replay(args)
+            return
+        
+        if args.build_feeds:
+            run_build_feeds()
+            return
+        
+        if args.drain_spool:
+            if not run_drain_spool():
+                sys.exit(1)
+            return
+        
         if not args.quiet:
             print(f"Location Mode: {config.LOCATION_MODE}")
             print(f"Search Locations: {config.get_search_locations()}")
@@ -167,14 +297,34 @@ def main():
         
         # Initialize scraper
         scraper = JobScraper()
+        if args.incremental:
+            scraper.incremental = True
         
         # Log scraping start
         if not args.quiet:
             ScrapingUtils.log_scraping_start(selected_roles, config.LOCATION_MODE)
         
+        # Session journal (checkpoints); a resumed session keeps its role list and job limit
+        journal = open_journal(args.resume)
+        if journal and journal.params.get('roles'):
+            selected_roles = journal.params['roles']
+            args.max_jobs = journal.params.get('max_jobs_per_role', args.max_jobs)
+            print(f"Resuming session {journal.session_id} ({len(selected_roles)} roles, "
+                  f"max {args.max_jobs} jobs per role)")
+        
         # Start scraping
         print(f"\nStarting scraping session...")
-        results = scraper.scrape_multiple_roles(selected_roles, args.max_jobs)
+        if args.pipeline or config.PIPELINE_MODE:
+            results = scraper.scrape_multiple_roles_pipeline(selected_roles, args.max_jobs, journal)
+        elif args.async_mode or config.ASYNC_SCRAPING:
+            results = scraper.scrape_multiple_roles_concurrent(
+                selected_roles, args.max_jobs, args.concurrency, journal
+            )
+        else:
+            results = scraper.scrape_multiple_roles(selected_roles, args.max_jobs, journal)
+        if scraper.response_store:
+            scraper.response_store.evict_expired()
+        scraper.close()
         
         # Log scraping end
         if not args.quiet:
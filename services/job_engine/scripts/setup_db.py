@@ -19,6 +19,18 @@ def setup_database():
         print(f"Collection: {config.JOBS_COLLECTION}")
         print(f"Location Mode: {config.LOCATION_MODE}")
         
+        # Also created on connect when missing; this run adds any the check does not cover
+        print(f"\nCreating indexes...")
+        db.setup_indexes()
+        
+        # Jobs stored before the normalized location fields existed
+        updated = db.backfill_location_fields()
+        print(f"Location fields backfilled for {updated} jobs")
+        
+        # Materialized stats, recomputed from scratch
+        stats_doc = db.rebuild_stats()
+        print(f"Job stats rebuilt ({stats_doc['total']} jobs)")
+        
         # Test connection
         stats = db.get_database_stats()
         print(f"\nDatabase Stats:")
@@ -38,7 +50,7 @@ def setup_database():
             print("Test job inserted successfully")
             
             # # Clean up test job
-            db.jobs_collection.delete_one({"job_id": db.generate_job_id(
+            db.delete_jobs({"job_id": db.generate_job_id(
                 test_job["company_name"],
                 test_job["job_title"], 
                 test_job["location"]
@@ -0,0 +1,84 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Settings are read once at import, so they are fixed before anything imports common.config
+_DATA_DIR = tempfile.mkdtemp(prefix="job_engine_tests_")
+os.environ.update({
+    "SERPAPI_API_KEY": "test-key",
+    "STORAGE_BACKEND": "sqlite",
+    "SQLITE_PATH": os.path.join(_DATA_DIR, "jobs.sqlite3"),
+    "CHECKPOINT_BACKEND": "none",
+    "KNOWN_JOBS_FILTER": "false",
+    "RESPONSE_STORE_ENABLED": "false",
+    "JOB_SPOOL": "false",
+    "OUTBOX_ENABLED": "false",
+    "CHANGESETS_ENABLED": "false",
+    "FEED_SNAPSHOTS": "false",
+})
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture
+def sqlite_db(tmp_path):
+    """A fresh SQLite job store"""
+    from common.sqlite_database import SQLiteJobDatabase
+    database = SQLiteJobDatabase(str(tmp_path / "jobs.sqlite3"))
+    yield database
+    database.close_connection()
+
+class _BulkWriteResult:
+    def __init__(self):
+        self.upserted_count = 0
+        self.matched_count = 0
+        self.modified_count = 0
+        self.upserted_ids = {}
+
+def _bulk_write(collection):
+    """bulk_write for mongomock collections, one operation at a time
+
+    mongomock 4.3 predates the sort option current pymongo passes to
+    bulk updates, so its own bulk_write rejects UpdateOne and ReplaceOne.
+    """
+    from pymongo import ReplaceOne
+
+    def bulk_write(operations, ordered=True):
+        result = _BulkWriteResult()
+        for index, operation in enumerate(operations):
+            write = collection.replace_one if isinstance(operation, ReplaceOne) else collection.update_one
+            outcome = write(operation._filter, operation._doc, upsert=operation._upsert)
+            result.matched_count += outcome.matched_count
+            result.modified_count += outcome.modified_count
+            if outcome.upserted_id is not None:
+                result.upserted_count += 1
+                result.upserted_ids[index] = outcome.upserted_id
+        return result
+    return bulk_write
+
+@pytest.fixture
+def mongo_db(monkeypatch):
+    """A MongoDB job store on an in-memory mongomock client"""
+    mongomock = pytest.importorskip("mongomock")
+    import common.database as database_module
+    client = mongomock.MongoClient()
+    monkeypatch.setattr(database_module, "MongoClient", lambda *args, **kwargs: client)
+    database = database_module.JobDatabase()
+    for name in ("jobs_collection", "snapshots_collection"):
+        collection = getattr(database, name)
+        monkeypatch.setattr(collection, "bulk_write", _bulk_write(collection))
+    yield database
+    database.close_connection()
+
+@pytest.fixture
+def raw_job():
+    """Factory of SerpAPI-shaped job results with a direct apply link"""
+    def make(n: int, company: str = "Acme") -> dict:
+        return {
+            "title": f"Engineer {n}",
+            "company_name": company,
+            "location": "Pune, Maharashtra, India",
+            "apply_options": [{"title": "Careers", "link": f"https://careers.example.com/jobs/{n}"}],
+        }
+    return make
@@ -0,0 +1,44 @@
+import asyncio
+
+from common.async_database import AsyncJobDatabase
+from common.config import config
+from job_scraper.job_processor import JobProcessor
+
+class AsyncCollection:
+    """Awaitable front of a mongomock collection, like an AsyncMongoClient collection"""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def __getattr__(self, name):
+        method = getattr(self.collection, name)
+
+        async def call(*args, **kwargs):
+            return method(*args, **kwargs)
+        return call
+
+def snapshot(mongo_db):
+    """Stats and outbox as written, without their timestamps"""
+    stats = mongo_db.stats_collection.find_one({}, {"updated_at": 0})
+    outbox = list(mongo_db.outbox_collection.find({}, {"created_at": 0, "scraped_date": 0}).sort("_id", 1))
+    for collection in ("jobs_collection", "stats_collection", "outbox_collection", "counters_collection"):
+        getattr(mongo_db, collection).delete_many({})
+    return stats, outbox
+
+def test_async_batch_writes_the_same_stats_and_outbox(mongo_db, raw_job, monkeypatch):
+    monkeypatch.setattr(config, "OUTBOX_ENABLED", True)
+    processor = JobProcessor()
+    def jobs():
+        return [processor.process_job(raw_job(n), "Software Engineer") for n in (1, 2, 1, 3)]
+
+    mongo_db.insert_jobs_batch(jobs())
+    expected = snapshot(mongo_db)
+
+    async_db = AsyncJobDatabase()
+    for name in ("jobs_collection", "stats_collection", "outbox_collection", "counters_collection"):
+        setattr(async_db, name, AsyncCollection(getattr(mongo_db, name)))
+    stats = asyncio.run(async_db.insert_jobs_batch(jobs()))
+
+    assert (stats["inserted"], stats["skipped"]) == (3, 1)
+    assert snapshot(mongo_db) == expected
+    assert expected[0]["total"] == 3 and [entry["_id"] for entry in expected[1]] == [1, 2, 3]
@@ -0,0 +1,63 @@
+import threading
+
+from common.bloom_filter import BloomFilter
+from common.database import JobDatabase
+
+class FakeJobs:
+    """jobs collection answering the filter's verification query from a set of stored job_ids"""
+
+    def __init__(self, stored):
+        self.stored = set(stored)
+        self.queries = []
+
+    def find(self, query, projection=None):
+        self.queries.append(query)
+        return [{"job_id": job_id} for job_id in query["job_id"]["$in"] if job_id in self.stored]
+
+def filtered_database(bloom, stored):
+    """JobDatabase with a known-jobs filter and no MongoDB connection"""
+    database = JobDatabase.__new__(JobDatabase)
+    database.jobs_collection = FakeJobs(stored)
+    database.known_jobs = bloom
+    database.known_jobs_stats = {"checked": 0, "definitely_new": 0, "possible_hits": 0, "false_positives": 0}
+    database._known_jobs_lock = threading.Lock()
+    return database
+
+def test_added_items_are_always_found():
+    bloom = BloomFilter.for_capacity(1000, 0.01)
+    items = [f"job-{n}" for n in range(1000)]
+    for item in items:
+        bloom.add(item)
+
+    assert all(item in bloom for item in items)
+    assert bloom.expected_fp_rate() < 0.02
+
+def test_save_and_load_keep_the_bits(tmp_path):
+    bloom = BloomFilter.for_capacity(100, 0.01)
+    bloom.add("job-1")
+    path = str(tmp_path / "known_jobs.bloom")
+
+    bloom.save(path, {"last_id": "abc"})
+    loaded, header = BloomFilter.load(path)
+
+    assert "job-1" in loaded and loaded.count == 1
+    assert header["last_id"] == "abc"
+
+def test_false_positives_are_verified_against_the_database():
+    # Every bit set: each job_id looks known, only stored ones are
+    bloom = BloomFilter(64, 3, bytearray(b"\xff" * 8))
+    database = filtered_database(bloom, stored={"a"})
+
+    existing = database._existing_job_ids(["a", "b", "c"])
+
+    assert existing == {"a"}
+    assert database.jobs_collection.queries == [{"job_id": {"$in": ["a", "b", "c"]}}]
+    assert database.known_jobs_stats == {"checked": 3, "definitely_new": 0, "possible_hits": 3,
+                                         "false_positives": 2}
+
+def test_definitely_new_jobs_skip_the_database():
+    database = filtered_database(BloomFilter.for_capacity(100, 0.01), stored=set())
+
+    assert database._existing_job_ids(["a", "b"]) == set()
+    assert database.jobs_collection.queries == []
+    assert database.known_jobs_stats["definitely_new"] == 2
@@ -0,0 +1,67 @@
+import pytest
+
+from common.config import config
+from job_scraper.checkpoint import SessionJournal, FileSessionJournal, open_journal
+
+def test_file_journal_survives_a_restart(tmp_path):
+    journal = FileSessionJournal("s1", str(tmp_path))
+    journal.start(["Engineer", "Designer"], 15)
+    journal.record_role("Engineer", {"role": "Engineer", "jobs_saved": 4})
+    journal.record_page("Designer", "Pune", 2, "token-3", 8, {"jobs_saved": 8})
+    with open(journal.path, "a") as f:
+        f.write('{"type": "unit", "key"')  # torn by a crash
+
+    reopened = FileSessionJournal("s1", str(tmp_path))
+
+    assert reopened.resumed and not reopened.finished
+    assert reopened.params["max_jobs_per_role"] == 15
+    assert reopened.completed_role("Engineer")["jobs_saved"] == 4
+    assert reopened.page_progress("Designer", "Pune")["next_page_token"] == "token-3"
+    assert FileSessionJournal.latest_unfinished(str(tmp_path)) == "s1"
+
+    reopened.record_unit("Designer", "Pune", {"jobs_saved": 9})
+    reopened.finish({})
+    assert FileSessionJournal("s1", str(tmp_path)).page_progress("Designer", "Pune") is None
+    assert FileSessionJournal.latest_unfinished(str(tmp_path)) is None
+
+def test_journal_needs_a_backend():
+    with pytest.raises(TypeError):
+        SessionJournal()
+
+def test_resume_without_a_backend_is_an_error(monkeypatch):
+    monkeypatch.setattr(config, "CHECKPOINT_BACKEND", "none")
+
+    assert open_journal() is None
+    with pytest.raises(ValueError):
+        open_journal("latest")
+
+def test_resumed_session_skips_finished_work_and_continues_paging(tmp_path, sqlite_db, monkeypatch, raw_job):
+    import job_scraper.scraper as scraper_module
+    monkeypatch.setattr(scraper_module, "db", sqlite_db)
+    scraper = scraper_module.JobScraper()
+    location = config.get_search_locations()[0]
+
+    journal = FileSessionJournal("s1", str(tmp_path))
+    journal.start(["Engineer", "Designer"], 5)
+    engineer = {key: value for key, value in scraper._failed_result("Engineer", "").items() if key != "error"}
+    journal.record_role("Engineer", engineer)
+    stats = dict(scraper.new_unit_stats(), pages=1, jobs_saved=2)
+    journal.record_page("Designer", location, 1, "token-2", 2, stats)
+
+    calls = []
+    def search_jobs_page(query, location, next_page_token=None, page=0):
+        calls.append((next_page_token, page))
+        return [raw_job(n) for n in range(10, 13)], None
+    monkeypatch.setattr(scraper, "search_jobs_page", search_jobs_page)
+    monkeypatch.setattr(scraper, "request_delay", 0)
+
+    resumed = FileSessionJournal("s1", str(tmp_path))
+    summary = scraper.scrape_multiple_roles(resumed.params["roles"], resumed.params["max_jobs_per_role"], resumed)
+
+    # Only the half-done search ran, from its saved token and up to the session's job limit
+    assert calls == [("token-2", 1)]
+    engineer, designer = summary["results"]
+    assert engineer["resumed"] and not designer.get("resumed")
+    assert designer["jobs_saved"] == 5
+    assert summary["resumed_roles"] == 1
+    assert FileSessionJournal("s1", str(tmp_path)).finished
@@ -0,0 +1,70 @@
+import os
+from datetime import datetime, timezone, timedelta
+
+import pytest
+
+from common.job_archive import JobArchive, PARTITION_PREFIX
+from job_scraper.job_processor import JobProcessor
+
+def archived_job(n, day, **fields):
+    return dict({"_id": n, "job_id": f"job-{n}", "job_title": f"Engineer {n}", "role": "Software Engineer",
+                 "scraped_date": datetime(2025, 1, day, 12, tzinfo=timezone.utc)}, **fields)
+
+def test_round_trip_by_day(tmp_path):
+    archive = JobArchive(str(tmp_path))
+
+    written = archive.write([archived_job(1, 1), archived_job(2, 2, role="Designer"), archived_job(3, 2)])
+
+    assert written == {"2025-01-01": 1, "2025-01-02": 2}
+    assert archive.partitions() == ["2025-01-01", "2025-01-02"]
+    job = next(archive.iter_jobs(start="2025-01-01", end="2025-01-01"))
+    assert job == {key: value for key, value in archived_job(1, 1).items() if key != "_id"}
+    assert archive.count_jobs(start=datetime(2025, 1, 2), filters={"role": ["Designer"]}) == 1
+    assert list(archive.iter_jobs(fields=["job_id"])) == [{"job_id": f"job-{n}"} for n in (1, 2, 3)]
+
+def test_a_failed_write_leaves_no_partial_part(tmp_path, monkeypatch):
+    archive = JobArchive(str(tmp_path))
+    archive.write([archived_job(1, 1)])
+    def fail(fd):
+        raise OSError("disk full")
+    monkeypatch.setattr(os, "fsync", fail)
+
+    with pytest.raises(OSError):
+        archive.write([archived_job(2, 1)])
+
+    names = os.listdir(tmp_path / f"{PARTITION_PREFIX}2025-01-01")
+    assert len(names) == 1 and names[0].endswith(".ndjson.gz")
+    assert archive.count_jobs() == 1 and archive.get_report()["files"] == 1
+
+def test_readers_skip_temporary_files(tmp_path):
+    archive = JobArchive(str(tmp_path))
+    archive.write([archived_job(1, 1)])
+    # What a crash between writing and renaming a part leaves behind
+    (tmp_path / f"{PARTITION_PREFIX}2025-01-01" / "abc.tmp").write_bytes(b"\x1f\x8b torn")
+
+    assert archive.count_jobs() == 1
+
+class FailingArchive:
+    def write(self, jobs):
+        raise OSError("archive unavailable")
+
+@pytest.mark.parametrize("store", ["sqlite_db", "mongo_db"])
+def test_jobs_are_archived_before_they_are_deleted(store, request, raw_job, tmp_path):
+    database = request.getfixturevalue(store)
+    processor = JobProcessor()
+    jobs = [processor.process_job(raw_job(n), "Software Engineer") for n in range(5)]
+    for job in jobs:
+        job["scraped_date"] = datetime.now(timezone.utc) - timedelta(days=90)
+    database.insert_jobs_batch(jobs)
+    old = {"scraped_date": {"$lt": datetime.now(timezone.utc) - timedelta(days=60)}}
+
+    # Nothing is deleted unless its chunk reached the archive
+    with pytest.raises(OSError):
+        database.delete_jobs(old, batch_size=2, archive=FailingArchive())
+    assert database.count_jobs(old) == 5
+
+    archive = JobArchive(str(tmp_path / "archive"))
+    assert database.delete_jobs(old, batch_size=2, archive=archive) == 5
+    assert database.count_jobs(old) == 0
+    assert sorted(job["job_id"] for job in archive.iter_jobs()) == sorted(job["job_id"] for job in jobs)
+    assert archive.get_report()["files"] == 3
@@ -0,0 +1,57 @@
+from datetime import datetime, timezone, timedelta
+
+from common import job_changesets
+from job_scraper.job_processor import JobProcessor
+
+def added(count):
+    return [{"job_id": f"job-{n}", "job_title": f"Engineer {n}"} for n in range(count)]
+
+def test_parts_split_added_then_removed():
+    parts = job_changesets.changeset_parts("cs", "scrape", added(3), ["old-1", "old-2"], part_size=2)
+
+    assert [part["_id"] for part in parts] == ["cs:0000", "cs:0001", "cs:0002"]
+    assert [(len(part["added"]), len(part["removed"])) for part in parts] == [(2, 0), (1, 1), (0, 1)]
+    assert all(part["parts"] == 3 and part["added_count"] == 3 and part["removed_count"] == 2 for part in parts)
+
+def test_empty_changeset_is_one_part():
+    parts = job_changesets.changeset_parts("cs", "purge", [], [])
+
+    assert len(parts) == 1 and parts[0]["added"] == [] and parts[0]["removed"] == []
+
+def test_merge_marks_changesets_missing_parts():
+    parts = job_changesets.changeset_parts("cs", "scrape", added(3), ["old-1"], part_size=2)
+
+    complete, = job_changesets.merge_parts(parts)
+    partial, = job_changesets.merge_parts(parts[:1])
+
+    assert complete["complete"] and [entry["job_id"] for entry in complete["added"]] == ["job-0", "job-1", "job-2"]
+    assert complete["removed"] == ["old-1"] and "part" not in complete and "_id" not in complete
+    assert not partial["complete"] and len(partial["added"]) == 2
+
+def test_recorded_changeset_reads_back(sqlite_db):
+    since = datetime.now(timezone.utc) - timedelta(minutes=1)
+
+    summary = job_changesets.record_changeset(sqlite_db, "scrape", added(2), ["old-1"], session_id="session-1")
+
+    changeset, = sqlite_db.get_changesets(since)
+    assert summary == {"changeset_id": changeset["changeset_id"], "added": 2, "removed": 1, "stored": True}
+    assert changeset["session_id"] == "session-1" and changeset["complete"]
+    assert changeset["removed"] == ["old-1"]
+
+def test_unreachable_database_is_reported_not_raised():
+    class DownDatabase:
+        def save_changeset(self, parts):
+            raise ConnectionError("database down")
+
+    summary = job_changesets.record_changeset(DownDatabase(), "purge", [], ["old-1"])
+
+    assert summary["stored"] is False and summary["removed"] == 1
+
+def test_purge_records_the_jobs_it_deleted(sqlite_db, raw_job):
+    processor = JobProcessor()
+    jobs = [processor.process_job(raw_job(n), "Software Engineer") for n in range(3)]
+    sqlite_db.insert_jobs_batch(jobs)
+    removed = []
+
+    assert sqlite_db.delete_jobs({}, batch_size=2, removed=removed) == 3
+    assert sorted(removed) == sorted(job["job_id"] for job in jobs)
@@ -0,0 +1,69 @@
+import gzip
+import json
+
+import pytest
+
+from common import job_feeds
+from common.config import config
+from job_scraper.job_processor import JobProcessor
+
+@pytest.fixture
+def feed_scraper(monkeypatch, tmp_path):
+    """JobScraper whose feeds cover Pune and two roles, with static files in tmp_path"""
+    import job_scraper.scraper as scraper_module
+    monkeypatch.setattr(config, "get_search_locations", lambda: ["Pune"])
+    monkeypatch.setattr(config, "get_job_roles", lambda: ["Software Engineer", "Designer"])
+    monkeypatch.setattr(config, "FEED_SIZE", 2)
+    monkeypatch.setattr(config, "FEED_FILES_DIR", str(tmp_path / "feeds"))
+
+    def use(database):
+        monkeypatch.setattr(scraper_module, "db", database)
+        return scraper_module.JobScraper()
+    return use
+
+def store_jobs(database, raw_job, numbers, role="Software Engineer"):
+    processor = JobProcessor()
+    database.insert_jobs_batch([processor.process_job(raw_job(n), role) for n in numbers])
+
+def test_snapshots_and_files_are_built(feed_scraper, sqlite_db, raw_job):
+    store_jobs(sqlite_db, raw_job, range(3))
+    store_jobs(sqlite_db, raw_job, [10], role="Designer")
+
+    summary = feed_scraper(sqlite_db).build_feed_snapshots()
+
+    assert summary["feeds"] == 4 and summary["files"] == 5
+    assert sqlite_db.get_feed_snapshot("overall")["count"] == 2
+    assert sqlite_db.get_feed_snapshot("location:pune")["count"] == 2
+    assert [job["job_title"] for job in sqlite_db.get_feed_snapshot("role:designer")["jobs"]] == ["Engineer 10"]
+    with gzip.open(job_feeds.index_path(config.FEED_FILES_DIR), "rt") as f:
+        assert {feed["key"] for feed in json.load(f)["feeds"]} == {
+            "overall", "location:pune", "role:software-engineer", "role:designer"}
+
+@pytest.mark.parametrize("store", ["sqlite_db", "mongo_db"])
+def test_dropped_roles_lose_their_feed(store, request, feed_scraper, raw_job, monkeypatch):
+    database = request.getfixturevalue(store)
+    store_jobs(database, raw_job, range(2))
+    scraper = feed_scraper(database)
+    scraper.build_feed_snapshots()
+
+    monkeypatch.setattr(config, "get_job_roles", lambda: ["Software Engineer"])
+    scraper.build_feed_snapshots()
+
+    assert database.get_feed_snapshot("role:designer") is None
+    assert database.get_feed_snapshot("role:software-engineer")["count"] == 2
+
+def test_rebuild_without_changes_writes_nothing(feed_scraper, sqlite_db, raw_job, monkeypatch):
+    store_jobs(sqlite_db, raw_job, range(2))
+    scraper = feed_scraper(sqlite_db)
+    scraper.build_feed_snapshots()
+    saves = []
+    save_feed_snapshots = sqlite_db.save_feed_snapshots
+    monkeypatch.setattr(sqlite_db, "save_feed_snapshots", lambda feeds: saves.append(feeds) or save_feed_snapshots(feeds))
+
+    assert scraper.build_feed_snapshots()["unchanged"]
+    assert saves == []
+
+    # A newer job changes the feeds
+    store_jobs(sqlite_db, raw_job, [5])
+    assert scraper.build_feed_snapshots()["feeds"] == 4
+    assert len(saves) == 1
@@ -0,0 +1,68 @@
+from datetime import datetime, timezone, timedelta
+
+from common import job_outbox
+from common.config import config
+
+def entry(seq, age_seconds=0):
+    return {"seq": seq, "created_at": datetime.now(timezone.utc) - timedelta(seconds=age_seconds)}
+
+def test_entries_are_numbered_from_first_seq():
+    jobs = [{"job_id": "a"}, {"job_id": "b"}, {"job_id": "c"}]
+
+    entries = job_outbox.outbox_entries(jobs, 41)
+
+    assert [(item["_id"], item["job_id"]) for item in entries] == [(41, "a"), (42, "b"), (43, "c")]
+
+def test_reading_stops_at_a_fresh_gap():
+    entries = [entry(1), entry(2), entry(4), entry(5)]
+
+    readable = job_outbox.contiguous(entries, 0, gap_seconds=60)
+
+    assert [item["seq"] for item in readable] == [1, 2]
+    assert job_outbox.read_result(readable, 0)["next_seq"] == 2
+
+def test_settled_gap_is_stepped_over():
+    entries = [entry(3, age_seconds=120), entry(5, age_seconds=120), entry(6)]
+
+    readable = job_outbox.contiguous(entries, 1, gap_seconds=60)
+
+    assert [item["seq"] for item in readable] == [3, 5, 6]
+
+def test_empty_read_keeps_the_offset():
+    assert job_outbox.read_result([], 17) == {"entries": [], "next_seq": 17}
+
+def test_sqlite_outbox_sequence_is_contiguous(sqlite_db, raw_job, monkeypatch):
+    from job_scraper.job_processor import JobProcessor
+    monkeypatch.setattr(config, "OUTBOX_ENABLED", True)
+    processor = JobProcessor()
+    jobs = [processor.process_job(raw_job(n), "Software Engineer") for n in range(5)]
+
+    sqlite_db.insert_jobs_batch(jobs[:3])
+    sqlite_db.insert_jobs_batch(jobs)
+
+    first = sqlite_db.read_outbox(0, limit=2)
+    rest = sqlite_db.read_outbox(first["next_seq"], limit=10)
+    assert [item["seq"] for item in first["entries"] + rest["entries"]] == [1, 2, 3, 4, 5]
+    assert [item["job_id"] for item in first["entries"] + rest["entries"]] == [job["job_id"] for job in jobs]
+    assert sqlite_db.get_outbox_seq() == 5
+
+def test_mongo_outbox_write_failure_loses_only_the_entries(mongo_db, raw_job, monkeypatch):
+    from job_scraper.job_processor import JobProcessor
+    monkeypatch.setattr(config, "OUTBOX_ENABLED", True)
+    monkeypatch.setattr(config, "OUTBOX_GAP_SECONDS", 0)
+    processor = JobProcessor()
+    jobs = [processor.process_job(raw_job(n), "Software Engineer") for n in range(3)]
+    insert_many = mongo_db.outbox_collection.insert_many
+    def fail(*args, **kwargs):
+        raise ConnectionError("outbox write lost")
+    monkeypatch.setattr(mongo_db.outbox_collection, "insert_many", fail)
+
+    # At most once: the job is stored and a retry does not record it again
+    assert mongo_db.insert_jobs_batch(jobs[:1])["inserted"] == 1
+    monkeypatch.setattr(mongo_db.outbox_collection, "insert_many", insert_many)
+    assert mongo_db.insert_jobs_batch(jobs)["inserted"] == 2
+
+    # The number taken by the failed write is a settled gap, stepped over
+    result = mongo_db.read_outbox(0)
+    assert [item["seq"] for item in result["entries"]] == [2, 3]
+    assert [item["job_id"] for item in result["entries"]] == [job["job_id"] for job in jobs[1:]]
@@ -0,0 +1,13 @@
+from job_scraper.job_processor import JobProcessor
+
+def test_job_type_comes_from_schedule_type(raw_job):
+    job = dict(raw_job(1), detected_extensions={"schedule_type": "Full-time", "posted_at": "2 days ago"})
+
+    processed = JobProcessor().process_job(job, "Software Engineer")
+
+    assert processed["job_type"] == "Full-time"
+
+def test_job_type_missing_is_left_out(raw_job):
+    processed = JobProcessor().process_job(raw_job(1), "Software Engineer")
+
+    assert "job_type" not in processed
@@ -0,0 +1,29 @@
+from job_scraper.job_processor import JobProcessor
+
+def processed_jobs(raw_job, count, **fields):
+    processor = JobProcessor()
+    jobs = [processor.process_job(raw_job(n), "Software Engineer") for n in range(count)]
+    for job in jobs:
+        job.update(fields)
+    return jobs
+
+def test_search_jobs_ranks_title_matches_and_counts_facets(sqlite_db, raw_job):
+    jobs = processed_jobs(raw_job, 3, job_type="Full-time")
+    jobs[0]["job_title"] = "Python Developer"
+    jobs[1]["description"] = "Python scripting now and then"
+    sqlite_db.insert_jobs_batch(jobs)
+
+    result = sqlite_db.search_jobs("python")
+
+    assert result["total"] == 2
+    assert [job["job_title"] for job in result["jobs"]][0] == "Python Developer"
+    assert result["facets"]["job_type"] == [{"value": "Full-time", "count": 2}]
+
+def test_search_jobs_filters(sqlite_db, raw_job):
+    jobs = processed_jobs(raw_job, 4)
+    for job in jobs[:1]:
+        job["job_type"] = "Contractor"
+    sqlite_db.insert_jobs_batch(jobs)
+
+    assert sqlite_db.search_jobs(job_type="Contractor")["total"] == 1
+    assert sqlite_db.search_jobs(location="Pune", page_size=2)["pages"] == 2
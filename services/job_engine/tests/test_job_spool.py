@@ -0,0 +1,117 @@
+import os
+from datetime import datetime, timezone
+
+import pytest
+
+from common.config import config
+from job_scraper.job_processor import JobProcessor
+from job_scraper.job_spool import JobSpool, OPEN_SUFFIX, SEALED_SUFFIX
+
+class _DownDatabase:
+    """Stand-in for the lazy db proxy when the first connection fails"""
+
+    def __getattr__(self, name):
+        raise ConnectionError("database down")
+
+@pytest.fixture
+def down_scraper(tmp_path, monkeypatch):
+    """JobScraper with the spool on and a database that was down from the start"""
+    import job_scraper.scraper as scraper_module
+    monkeypatch.setattr(config, "JOB_SPOOL", True)
+    monkeypatch.setattr(config, "JOB_SPOOL_DIR", str(tmp_path / "spool"))
+    monkeypatch.setattr(config, "KNOWN_JOBS_FILTER", True)
+    monkeypatch.setattr(scraper_module, "db", _DownDatabase())
+    monkeypatch.setattr(scraper_module, "database_available", lambda: False)
+    monkeypatch.setattr(scraper_module, "connected_db", lambda: None)
+    scraper = scraper_module.JobScraper()
+    scraper.incremental = True
+    yield scraper
+    scraper.close()
+
+def test_database_down_at_startup_spools_jobs(down_scraper, sqlite_db, monkeypatch, raw_job):
+    monkeypatch.setattr(down_scraper, "search_jobs_page",
+                        lambda query, location, next_page_token=None, page=0: ([raw_job(n) for n in range(3)], None))
+
+    stats = down_scraper._scrape_search_unit("Software Engineer", "India", "query", "India", 10,
+                                             JobProcessor(), set(), polite=False)
+    down_scraper.close()
+
+    assert stats["jobs_saved"] == 3
+    assert down_scraper.spool.db_down()
+    assert down_scraper.spool.pending_jobs() == 3
+
+    # The database is back
+    import job_scraper.scraper as scraper_module
+    monkeypatch.setattr(scraper_module, "db", sqlite_db)
+    replayed = down_scraper.drain_spool()
+    assert replayed["inserted"] == 3 and replayed["remaining_segments"] == 0
+    assert sqlite_db.get_database_stats()["total_jobs"] == 3
+
+class FlakyDatabase:
+    """insert_jobs_batch that reports the database down after `fail_after` batches"""
+
+    def __init__(self, fail_after=None):
+        self.fail_after = fail_after
+        self.batches = []
+
+    def insert_jobs_batch(self, jobs):
+        if self.fail_after is not None and len(self.batches) >= self.fail_after:
+            return {"db_error": "down"}
+        self.batches.append([job["job_id"] for job in jobs])
+        return {"inserted": len(jobs), "skipped": 0, "failed": 0}
+
+def spooled_jobs(count):
+    return [{"job_id": f"job-{n}", "scraped_date": datetime(2025, 1, 1, tzinfo=timezone.utc)} for n in range(count)]
+
+def test_full_segments_are_sealed(tmp_path):
+    spool = JobSpool(str(tmp_path), segment_max_bytes=200, fsync_every=1000)
+
+    for job in spooled_jobs(10):
+        spool.append([job])
+    spool.close()
+
+    # A segment is sealed by the append that fills it, so a batch never spans two
+    segments = spool.segments()
+    assert 1 < len(segments) < 10
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(OPEN_SUFFIX)]
+    replayed = [job for path in segments for job in JobSpool.read_segment(path)]
+    assert replayed == spooled_jobs(10)
+
+def test_torn_last_line_is_skipped(tmp_path):
+    spool = JobSpool(str(tmp_path))
+    spool.append(spooled_jobs(2))
+    spool.close()
+    with open(spool.segments()[0], 'ab') as f:
+        f.write(b'{"job_id": "half')
+
+    assert [job["job_id"] for job in JobSpool.read_segment(spool.segments()[0])] == ["job-0", "job-1"]
+
+def test_replay_removes_segments_it_drained(tmp_path):
+    spool = JobSpool(str(tmp_path), segment_max_bytes=1)
+    for job in spooled_jobs(3):
+        spool.append([job])
+    database = FlakyDatabase()
+
+    summary = spool.replay(database, batch_size=10)
+
+    assert database.batches == [["job-0"], ["job-1"], ["job-2"]]
+    assert summary["segments"] == 3 and summary["inserted"] == 3
+    assert summary["remaining_segments"] == 0
+
+def test_replay_stops_at_a_failed_batch(tmp_path):
+    spool = JobSpool(str(tmp_path), segment_max_bytes=1)
+    for job in spooled_jobs(3):
+        spool.append([job])
+
+    summary = spool.replay(FlakyDatabase(fail_after=1), batch_size=10)
+
+    assert summary["segments"] == 1 and summary["error"] == "down"
+    assert summary["remaining_segments"] == 2
+
+def test_orphaned_open_segment_is_sealed(tmp_path):
+    orphan = tmp_path / f"segment-{0:020d}-999999999{OPEN_SUFFIX}"
+    orphan.write_bytes(b'{"job_id": "job-0"}\n')
+
+    spool = JobSpool(str(tmp_path))
+
+    assert [os.path.basename(path) for path in spool.segments()] == [orphan.name[:-len(OPEN_SUFFIX)] + SEALED_SUFFIX]
@@ -0,0 +1,46 @@
+from datetime import datetime, timezone, timedelta
+
+import pytest
+
+from common.storage import JobStorage
+from job_scraper.job_processor import JobProcessor
+
+def processed_jobs(raw_job, count, **fields):
+    processor = JobProcessor()
+    jobs = [processor.process_job(raw_job(n), "Software Engineer") for n in range(count)]
+    for job in jobs:
+        job.update(fields)
+    return jobs
+
+def all_pages(get_page):
+    seen = []
+    cursor = None
+    while True:
+        page = get_page(cursor)
+        seen.extend(job["job_id"] for job in page["jobs"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            return seen
+
+def test_cursor_round_trip():
+    job = {"scraped_date": datetime(2025, 3, 1, 12, 30), "job_id": "abc"}
+
+    position = JobStorage.decode_cursor(JobStorage.encode_cursor(job))
+
+    assert position == {"scraped_date": datetime(2025, 3, 1, 12, 30, tzinfo=timezone.utc), "job_id": "abc"}
+
+def test_invalid_cursor_is_rejected():
+    with pytest.raises(ValueError):
+        JobStorage.decode_cursor("not-a-cursor")
+
+@pytest.mark.parametrize("store", ["sqlite_db", "mongo_db"])
+def test_pages_cover_every_job_once(store, request, raw_job):
+    database = request.getfixturevalue(store)
+    # One shared scraped_date, so the order rests on the job_id tie-break
+    database.insert_jobs_batch(processed_jobs(raw_job, 7, scraped_date=datetime.now(timezone.utc) - timedelta(hours=1)))
+
+    seen = all_pages(lambda cursor: database.get_recent_jobs_page(days=1, page_size=3, cursor=cursor))
+
+    assert len(seen) == 7 and len(set(seen)) == 7
+    assert seen == sorted(seen, reverse=True)
+    assert all_pages(lambda cursor: database.get_jobs_by_location_page("pune", page_size=2, cursor=cursor)) == seen
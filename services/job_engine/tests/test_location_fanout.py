@@ -0,0 +1,58 @@
+import pytest
+
+@pytest.fixture
+def scraper():
+    from job_scraper.scraper import JobScraper
+    scraper = JobScraper()
+    scraper.location_fanout = True
+    return scraper
+
+def unit_stats(scraper, **values):
+    stats = scraper.new_unit_stats()
+    stats.update(values)
+    return stats
+
+def test_merge_adds_up_locations(scraper):
+    results = [
+        ("Pune", unit_stats(scraper, jobs_found=10, jobs_processed=8, jobs_saved=6, direct_links=5,
+                            google_links=1, no_links=2, api_calls=2, known=1)),
+        ("Remote", unit_stats(scraper, jobs_found=4, jobs_processed=4, jobs_saved=4, direct_links=4,
+                              duplicates=3, api_calls=1)),
+    ]
+
+    result = scraper._merge_unit_results("Software Engineer", 2, iter(results))
+
+    assert (result['jobs_found'], result['jobs_processed'], result['jobs_saved']) == (14, 12, 10)
+    assert (result['direct_links'], result['google_links'], result['no_links']) == (9, 1, 2)
+    assert result['api_calls'] == 3 and result['jobs_known'] == 1
+    assert set(result['locations']) == {"Pune", "Remote"}
+    assert 'error' not in result
+
+def test_failed_location_keeps_the_others(scraper):
+    results = [
+        ("Pune", {'error': 'API_FAILURE', 'api_calls': 3}),
+        ("Remote", unit_stats(scraper, jobs_found=2, jobs_processed=2, jobs_saved=2, api_calls=1)),
+    ]
+
+    result = scraper._merge_unit_results("Software Engineer", 2, iter(results))
+
+    assert result['jobs_saved'] == 2 and result['api_calls'] == 4
+    assert result['locations']["Pune"] == {'error': 'API_FAILURE'}
+    assert 'error' not in result
+
+def test_role_fails_only_when_every_location_fails(scraper):
+    results = [("Pune", {'error': 'API_FAILURE', 'api_calls': 3}),
+               ("Remote", {'error': 'timeout', 'api_calls': 0})]
+
+    assert scraper._merge_unit_results("Software Engineer", 2, iter(results))['error'] == 'API_FAILURE'
+
+def test_duplicates_across_locations_are_dropped(scraper, raw_job):
+    from job_scraper.job_processor import JobProcessor
+    processor = JobProcessor()
+    seen = set()
+
+    first, duplicates_first = scraper._claim_new_jobs([raw_job(1), raw_job(2)], processor, seen)
+    second, duplicates_second = scraper._claim_new_jobs([raw_job(2), raw_job(3)], processor, seen)
+
+    assert len(first) == 2 and duplicates_first == 0
+    assert second == [raw_job(3)] and duplicates_second == 1
@@ -0,0 +1,183 @@
+from datetime import datetime, timezone, timedelta
+
+from pymongo.errors import BulkWriteError
+
+from common import job_stats
+from common.config import config
+from common.database import JobDatabase
+from job_scraper.job_processor import JobProcessor
+
+def processed(raw_job, *numbers):
+    processor = JobProcessor()
+    return [processor.process_job(raw_job(n), "Software Engineer") for n in numbers]
+
+def test_batch_counts_inserted_and_already_present_jobs(mongo_db, raw_job):
+    first = mongo_db.insert_jobs_batch(processed(raw_job, 1, 2))
+    original = mongo_db.jobs_collection.find_one({"job_id": first["inserted_job_ids"][0]})
+
+    second = mongo_db.insert_jobs_batch(processed(raw_job, 1, 2, 3))
+
+    assert (first["inserted"], first["skipped"]) == (2, 0)
+    assert (second["inserted"], second["skipped"], second["failed"]) == (1, 2, 0)
+    assert len(second["inserted_job_ids"]) == 1
+    # $setOnInsert leaves stored jobs alone
+    assert mongo_db.jobs_collection.find_one({"job_id": original["job_id"]})["scraped_date"] == original["scraped_date"]
+    assert mongo_db.get_database_stats()["total_jobs"] == 3
+
+def test_partial_bulk_error_keeps_the_jobs_that_were_written(mongo_db, raw_job, monkeypatch):
+    jobs = processed(raw_job, 1, 2, 3, 4)
+    job_ids = [job["job_id"] for job in jobs]
+    error = BulkWriteError({
+        "nUpserted": 1, "nMatched": 1,
+        "upserted": [{"index": 0, "_id": "x"}],
+        "writeErrors": [
+            {"index": 2, "code": 11000, "errmsg": "duplicate key"},
+            {"index": 3, "code": 121, "errmsg": "document failed validation"},
+        ],
+    })
+    def bulk_write(operations, ordered=True):
+        raise error
+    monkeypatch.setattr(mongo_db.jobs_collection, "bulk_write", bulk_write)
+
+    stats = mongo_db.insert_jobs_batch(jobs)
+
+    # A concurrent insert of the same job counts as already present, not as a failure
+    assert (stats["inserted"], stats["skipped"], stats["failed"]) == (1, 2, 1)
+    assert stats["inserted_job_ids"] == [job_ids[0]]
+    assert stats["failed_job_ids"] == [job_ids[3]]
+    assert "db_error" not in stats
+    assert mongo_db.get_database_stats()["total_jobs"] == 1
+
+def test_unreachable_database_fails_the_whole_batch(mongo_db, raw_job, monkeypatch):
+    def bulk_write(operations, ordered=True):
+        raise ConnectionError("no primary")
+    monkeypatch.setattr(mongo_db.jobs_collection, "bulk_write", bulk_write)
+
+    stats = mongo_db.insert_jobs_batch(processed(raw_job, 1, 2))
+
+    assert stats["failed"] == 2 and stats["inserted_job_ids"] == []
+    assert stats["db_error"] == "no primary"
+
+def test_bulk_result_counts_upserts_and_matches():
+    class Result:
+        upserted_count = 1
+        matched_count = 2
+        upserted_ids = {1: "x"}
+    stats = {"inserted": 0, "skipped": 0, "failed": 0, "failed_job_ids": []}
+
+    inserted = JobDatabase._count_bulk_result(stats, ["a", "b", "c"], result=Result())
+
+    assert inserted == ["b"] and (stats["inserted"], stats["skipped"]) == (1, 2)
+
+def located(raw_job, n, location):
+    return JobProcessor().process_job(dict(raw_job(n), location=location), "Software Engineer")
+
+def test_location_search_matches_tokens_prefixes_and_full_locations(mongo_db, raw_job):
+    mongo_db.insert_jobs_batch([
+        located(raw_job, 1, "Pune, Maharashtra, India"),
+        located(raw_job, 2, "New Delhi, Delhi, India"),
+        located(raw_job, 3, "Punalur, Kerala, India"),
+    ])
+
+    def titles(location, prefix=False):
+        return sorted(job["job_title"] for job in mongo_db.get_jobs_by_location(location, prefix=prefix))
+
+    assert titles("pune") == ["Engineer 1"]
+    assert titles("Pun", prefix=True) == ["Engineer 1", "Engineer 3"]
+    assert titles("delhi") == titles("New Delhi") == ["Engineer 2"]
+    assert titles("Pune,  maharashtra") == ["Engineer 1"]
+    assert titles("India") == ["Engineer 1", "Engineer 2", "Engineer 3"]
+    assert titles("Pune (.*)") == []
+
+def test_backfill_makes_old_jobs_searchable(mongo_db, raw_job):
+    job = located(raw_job, 1, "Pune, Maharashtra, India")
+    mongo_db.jobs_collection.insert_one({key: value for key, value in job.items()
+                                         if key not in ("location_norm", "location_tokens")})
+    assert mongo_db.get_jobs_by_location("pune") == []
+
+    assert mongo_db.backfill_location_fields(batch_size=1) == 1
+    assert [found["job_id"] for found in mongo_db.get_jobs_by_location("pune")] == [job["job_id"]]
+
+def test_stats_follow_inserts_and_deletes(mongo_db, raw_job):
+    mongo_db.insert_jobs_batch(processed(raw_job, 1, 2, 3))
+    mongo_db.delete_jobs({"job_title": "Engineer 2"})
+
+    stats = mongo_db.get_database_stats()
+    rebuilt = job_stats.stats_report(mongo_db.rebuild_stats())
+
+    assert stats["total_jobs"] == 2
+    assert stats.pop("last_updated") and rebuilt.pop("last_updated")
+    assert stats == rebuilt
+
+def test_ttl_stats_are_rebuilt_only_once_stale(mongo_db, raw_job, monkeypatch):
+    mongo_db.insert_jobs_batch(processed(raw_job, 1, 2))
+    mongo_db.ensure_ttl_index(30)
+    mongo_db.rebuild_stats()
+    calls = {"rebuild": 0, "list_indexes": 0}
+    rebuild_stats, list_indexes = mongo_db.rebuild_stats, mongo_db.jobs_collection.list_indexes
+    def counting(name, method):
+        def call(*args, **kwargs):
+            calls[name] += 1
+            return method(*args, **kwargs)
+        return call
+    monkeypatch.setattr(mongo_db, "rebuild_stats", counting("rebuild", rebuild_stats))
+    monkeypatch.setattr(mongo_db.jobs_collection, "list_indexes", counting("list_indexes", list_indexes))
+
+    mongo_db.get_database_stats()
+    assert calls == {"rebuild": 0, "list_indexes": 0}
+
+    # Jobs the TTL monitor removed are only noticed by a rebuild
+    mongo_db.jobs_collection.delete_many({"job_title": "Engineer 1"})
+    monkeypatch.setattr(config, "STATS_MAX_AGE_SECONDS", 0)
+    assert mongo_db.get_database_stats()["total_jobs"] == 1
+    assert calls == {"rebuild": 1, "list_indexes": 0}
+
+def test_ttl_state_is_cached_from_the_index_list(mongo_db):
+    assert mongo_db.ttl_days is None
+    mongo_db.ensure_ttl_index(30)
+    assert mongo_db.ttl_days == 30
+
+    mongo_db.ttl_days = None
+    mongo_db.ensure_indexes()
+    assert mongo_db.ttl_days == 30
+
+    mongo_db.drop_ttl_index()
+    assert mongo_db.ttl_days is None and mongo_db.get_ttl_days() is None
+
+def test_purge_deletes_in_chunks_and_reports_progress(mongo_db, raw_job):
+    jobs = processed(raw_job, 1, 2, 3, 4, 5)
+    for job in jobs[:4]:
+        job["scraped_date"] = datetime.now(timezone.utc) - timedelta(days=90)
+    mongo_db.insert_jobs_batch(jobs)
+    chunks = []
+
+    deleted = mongo_db.delete_jobs({"scraped_date": {"$lt": datetime.now(timezone.utc) - timedelta(days=60)}},
+                                   batch_size=3, progress=lambda *chunk: chunks.append(chunk))
+
+    assert deleted == 4
+    assert chunks == [(1, 3, 3), (2, 1, 4)]
+    assert mongo_db.get_database_stats()["total_jobs"] == 1
+
+def test_ttl_index_is_created_once(mongo_db):
+    assert mongo_db.ensure_ttl_index(30)
+    assert not mongo_db.ensure_ttl_index(30)
+    assert mongo_db.jobs_collection.index_information()["scraped_date_ttl"]["expireAfterSeconds"] == 30 * 86400
+    assert mongo_db.drop_ttl_index() and not mongo_db.drop_ttl_index()
+
+def test_purge_leaves_out_jobs_deleted_elsewhere(mongo_db, raw_job, monkeypatch):
+    mongo_db.insert_jobs_batch(processed(raw_job, 1, 2, 3, 4))
+    delete_many = mongo_db.jobs_collection.delete_many
+    def racing_delete_many(query):
+        # Another purge gets to one job of the first chunk between the read and the delete
+        if mongo_db.jobs_collection.find_one({"job_title": "Engineer 1"}):
+            delete_many({"job_title": "Engineer 1"})
+        return delete_many(query)
+    monkeypatch.setattr(mongo_db.jobs_collection, "delete_many", racing_delete_many)
+    removed = []
+
+    deleted = mongo_db.delete_jobs({}, batch_size=2, removed=removed)
+
+    assert deleted == 3
+    # Only the second chunk is known to be this call's work
+    assert sorted(removed) == sorted(job["job_id"] for job in processed(raw_job, 3, 4))
+    assert mongo_db.get_database_stats()["total_jobs"] == 0
@@ -0,0 +1,63 @@
+import threading
+import time
+
+from common.config import config
+from job_scraper.checkpoint import SessionJournal
+from job_scraper.pipeline import ScrapePipeline
+
+class RecordingJournal(SessionJournal):
+    def __init__(self, persisted):
+        super().__init__("s")
+        self.persisted = persisted
+        self.units_at_record = {}
+
+    def record_unit(self, role, location, stats):
+        # What had reached the database when the search was checkpointed
+        self.units_at_record[role] = set(self.persisted)
+        super().record_unit(role, location, stats)
+
+    def _write(self, entry):
+        pass
+
+def test_pipeline_counts_jobs_and_checkpoints_after_they_are_stored(sqlite_db, monkeypatch, raw_job):
+    import job_scraper.scraper as scraper_module
+    monkeypatch.setattr(scraper_module, "db", sqlite_db)
+    scraper = scraper_module.JobScraper()
+
+    pages = {
+        None: ([raw_job(1), raw_job(2), raw_job(3, company="")], "token-2"),
+        "token-2": ([raw_job(3), raw_job(4), raw_job(1)], None),
+    }
+    monkeypatch.setattr(scraper, "search_jobs_page",
+                        lambda query, location, next_page_token=None, page=0: pages[next_page_token])
+
+    persisted = set()
+    save_jobs = scraper.save_jobs
+    lock = threading.Lock()
+    def slow_save_jobs(jobs):
+        time.sleep(0.05)
+        saved = save_jobs(jobs)
+        with lock:
+            persisted.update(job['job_id'] for job, stored in zip(jobs, saved) if stored)
+        return saved
+    monkeypatch.setattr(scraper, "save_jobs", slow_save_jobs)
+
+    journal = RecordingJournal(persisted)
+    scraper._start_session(["Software Engineer"], 10, journal)
+    pipeline = ScrapePipeline(scraper, fetch_workers=1, process_workers=2, persist_workers=2,
+                              queue_size=2, batch_size=2)
+    pipeline.flush_interval = 0.05
+
+    results, stage_stats = pipeline.run(["Software Engineer"], 10)
+
+    result, = results
+    # Job 1 shows up on both pages and job 3 has no company on the first one
+    assert result['jobs_found'] == 6 and result['jobs_processed'] == 4
+    assert result['jobs_saved'] == 4 and result['no_links'] == 1
+    assert stage_stats['persist']['items'] == 4
+    assert sqlite_db.get_database_stats()['total_jobs'] == 4
+
+    # The search was checkpointed only once every one of its jobs was stored
+    assert len(journal.units_at_record["Software Engineer"]) == 4
+    assert journal.completed_unit("Software Engineer", config.get_search_locations()[0])['jobs_saved'] == 4
+    assert journal.completed_role("Software Engineer")['jobs_saved'] == 4
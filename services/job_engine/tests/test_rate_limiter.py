@@ -0,0 +1,93 @@
+from datetime import datetime, timezone, timedelta
+from email.utils import format_datetime
+
+import pytest
+
+from job_scraper import rate_limiter
+from job_scraper.rate_limiter import RateLimiter
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Seconds the limiter asked to sleep, without sleeping"""
+    waits = []
+    monkeypatch.setattr(rate_limiter.time, "sleep", waits.append)
+    return waits
+
+def test_rate_grows_additively_up_to_max():
+    limiter = RateLimiter(1.0, max_rate=1.25, increase_step=0.1, jitter=0)
+
+    limiter.record_success(latency=0.5)
+    assert limiter.rate == pytest.approx(1.1)
+
+    for _ in range(5):
+        limiter.record_success(latency=0.5)
+    assert limiter.rate == 1.25
+
+def test_slow_response_and_429_cut_rate_multiplicatively():
+    limiter = RateLimiter(2.0, min_rate=0.3, decrease_factor=0.5, latency_target=5.0, jitter=0)
+
+    limiter.record_success(latency=6.0)
+    assert limiter.rate == 1.0
+
+    limiter.record_throttled(retry_after=0, attempt=0)
+    assert limiter.rate == 0.5
+    limiter.record_throttled(retry_after=0, attempt=0)
+    assert limiter.rate == 0.3
+    assert limiter.get_stats()["rate_decreases"] == 3
+
+def test_retry_after_pauses_every_request(sleeps):
+    limiter = RateLimiter(100.0, max_rate=100.0, jitter=0)
+
+    limiter.record_throttled(retry_after=3.0, attempt=0)
+    limiter.acquire()
+
+    assert sleeps[0] == pytest.approx(3.0, abs=0.1)
+    assert limiter.get_stats()["throttled_responses"] == 1
+
+@pytest.mark.parametrize("value, expected", [("7", 7.0), ("-3", 0.0), ("", None), ("soon", None)])
+def test_parse_retry_after_seconds(value, expected):
+    assert RateLimiter.parse_retry_after(value) == expected
+
+def test_parse_retry_after_http_date():
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+
+    assert RateLimiter.parse_retry_after(format_datetime(retry_at, usegmt=True)) == pytest.approx(30, abs=2)
+
+def test_only_pauses_count_as_throttled(sleeps):
+    limiter = RateLimiter(1.0, jitter=0)
+
+    limiter.acquire()
+    limiter.acquire()
+    assert limiter.get_stats()["throttled_seconds"] == 0
+    assert limiter.get_stats()["paced_seconds"] == pytest.approx(1.0, abs=0.1)
+
+    # Sleeps are skipped, so the next paced slot is 2s away and the pause adds 3s on top
+    limiter.record_throttled(retry_after=5.0, attempt=0)
+    limiter.acquire()
+    assert limiter.get_stats()["throttled_seconds"] == pytest.approx(3.0, abs=0.1)
+
+class RateLimitedSession:
+    """requests.Session stand-in answering every call with a 429"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def get(self, url, params=None, timeout=None):
+        self.calls += 1
+        return type("Response", (), {"status_code": 429, "headers": {"Retry-After": "0"}})()
+
+    def close(self):
+        pass
+
+def test_429_on_the_last_attempt_fails_without_a_retry(sleeps, caplog):
+    from job_scraper.scraper import JobScraper
+    scraper = JobScraper()
+    scraper.max_retries = 3
+    scraper.session = RateLimitedSession()
+
+    assert scraper.search_jobs_page("query", "India") is None
+
+    stats = scraper.rate_limiter.get_stats()
+    assert scraper.session.calls == 3
+    assert stats["throttled_responses"] == 3 and stats["retries"] == 2
+    assert "All API request attempts failed" in caplog.text
@@ -0,0 +1,65 @@
+import os
+import shutil
+
+from job_scraper.response_store import ResponseStore
+
+def payload(jobs, token=None):
+    return {
+        "search_metadata": {"id": "dropped"},
+        "jobs_results": jobs,
+        "serpapi_pagination": {"next_page_token": token} if token else {}
+    }
+
+def test_put_and_get_round_trip(tmp_path):
+    store = ResponseStore(str(tmp_path))
+
+    store.put("Engineer jobs in (Pune)", "Pune", 0, payload([{"title": "Engineer 1"}], "next"))
+    stored = store.get("Engineer jobs in (Pune)", "Pune", 0)
+
+    assert stored == {"jobs_results": [{"title": "Engineer 1"}], "serpapi_pagination": {"next_page_token": "next"}}
+    assert store.get("Engineer jobs in (Pune)", "Pune", 1) is None
+
+def test_identical_payloads_are_stored_once(tmp_path):
+    store = ResponseStore(str(tmp_path))
+
+    first = store.put("query", "Pune", 0, payload([{"title": "Engineer 1"}]))
+    second = store.put("query", "Pune", 1, payload([{"title": "Engineer 1"}]))
+
+    objects = [name for _, _, names in os.walk(store.objects_dir) for name in names]
+    assert first == second and len(objects) == 1
+    assert len(list(store.iter_responses())) == 2
+
+def test_eviction_drops_old_days_and_their_objects(tmp_path):
+    store = ResponseStore(str(tmp_path), ttl_days=30)
+    store.put("query", "Pune", 0, payload([{"title": "Engineer 1"}]))
+    shutil.move(os.path.join(store.refs_dir, store.today()), os.path.join(store.refs_dir, "2000-01-01"))
+
+    stats = store.evict_expired()
+
+    assert stats == {"days_removed": 1, "objects_removed": 1}
+    assert list(store.iter_responses()) == []
+
+def test_replay_rebuilds_jobs_without_network(tmp_path, sqlite_db, monkeypatch, raw_job):
+    import job_scraper.scraper as scraper_module
+    monkeypatch.setattr(scraper_module, "db", sqlite_db)
+    scraper = scraper_module.JobScraper()
+    scraper.response_store = ResponseStore(str(tmp_path))
+    scraper.response_store.put("Software Engineer jobs in (Pune)", "Pune", 0,
+                               payload([raw_job(1), raw_job(2)]))
+    scraper.response_store.put("Software Engineer jobs in (Pune)", "Pune", 1,
+                               payload([raw_job(2), raw_job(3)]))
+
+    summary = scraper.replay_stored_responses()
+
+    assert summary["responses_replayed"] == 2 and summary["duplicates"] == 1
+    assert summary["jobs_saved"] == 3
+    assert {job["role"] for job in sqlite_db.get_recent_jobs()} == {"Software Engineer"}
+
+def test_stored_page_is_served_before_the_api(tmp_path, raw_job):
+    from job_scraper.scraper import JobScraper
+    scraper = JobScraper()
+    scraper.response_store = ResponseStore(str(tmp_path))
+    scraper.response_store.put("query", "Pune", 0, payload([raw_job(1)], "next"))
+    scraper.session = None  # any API call would fail
+
+    assert scraper.search_jobs_page("query", "Pune") == ([raw_job(1)], "next")
@@ -0,0 +1,34 @@
+import pytest
+
+from common.storage import JobStorage
+from job_scraper.job_processor import JobProcessor
+
+def processed_jobs(raw_job, count):
+    processor = JobProcessor()
+    return [processor.process_job(raw_job(n), "Software Engineer") for n in range(count)]
+
+def test_insert_jobs_batch_counts(sqlite_db, raw_job):
+    jobs = processed_jobs(raw_job, 3)
+
+    first = sqlite_db.insert_jobs_batch(jobs + [{"company_name": "No Title"}])
+    again = sqlite_db.insert_jobs_batch(processed_jobs(raw_job, 4))
+
+    assert (first["inserted"], first["skipped"], first["failed"]) == (3, 0, 1)
+    assert sorted(first["inserted_job_ids"]) == sorted(job["job_id"] for job in jobs)
+    assert (again["inserted"], again["skipped"]) == (1, 3)
+    assert sqlite_db.get_database_stats()["total_jobs"] == 4
+
+def test_backends_must_implement_the_interface():
+    class PartialStorage(JobStorage):
+        def insert_jobs_batch(self, jobs):
+            return {}
+
+    with pytest.raises(TypeError):
+        PartialStorage()
+
+def test_missing_optional_features_are_reported(sqlite_db):
+    assert sqlite_db.get_ttl_days() is None and not sqlite_db.drop_ttl_index()
+    with pytest.raises(NotImplementedError, match="RETENTION_MODE=purge"):
+        sqlite_db.ensure_ttl_index(30)
+    with pytest.raises(NotImplementedError, match="read_outbox"):
+        sqlite_db.watch_new_jobs()
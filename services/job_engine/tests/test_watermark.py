@@ -0,0 +1,89 @@
+import pytest
+
+from job_scraper.job_processor import JobProcessor
+from job_scraper.watermark import Watermark
+
+ROLE = "Software Engineer"
+LABEL = "India"
+
+@pytest.fixture
+def scraper(sqlite_db, monkeypatch):
+    """Incremental JobScraper on a fresh SQLite store, with no sleeps"""
+    import job_scraper.scraper as scraper_module
+    monkeypatch.setattr(scraper_module, "db", sqlite_db)
+    scraper = scraper_module.JobScraper()
+    scraper.incremental = True
+    yield scraper
+    scraper.close()
+
+def serve_pages(scraper, monkeypatch, pages):
+    """Answer search_jobs_page with fixed pages: a list of job lists, chained by page tokens"""
+    def search_jobs_page(query, location, next_page_token=None, page=0):
+        index = int(next_page_token or 0)
+        token = str(index + 1) if index + 1 < len(pages) else None
+        return pages[index], token
+    monkeypatch.setattr(scraper, "search_jobs_page", search_jobs_page)
+
+def run_search(scraper, max_jobs):
+    return scraper._scrape_search_unit(ROLE, LABEL, "query", LABEL, max_jobs, JobProcessor(), set(), polite=False)
+
+def test_filter_new_does_not_mark_jobs_known(raw_job):
+    processor = JobProcessor()
+    watermark = Watermark(ROLE, LABEL)
+
+    new_jobs, known = watermark.filter_new([raw_job(n) for n in range(3)], processor)
+
+    assert len(new_jobs) == 3 and known == 0
+    assert watermark.to_document()["job_ids"] == []
+
+def test_known_run_stops_only_after_a_complete_run(raw_job):
+    processor = JobProcessor()
+    page = [raw_job(n) for n in range(8)]
+    known_ids = [processor.get_job_id(job) for job in page[:5]]
+
+    complete = Watermark(ROLE, LABEL, known_ids, complete=True, stop_after=5)
+    new_jobs, known = complete.filter_new(page, processor)
+    assert complete.exhausted and known == 5 and new_jobs == []
+
+    incomplete = Watermark(ROLE, LABEL, known_ids, complete=False, stop_after=5)
+    new_jobs, known = incomplete.filter_new(page, processor)
+    assert not incomplete.exhausted and known == 5 and new_jobs == page[5:]
+
+def test_truncated_jobs_are_saved_by_the_next_run(scraper, sqlite_db, monkeypatch, raw_job):
+    serve_pages(scraper, monkeypatch, [[raw_job(n) for n in range(10)]])
+
+    first = run_search(scraper, max_jobs=5)
+    stored = sqlite_db.get_watermark(ROLE, LABEL)
+    assert first["jobs_saved"] == 5
+    assert len(stored["job_ids"]) == 5
+    assert stored["complete"] is False
+
+    second = run_search(scraper, max_jobs=5)
+    assert second["jobs_saved"] == 5
+    assert second["known"] == 5
+    assert sqlite_db.count_jobs({}) == 10
+
+    third = run_search(scraper, max_jobs=5)
+    assert third["jobs_saved"] == 0
+    assert sqlite_db.get_watermark(ROLE, LABEL)["complete"] is True
+
+def test_failed_saves_stay_unknown(scraper, sqlite_db, monkeypatch, raw_job):
+    serve_pages(scraper, monkeypatch, [[raw_job(n) for n in range(4)]])
+    monkeypatch.setattr(scraper, "save_jobs", lambda jobs: [n % 2 == 0 for n in range(len(jobs))])
+
+    run_search(scraper, max_jobs=10)
+
+    stored = sqlite_db.get_watermark(ROLE, LABEL)
+    assert len(stored["job_ids"]) == 2
+    assert stored["complete"] is False
+
+def test_next_page_left_unfetched_marks_incomplete(scraper, sqlite_db, monkeypatch, raw_job):
+    serve_pages(scraper, monkeypatch, [[raw_job(n) for n in range(3)], [raw_job(n) for n in range(3, 6)]])
+
+    first = run_search(scraper, max_jobs=3)
+    assert first["pages"] == 1
+    assert sqlite_db.get_watermark(ROLE, LABEL)["complete"] is False
+
+    second = run_search(scraper, max_jobs=3)
+    assert second["jobs_saved"] == 3
+    assert sqlite_db.count_jobs({}) == 6
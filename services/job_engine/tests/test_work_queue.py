@@ -0,0 +1,76 @@
+import pytest
+
+from job_scraper.work_queue import QueueWorker
+
+TASK = {
+    "_id": 1, "session_id": "s", "role": "Software Engineer", "location": "India", "query": "query",
+    "api_location": "India", "page": 0, "next_page_token": None, "max_jobs": 20, "collected": 0,
+    "attempts": 1
+}
+
+class FakeQueue:
+    lease_seconds = 60
+
+    def __init__(self, lease_held: bool):
+        self.lease_held = lease_held
+        self.added = []
+        self.calls = []
+
+    def heartbeat(self, task_id, worker_id):
+        return self.lease_held
+
+    def complete(self, task_id, worker_id, stats):
+        self.calls.append("complete")
+        return self.lease_held
+
+    def release(self, task, worker_id, error):
+        pass
+
+    def add_task(self, *args):
+        self.calls.append("add_task")
+        self.added.append(args)
+        return True
+
+class FakeScraper:
+    def scrape_page(self, query, api_location, role, max_jobs, next_page_token=None, page=0, collected=0):
+        return {'jobs_saved': 10}, "token-1", 10
+
+def test_next_page_enqueued_before_completion():
+    queue = FakeQueue(lease_held=True)
+
+    assert QueueWorker(FakeScraper(), queue, "worker")._run_task(TASK)
+    assert [args[6:] for args in queue.added] == [(1, "token-1", 10)]
+    # A crash after completing must not lose the next page
+    assert queue.calls == ["add_task", "complete"]
+
+def test_lost_lease_still_enqueues_the_next_page():
+    queue = FakeQueue(lease_held=False)
+
+    # The worker that took the task over enqueues the same page; the unique index keeps one
+    assert not QueueWorker(FakeScraper(), queue, "worker")._run_task(TASK)
+    assert [args[6:] for args in queue.added] == [(1, "token-1", 10)]
+
+def test_summarize_session_has_no_side_effects(monkeypatch):
+    from datetime import datetime
+    from common.config import config
+    from job_scraper.scraper import JobScraper
+    from job_scraper.work_queue import summarize_session
+    monkeypatch.setattr(config, "CHANGESETS_ENABLED", True)
+    monkeypatch.setattr(config, "FEED_SNAPSHOTS", True)
+
+    class TaskRecords:
+        def get_tasks(self, session_id):
+            stats = {'jobs_found': 4, 'jobs_processed': 4, 'jobs_saved': 3, 'direct_links': 3,
+                     'api_calls': 1, 'pages': 1}
+            return [dict(TASK, status="done", stats=stats, worker_id="worker", created_at=datetime(2026, 1, 1))]
+
+    scraper = JobScraper()
+    scraper._session_added = []
+    monkeypatch.setattr(scraper, "build_feed_snapshots", lambda: pytest.fail("feeds rebuilt"))
+    monkeypatch.setattr("job_scraper.scraper.job_changesets.record_changeset",
+                        lambda *args, **kwargs: pytest.fail("changeset recorded"))
+
+    summary = summarize_session(scraper, "s", TaskRecords())
+
+    assert summary['total_jobs_saved'] == 3 and summary['tasks']['done'] == 1
+    assert 'changeset' not in summary and 'feed_snapshots' not in summary